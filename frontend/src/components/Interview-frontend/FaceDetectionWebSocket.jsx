@@ -20,6 +20,10 @@ function FaceDetectionWebSocket({ sessionId, onTerminate, onAlert }) {
   // Debounce alerts - only show new alerts every 2 seconds
   const ALERT_DEBOUNCE_MS = 2000;
 
+  // Must match FRAME_HEADER in interview-service/services/face_inference.py
+  const FRAME_PROTOCOL_VERSION = 1;
+  const FRAME_HEADER_SIZE = 13;
+
   useEffect(() => {
     const token = localStorage.getItem('token');
     if (!token) {
@@ -39,7 +43,9 @@ function FaceDetectionWebSocket({ sessionId, onTerminate, onAlert }) {
         // Open WebSocket after camera works
         const wsUrl = `ws://localhost:8000/ws/monitor/${sessionId}?token=${token}`;
         const ws = new WebSocket(wsUrl);
+        ws.binaryType = 'arraybuffer';
         wsRef.current = ws;
+        let frameSeq = 0;
 
         ws.onopen = () => {
           console.log('✅ WebSocket connected');
@@ -128,18 +134,19 @@ function FaceDetectionWebSocket({ sessionId, onTerminate, onAlert }) {
 
           canvas.toBlob(
             (blob) => {
-              const reader = new FileReader();
-              reader.onloadend = () => {
-                const base64 = reader.result.split(',')[1];
-                if (ws.readyState === WebSocket.OPEN) {
-                  ws.send(
-                    JSON.stringify({
-                      frame: base64,
-                    })
-                  );
-                }
-              };
-              reader.readAsDataURL(blob);
+              if (!blob) return;
+              blob.arrayBuffer().then((jpeg) => {
+                if (ws.readyState !== WebSocket.OPEN) return;
+                // Binary frame: version (u8), seq (u32), timestamp ms (u64), then JPEG bytes
+                const frame = new Uint8Array(FRAME_HEADER_SIZE + jpeg.byteLength);
+                const header = new DataView(frame.buffer);
+                header.setUint8(0, FRAME_PROTOCOL_VERSION);
+                header.setUint32(1, frameSeq);
+                header.setBigUint64(5, BigInt(Date.now()));
+                frame.set(new Uint8Array(jpeg), FRAME_HEADER_SIZE);
+                frameSeq = (frameSeq + 1) >>> 0;
+                ws.send(frame);
+              });
             },
             'image/jpeg',
             0.6
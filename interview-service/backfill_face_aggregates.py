@@ -0,0 +1,89 @@
+"""
+Backfill running aggregates for face analytics documents
+
+Documents created before running aggregates existed (no `aggregates_version`)
+have their aggregates recomputed from their legacy embedded logs and their
+face_event_buckets, so GET /api/face-analytics/{session_id} can serve them
+without scanning logs.
+
+Run while no interviews are being recorded for the affected sessions,
+since events ingested during the scan of a document would be overwritten.
+
+Usage:
+    python backfill_face_aggregates.py            # only documents missing aggregates
+    python backfill_face_aggregates.py --all      # recompute every document
+    python backfill_face_aggregates.py --dry-run  # report without writing
+"""
+
+import argparse
+from datetime import datetime
+
+from database import get_sync_db
+from routes.face_events import (
+    AGGREGATES_VERSION,
+    LOG_SECTIONS,
+    compute_aggregates,
+    summary_from_aggregates
+)
+
+
+def backfill(recompute_all: bool = False, dry_run: bool = False) -> int:
+    """
+    Compute and store aggregates for face analytics documents
+
+    Returns:
+        int: Number of documents processed
+    """
+    query = {} if recompute_all else {"aggregates_version": {"$ne": AGGREGATES_VERSION}}
+    processed = 0
+
+    with get_sync_db() as db:
+        for analytics in db.face_analytics.find(query):
+            buckets = db.face_event_buckets.find(
+                {
+                    "session_id": analytics.get("session_id"),
+                    "candidate_id": analytics.get("candidate_id")
+                },
+                {"_id": 0, **{field: 1 for field in LOG_SECTIONS}}
+            )
+
+            aggregates = compute_aggregates(analytics, buckets)
+            summary = summary_from_aggregates(aggregates)
+
+            print(
+                f"  {analytics.get('session_id')}: "
+                f"presence={aggregates.get('presence', {}).get('total', 0)} "
+                f"attention={aggregates.get('attention', {}).get('count', 0)} "
+                f"emotion={aggregates.get('emotion', {}).get('total', 0)} "
+                f"incidents={aggregates.get('incidents', {}).get('total', 0)} "
+                f"-> {summary}"
+            )
+
+            if not dry_run:
+                db.face_analytics.update_one(
+                    {"_id": analytics["_id"]},
+                    {"$set": {
+                        "aggregates": aggregates,
+                        "aggregates_version": AGGREGATES_VERSION,
+                        "updated_at": datetime.now()
+                    }}
+                )
+            processed += 1
+
+    return processed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill face analytics running aggregates")
+    parser.add_argument("--all", action="store_true", help="Recompute documents that already have aggregates")
+    parser.add_argument("--dry-run", action="store_true", help="Compute and print without writing")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("FACE ANALYTICS AGGREGATES BACKFILL")
+    print("=" * 60)
+
+    count = backfill(recompute_all=args.all, dry_run=args.dry_run)
+
+    action = "Would update" if args.dry_run else "Updated"
+    print(f"\n✅ {action} {count} document(s)")
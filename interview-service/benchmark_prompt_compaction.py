@@ -0,0 +1,110 @@
+"""
+Benchmark prompt context compaction (services/context_digest.py)
+
+For every session in the fixture file, compares the reference-answer
+prompts built from the raw JD / resume with the ones built from the
+session's context digest:
+- prompt tokens per question (raw vs digest)
+- digest build time and whether it is deterministic and within budget
+
+With --live, the reference answers are also generated both ways (LLM cache
+disabled) to compare latency; this needs a configured OPENAI_API_KEY.
+
+Usage:
+    python benchmark_prompt_compaction.py
+    python benchmark_prompt_compaction.py --max-tokens 400
+    python benchmark_prompt_compaction.py --live
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from config import get_settings
+from services.context_digest import build_context_digest
+from services.llm_service import _reference_answer_messages, generate_reference_answer
+from services.token_counter import count_message_tokens
+
+DEFAULT_FIXTURES = "fixtures/prompt_compaction_sessions.json"
+
+
+def _timed_answer(question: str, jd: str, resume: str, interview_type: str) -> float:
+    started = time.perf_counter()
+    generate_reference_answer(question, jd, resume, interview_type, cache=False)
+    return time.perf_counter() - started
+
+
+def benchmark(fixtures: list, max_tokens: int, live: bool = False) -> dict:
+    """
+    Run the benchmark over all fixture sessions
+
+    Returns:
+        dict: Totals across fixtures (raw / digest prompt tokens, latencies)
+    """
+    totals = {"raw_tokens": 0, "digest_tokens": 0, "raw_latency": [], "digest_latency": []}
+
+    for fixture in fixtures:
+        jd, resume = fixture["job_description"], fixture["resume_text"]
+        interview_type = fixture.get("interview_type", "technical")
+
+        started = time.perf_counter()
+        digest = build_context_digest(jd, resume, max_tokens)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        deterministic = build_context_digest(jd, resume, max_tokens) == digest
+        within_budget = digest["tokens"] <= max_tokens
+
+        raw_tokens = digest_tokens = 0
+        for question in fixture["questions"]:
+            raw_tokens += count_message_tokens(_reference_answer_messages(question, jd, resume, interview_type))
+            digest_tokens += count_message_tokens(
+                _reference_answer_messages(question, digest["job_description"], digest["resume"], interview_type)
+            )
+        totals["raw_tokens"] += raw_tokens
+        totals["digest_tokens"] += digest_tokens
+
+        reduction = 100 * (1 - digest_tokens / raw_tokens) if raw_tokens else 0.0
+        print(f"\n  {fixture['name']} ({len(fixture['questions'])} questions)")
+        print(f"    context:        {digest['source_tokens']} -> {digest['tokens']} tokens (budget {max_tokens})")
+        print(f"    prompt tokens:  {raw_tokens} -> {digest_tokens} ({reduction:.1f}% fewer)")
+        print(f"    digest build:   {build_ms:.1f} ms")
+        print(f"    {'✅' if deterministic else '❌'} deterministic   {'✅' if within_budget else '❌'} within budget")
+
+        if live:
+            for question in fixture["questions"]:
+                totals["raw_latency"].append(_timed_answer(question, jd, resume, interview_type))
+                totals["digest_latency"].append(
+                    _timed_answer(question, digest["job_description"], digest["resume"], interview_type)
+                )
+
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JD/resume prompt compaction")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="JSON list of sessions to benchmark")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Digest budget (default: CONTEXT_DIGEST_MAX_TOKENS)")
+    parser.add_argument("--live", action="store_true", help="Also time real reference-answer calls")
+    args = parser.parse_args()
+
+    max_tokens = args.max_tokens or get_settings().context_digest_max_tokens
+    with open(args.fixtures, encoding="utf-8") as f:
+        fixtures = json.load(f)
+
+    print("=" * 60)
+    print("PROMPT CONTEXT COMPACTION BENCHMARK")
+    print("=" * 60)
+
+    totals = benchmark(fixtures, max_tokens, live=args.live)
+
+    print(f"\n{'=' * 60}")
+    print("SUMMARY")
+    print(f"{'=' * 60}")
+    raw, compact = totals["raw_tokens"], totals["digest_tokens"]
+    print(f"  Reference-answer prompt tokens: {raw} -> {compact} ({100 * (1 - compact / raw):.1f}% fewer)")
+    if args.live:
+        raw_p50 = statistics.median(totals["raw_latency"])
+        digest_p50 = statistics.median(totals["digest_latency"])
+        print(f"  Median latency: {raw_p50:.2f}s raw -> {digest_p50:.2f}s digest ({digest_p50 - raw_p50:+.2f}s)")
+    print(f"\n✅ Benchmarked {len(fixtures)} session(s)")
@@ -0,0 +1,171 @@
+"""
+Benchmark the audio pre-processing stages (services/audio_analysis.py)
+
+Runs prepare_audio() over a corpus of answer recordings and reports, per
+recording, the detected speech, whether it would be transcribed, how many
+seconds of audio the voice-activity pre-filter keeps away from the
+transcription API, and the upload size before / after normalization.
+
+The default corpus is synthetic and described in fixtures/vad_corpus.json
+(silence / room noise / speech-like segments, encoded as 48 kHz stereo
+WebM/Opus like a browser MediaRecorder upload), so the expected outcome of
+each clip is known. Pass --corpus to run over a directory of real
+recordings instead.
+
+Requires ffmpeg.
+
+Usage:
+    python benchmark_vad.py
+    python benchmark_vad.py --no-normalize      # pre-filter only
+    python benchmark_vad.py --corpus /path/to/recordings
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import time
+
+import numpy as np
+
+from config import get_settings
+from services.audio_analysis import SAMPLE_RATE, prepare_audio
+
+DEFAULT_MANIFEST = "fixtures/vad_corpus.json"
+
+# gpt-4o-mini-transcribe list price, USD per audio minute
+TRANSCRIPTION_PRICE_PER_MINUTE = 0.003
+
+
+def _speech_like(seconds: float, rng: np.random.Generator) -> np.ndarray:
+    """Syllable-length voiced bursts (harmonics + noise) separated by short gaps"""
+    out = []
+    total = int(seconds * SAMPLE_RATE)
+    while sum(len(part) for part in out) < total:
+        length = int(rng.uniform(0.12, 0.3) * SAMPLE_RATE)
+        t = np.arange(length) / SAMPLE_RATE
+        f0 = rng.uniform(110, 220)
+        voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+        voiced += 0.3 * rng.standard_normal(length)
+        envelope = np.sin(np.pi * np.arange(length) / length)
+        out.append(0.1 * voiced * envelope)
+        gap = rng.uniform(0.6, 1.2) if rng.random() < 0.08 else rng.uniform(0.03, 0.12)
+        out.append(np.zeros(int(gap * SAMPLE_RATE)))
+    return np.concatenate(out)[:total]
+
+
+def synthesize(clip: dict, seed: int) -> bytes:
+    """Render a manifest entry and encode it the way browsers upload answers"""
+    rng = np.random.default_rng(seed)
+    parts = [
+        np.zeros(int(clip["lead_silence"] * SAMPLE_RATE)),
+        _speech_like(clip["speech"], rng) if clip["speech"] else np.zeros(0),
+        np.zeros(int(clip["trail_silence"] * SAMPLE_RATE)),
+    ]
+    samples = np.concatenate(parts)
+    if clip.get("noise_dbfs") is not None:
+        samples = samples + 10 ** (clip["noise_dbfs"] / 20) * rng.standard_normal(len(samples))
+    pcm = (np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes()
+
+    process = subprocess.run(
+        [get_settings().ffmpeg_path, "-hide_banner", "-loglevel", "error",
+         "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", "1", "-i", "pipe:0",
+         "-ar", "48000", "-ac", "2", "-c:a", "libopus", "-b:a", "96k", "-f", "webm", "pipe:1"],
+        input=pcm, capture_output=True, check=True
+    )
+    return process.stdout
+
+
+def load_corpus(manifest: str, corpus_dir: str = None) -> list:
+    """[(name, audio bytes, expected has_speech or None)]"""
+    if corpus_dir:
+        return [
+            (name, open(os.path.join(corpus_dir, name), "rb").read(), None)
+            for name in sorted(os.listdir(corpus_dir))
+            if os.path.isfile(os.path.join(corpus_dir, name))
+        ]
+    with open(manifest, encoding="utf-8") as f:
+        clips = json.load(f)
+    return [(clip["name"], synthesize(clip, seed), clip["has_speech"]) for seed, clip in enumerate(clips)]
+
+
+def benchmark(corpus: list, normalize: bool = True) -> dict:
+    totals = {"recordings": 0, "seconds": 0.0, "seconds_saved": 0.0, "skipped": 0,
+              "trimmed": 0, "correct": 0, "labelled": 0, "lost": 0, "analysis_ms": [],
+              "bytes_in": 0, "bytes_out": 0}
+
+    print(f"\n  {'recording':<22}{'size':>9}{'sent':>9}{'audio':>8}{'speech':>8}{'saved':>8}{'ms':>8}  result")
+    for name, audio, expected in corpus:
+        started = time.perf_counter()
+        analysis = prepare_audio(audio, normalize=normalize)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if analysis is None:
+            print(f"  {name:<22}{len(audio):>9}  ❌ could not be analyzed")
+            continue
+
+        totals["recordings"] += 1
+        totals["seconds"] += analysis["duration"]
+        totals["seconds_saved"] += analysis["seconds_saved"]
+        totals["skipped"] += not analysis["has_speech"]
+        totals["trimmed"] += analysis["trimmed"]
+        totals["analysis_ms"].append(elapsed_ms)
+        if analysis["has_speech"]:
+            totals["bytes_in"] += analysis["original_bytes"]
+            totals["bytes_out"] += analysis["bytes"]
+        sent = analysis["bytes"] if analysis["has_speech"] else 0
+
+        if not analysis["has_speech"]:
+            outcome = "no_speech"
+        else:
+            outcome = "+".join(
+                step for step in ("trimmed", "normalized") if analysis[step]
+            ) or "transcribe as-is"
+        mark = ""
+        if expected is not None:
+            totals["labelled"] += 1
+            correct = analysis["has_speech"] == expected
+            totals["correct"] += correct
+            # A skipped answer is lost; transcribing a silent one only costs money
+            totals["lost"] += expected and not analysis["has_speech"]
+            mark = "✅ " if correct else ("❌ " if expected else "⚠️ ")
+        print(
+            f"  {name:<22}{len(audio):>9}{sent:>9}{analysis['duration']:>7.1f}s{analysis['speech_seconds']:>7.1f}s"
+            f"{analysis['seconds_saved']:>7.1f}s{elapsed_ms:>8.1f}  {mark}{outcome}"
+        )
+
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark audio pre-processing before transcription")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="Synthetic corpus description")
+    parser.add_argument("--corpus", default=None, help="Directory of real recordings (no expected labels)")
+    parser.add_argument("--no-normalize", action="store_true", help="Only run the voice-activity pre-filter")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("AUDIO PRE-PROCESSING BENCHMARK")
+    print("=" * 60)
+
+    totals = benchmark(load_corpus(args.manifest, args.corpus), normalize=not args.no_normalize)
+
+    print(f"\n{'=' * 60}")
+    print("SUMMARY")
+    print(f"{'=' * 60}")
+    seconds, saved = totals["seconds"], totals["seconds_saved"]
+    print(f"  Recordings:            {totals['recordings']} ({totals['skipped']} no_speech, {totals['trimmed']} trimmed)")
+    if totals["labelled"]:
+        print(
+            f"  Speech decisions:      {totals['correct']}/{totals['labelled']} correct "
+            f"({totals['lost']} answer(s) skipped, "
+            f"{totals['labelled'] - totals['correct'] - totals['lost']} silent recording(s) transcribed)"
+        )
+    if seconds:
+        print(f"  Audio seconds saved:   {saved:.1f} of {seconds:.1f} ({100 * saved / seconds:.1f}%)")
+        print(f"  Transcription saved:   ${saved / 60 * TRANSCRIPTION_PRICE_PER_MINUTE:.4f}")
+    if totals["bytes_in"]:
+        bytes_in, bytes_out = totals["bytes_in"], totals["bytes_out"]
+        print(f"  Upload size (speech):  {bytes_in} -> {bytes_out} bytes ({100 * (1 - bytes_out / bytes_in):.1f}% smaller)")
+    if totals["analysis_ms"]:
+        print(f"  Median analysis time:  {np.median(totals['analysis_ms']):.1f} ms")
+    print(f"\n✅ Benchmarked {totals['recordings']} recording(s)")
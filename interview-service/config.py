@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 from functools import lru_cache
-from typing import Optional
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -13,6 +13,113 @@ class Settings(BaseSettings):
     # Load these values from environment/.env via BaseSettings
     mongodb_uri: Optional[str] = None
     mongodb_db_name: str = "ai_interviewer"
+    # Connection pool sizing and timeouts for the async (Motor) client
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_server_selection_timeout_ms: int = 5000
+    mongodb_connect_timeout_ms: int = 10000
+    mongodb_socket_timeout_ms: int = 30000
+    # Timeout for the /api/health/db probe
+    mongodb_health_timeout_ms: int = 2000
+    # Authenticated user cache (see services/auth_cache.py)
+    auth_cache_max_entries: int = 10000
+    auth_cache_ttl_seconds: float = 60.0  # Longest a role/status change or logout goes unnoticed
+    # Audio uploads are streamed into GridFS in chunks of this size
+    max_audio_upload_bytes: int = 25 * 1024 * 1024  # Whisper API limit
+    audio_upload_chunk_size: int = 255 * 1024  # GridFS default chunk size
+    # Max segments per answer uploaded while recording (POST /upload-answer/.../segments/{index})
+    answer_max_segments: int = 120
+    # A segmented answer with no new segment for this long (client gone before /complete) is finished with what it has
+    answer_recording_timeout_seconds: float = 120.0
+    # Transcription job queue and worker pool (see services/transcription_worker.py)
+    transcription_backend: str = "openai"  # "openai" or "stub"
+    transcription_workers: int = 4
+    transcription_max_attempts: int = 3
+    transcription_lease_seconds: int = 300
+    transcription_retry_backoff_seconds: float = 10.0
+    transcription_poll_interval_seconds: float = 1.0
+    # Transcribe byte-identical uploads once (services/transcript_dedup.py)
+    transcript_dedup_enabled: bool = True
+    transcript_dedup_ttl_seconds: float = 7 * 24 * 3600
+    # Re-check interval of a job waiting for identical audio being transcribed elsewhere
+    transcript_dedup_wait_seconds: float = 5.0
+    # Voice-activity pre-filter before transcription (services/audio_analysis.py, needs ffmpeg)
+    vad_enabled: bool = True
+    vad_frame_ms: int = 30
+    vad_noise_margin_db: float = 10.0
+    # Only recordings quieter than this throughout, or shorter than VAD_MIN_DURATION_SECONDS, skip transcription
+    vad_min_level_dbfs: float = -50.0
+    vad_min_duration_seconds: float = 1.0
+    # Silence kept around speech, and the least silence worth cutting
+    vad_padding_seconds: float = 0.3
+    vad_min_trim_seconds: float = 1.0
+    # Re-encode answers as mono 16 kHz Opus before transcription (in AUDIO_PROCESS_WORKERS processes)
+    audio_normalize_enabled: bool = True
+    audio_normalize_codec: str = "libopus"
+    audio_normalize_bitrate: str = "24k"
+    audio_process_workers: int = 2
+    ffmpeg_path: str = "ffmpeg"
+    ffmpeg_timeout_seconds: float = 60.0
+    # Answer status push events (services/status_events.py): "memory" or "mongo" (change streams, multi-worker)
+    status_events_backend: str = "memory"
+    status_events_queue_size: int = 256
+    status_events_ttl_seconds: int = 3600
+    status_events_heartbeat_seconds: float = 15.0
+    # Shared face detection pool for /ws/monitor (see services/face_inference.py)
+    face_inference_workers: int = 4
+    face_inference_queue_size: int = 64
+    face_frame_max_age_ms: float = 1000.0
+    # Face event ingestion (events per face_event_buckets document / per batch call)
+    face_event_bucket_size: int = 500
+    face_event_max_batch: int = 500
+    # Max number of in-flight LLM calls when scoring a session
+    llm_max_concurrency: int = 8
+    # Generate reference answers in the background at session creation
+    precompute_reference_answers: bool = True
+    # "per_answer" (one evaluate_answer call each) or "batched" (several answers per request)
+    evaluation_mode: str = "per_answer"
+    evaluation_batch_size: int = 8
+    evaluation_batch_max_tokens: int = 12000
+    # Compact JD/resume digest stored per session and used by later prompts (services/context_digest.py)
+    context_digest_enabled: bool = True
+    context_digest_max_tokens: int = 600
+    # Score each answer right after it is transcribed (analyze then only aggregates)
+    score_on_transcription: bool = False
+    # Shared LLM HTTP pools (services/llm_clients.py)
+    llm_pool_max_connections: int = 100
+    llm_pool_max_keepalive: int = 20
+    llm_keepalive_expiry_seconds: float = 30.0
+    llm_request_timeout_seconds: float = 120.0
+    llm_connect_timeout_seconds: float = 10.0
+    # Process-wide cap on concurrent requests per provider (sync + async)
+    llm_max_concurrency_openai: int = 32
+    llm_max_concurrency_groq: int = 16
+    # Per-provider rate budgets for the LLM scheduler (services/llm_scheduler.py); 0 = unlimited
+    llm_rpm_openai: float = 5000
+    llm_tpm_openai: float = 2000000
+    llm_rpm_groq: float = 1000
+    llm_tpm_groq: float = 300000
+    # Share of each bucket that batch-priority requests may not use
+    llm_scheduler_interactive_reserve: float = 0.2
+    # LLM response cache (services/llm_cache.py): in-process LRU + MongoDB TTL tier
+    llm_cache_enabled: bool = True
+    llm_cache_mongo: bool = True
+    llm_cache_max_entries: int = 2000
+    llm_cache_ttl_seconds: float = 7 * 24 * 3600
+    # Provider routing (services/llm_router.py): JSON {"call_type": ["provider:model", ...]}
+    llm_routes: Dict[str, List[str]] = {}
+    # Hedged requests: duplicate to the next provider after the p95 latency
+    # (only once 20 latencies of the call type/provider are known)
+    llm_hedge_enabled: bool = True
+    llm_hedge_min_delay_ms: float = 250.0
+    llm_hedge_max_parallel: int = 2
+    # Per-provider circuit breakers
+    llm_breaker_error_rate: float = 0.5
+    llm_breaker_min_requests: int = 10
+    llm_breaker_window_seconds: float = 60.0
+    llm_breaker_cooldown_seconds: float = 30.0
+    # Cost estimates for LLM call metrics: JSON {"model": [usd_per_1m_prompt, usd_per_1m_completion]}
+    llm_prices: Dict[str, List[float]] = {}
 
     model_config = ConfigDict(
         env_file=".env",
@@ -44,5 +151,9 @@ def get_ocr_config():
     return {
         "MAX_FILE_SIZE": 50 * 1024 * 1024,  # 50MB
         "ALLOWED_EXTENSIONS": {'pdf', 'jpg', 'jpeg', 'png'},
-        "UPLOAD_FOLDER": os.getenv('UPLOAD_FOLDER', '/tmp/ocr_uploads')
+        "UPLOAD_FOLDER": os.getenv('UPLOAD_FOLDER', '/tmp/ocr_uploads'),
+        # PDF pipeline: pages per Vision request, concurrent requests, JPEG encoder threads
+        "PAGES_PER_CHUNK": int(os.getenv('OCR_PAGES_PER_CHUNK', 2)),
+        "MAX_IN_FLIGHT_CHUNKS": int(os.getenv('OCR_MAX_IN_FLIGHT_CHUNKS', 4)),
+        "ENCODE_WORKERS": int(os.getenv('OCR_ENCODE_WORKERS', 2))
     }
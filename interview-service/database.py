@@ -1,41 +1,60 @@
 from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+import asyncio
 import logging
+import time
 from pymongo.database import Database
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
 from config import get_settings
 import os
 
+# Sync client - kept for scripts and maintenance tasks
 _client = None
 _db = None
 
+# Async client - used by every route and background task
+_async_client = None
+_async_db = None
+
+
+def _get_mongodb_uri() -> str:
+    # Try to get from config first, then environment variable, then default
+    settings = get_settings()
+    env_uri = os.getenv("MONGODB_URI", "").strip()
+
+    # Get URI from settings or environment, handling empty strings
+    mongodb_uri = None
+    if settings.mongodb_uri and settings.mongodb_uri.strip():
+        mongodb_uri = settings.mongodb_uri.strip()
+    elif env_uri:
+        mongodb_uri = env_uri
+    else:
+        mongodb_uri = "mongodb://localhost:27017/"
+
+    # Validate URI has correct scheme
+    if not (mongodb_uri.startswith("mongodb://") or mongodb_uri.startswith("mongodb+srv://")):
+        # If invalid scheme, use default
+        logger = logging.getLogger("backend.database")
+        logger.warning(
+            f"Invalid MongoDB URI scheme '{mongodb_uri}', using default: mongodb://localhost:27017/"
+        )
+        mongodb_uri = "mongodb://localhost:27017/"
+
+    return mongodb_uri
+
+
+def _get_db_name() -> str:
+    settings = get_settings()
+    return settings.mongodb_db_name or os.getenv("MONGODB_DB_NAME", "ai_interviewer")
+
+
 def get_mongodb_client():
     global _client, _db
 
     if _client is None:
-        # Try to get from config first, then environment variable, then default
-        settings = get_settings()
-        env_uri = os.getenv("MONGODB_URI", "").strip()
-        
-        # Get URI from settings or environment, handling empty strings
-        mongodb_uri = None
-        if settings.mongodb_uri and settings.mongodb_uri.strip():
-            mongodb_uri = settings.mongodb_uri.strip()
-        elif env_uri:
-            mongodb_uri = env_uri
-        else:
-            mongodb_uri = "mongodb://localhost:27017/"
-        
-        # Validate URI has correct scheme
-        if not (mongodb_uri.startswith("mongodb://") or mongodb_uri.startswith("mongodb+srv://")):
-            # If invalid scheme, use default
-            logger = logging.getLogger("backend.database")
-            logger.warning(
-                f"Invalid MongoDB URI scheme '{mongodb_uri}', using default: mongodb://localhost:27017/"
-            )
-            mongodb_uri = "mongodb://localhost:27017/"
-        
+        mongodb_uri = _get_mongodb_uri()
         _client = MongoClient(mongodb_uri)
-        db_name = settings.mongodb_db_name or os.getenv("MONGODB_DB_NAME", "ai_interviewer")
+        db_name = _get_db_name()
         _db = _client[db_name]
 
         # Create indexes used by the application
@@ -52,17 +71,104 @@ def get_mongodb_client():
 
     return _db
 
+
 @contextmanager
-def get_db():
+def get_sync_db():
+    """Synchronous database access for scripts (not for request handlers)"""
     db = get_mongodb_client()
     try:
         yield db
     finally:
         pass
 
+
+def get_async_mongodb_client() -> AsyncIOMotorDatabase:
+    """Get or create the Motor database used by async code paths"""
+    global _async_client, _async_db
+
+    if _async_client is None:
+        settings = get_settings()
+        _async_client = AsyncIOMotorClient(
+            _get_mongodb_uri(),
+            maxPoolSize=settings.mongodb_max_pool_size,
+            minPoolSize=settings.mongodb_min_pool_size,
+            serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+            connectTimeoutMS=settings.mongodb_connect_timeout_ms,
+            socketTimeoutMS=settings.mongodb_socket_timeout_ms,
+        )
+        _async_db = _async_client[_get_db_name()]
+
+    return _async_db
+
+
+async def init_async_db():
+    """Create the async client, ensure indexes and log connection status on startup"""
+    db = get_async_mongodb_client()
+    logger = logging.getLogger("backend.database")
+
+    try:
+        await db.interview_sessions.create_index("id", unique=True)
+        await db.interview_sessions.create_index("user_id")
+        # One analytics document per session/candidate: concurrent upserts of
+        # the first batch race, and the loser retries as an update
+        await db.face_analytics.create_index([("session_id", 1), ("candidate_id", 1)], unique=True)
+        await db.face_event_buckets.create_index([("session_id", 1), ("candidate_id", 1), ("count", 1)])
+        await db.llm_response_cache.create_index("expires_at", expireAfterSeconds=0)
+        await db.audio_transcripts.create_index("expires_at", expireAfterSeconds=0)
+
+        await db.command("ping")
+        logger.info(
+            f"MongoDB (async) connected successfully -> DB: {db.name} "
+            f"pool={get_settings().mongodb_min_pool_size}-{get_settings().mongodb_max_pool_size}"
+        )
+    except Exception as e:
+        logger.warning(f"MongoDB (async) ping failed during startup: {e}")
+
+    return db
+
+
+@asynccontextmanager
+async def get_db():
+    db = get_async_mongodb_client()
+    try:
+        yield db
+    finally:
+        pass
+
+
+async def ping_async_db() -> dict:
+    """
+    Health probe for the async MongoDB client
+
+    Returns:
+        dict: {"ok": bool, "latency_ms": float, "error": str (if failed)}
+    """
+    settings = get_settings()
+    timeout = settings.mongodb_health_timeout_ms / 1000
+    started = time.perf_counter()
+
+    try:
+        db = get_async_mongodb_client()
+        await asyncio.wait_for(db.command("ping"), timeout=timeout)
+        return {
+            "ok": True,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+    except Exception as e:
+        return {
+            "ok": False,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "error": str(e) or type(e).__name__
+        }
+
+
 def close_db():
-    global _client, _db
+    global _client, _db, _async_client, _async_db
     if _client:
         _client.close()
         _client = None
         _db = None
+    if _async_client:
+        _async_client.close()
+        _async_client = None
+        _async_db = None
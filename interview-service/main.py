@@ -8,7 +8,7 @@ project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from fastapi import FastAPI, WebSocket, Request
+from fastapi import FastAPI, WebSocket, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from routes import session, upload, analyze, ocr
@@ -18,10 +18,18 @@ from routes import recommendations  # LLM Recommendations routes
 from routes import resume_assessment  # Resume Assessment routes
 from routes import adaptive  # Adaptive Learning routes
 from routes import face_events  # Face Events routes (deprecated - kept for backward compatibility)
+from routes import health  # Health probes
 from routes.face_detection_ws import face_monitor_websocket
-from database import get_mongodb_client
+from database import init_async_db, close_db
+from services.transcription_worker import start_transcription_workers, stop_transcription_workers
+from services.face_inference import stop_face_inference_service
+from services.audio_analysis import shutdown_audio_process_pool
+from services.llm_clients import close_llm_clients
+from services.llm_router import shutdown_llm_router
+from services.llm_metrics import metrics_payload
+from services.status_events import start_status_events, stop_status_events
 from config import get_ocr_config
-from middleware.auth import AuthMiddleware
+from middleware.auth import AuthMiddleware, authenticate_token
 
 app = FastAPI(title="AI Interviewer API")
 
@@ -44,6 +52,7 @@ app.include_router(recommendations.router)  # LLM Recommendations
 app.include_router(resume_assessment.router, prefix="/api")  # Resume Assessment
 app.include_router(adaptive.router, prefix="/api")  # Adaptive Learning routes
 app.include_router(face_events.router, prefix="/api")  # Face Events routes (deprecated)
+app.include_router(health.router, prefix="/api")  # Health probes
 
 # WebSocket route for face detection
 @app.websocket("/ws/monitor/{session_id}")
@@ -52,10 +61,6 @@ async def websocket_face_monitor(websocket: WebSocket, session_id: str):
     WebSocket endpoint for real-time face detection
     Requires authentication via query parameter
     """
-    import os
-    from jose import jwt
-    from bson import ObjectId
-    
     # Get token from query params
     token = websocket.query_params.get("token")
     
@@ -64,22 +69,12 @@ async def websocket_face_monitor(websocket: WebSocket, session_id: str):
         return
     
     try:
-        SECRET_KEY = os.getenv("JWT_SECRET")
-        ALGORITHM = "HS256"
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("id")
-        
-        if not user_id:
-            await websocket.close(code=1008, reason="Invalid token")
+        # Decode token and verify user exists (served from the auth cache when warm)
+        user = await authenticate_token(token)
+        if not user:
+            await websocket.close(code=1008, reason="User not found")
             return
-        
-        # Verify user exists
-        from database import get_db
-        with get_db() as db:
-            user = db.users.find_one({"_id": ObjectId(user_id)})
-            if not user:
-                await websocket.close(code=1008, reason="User not found")
-                return
+        user_id = user["_id"]
         
         # Start face monitoring
         await face_monitor_websocket(websocket, session_id, user_id)
@@ -89,6 +84,13 @@ async def websocket_face_monitor(websocket: WebSocket, session_id: str):
         await websocket.close(code=1008, reason="Authentication failed")
 
 
+# Prometheus scrape endpoint (LLM call metrics, see services/llm_metrics.py)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
+
 # Use absolute paths
 frontend_dir = project_root / "apps" / "frontend"
 uploads_dir = Path(__file__).parent / "uploads"
@@ -124,9 +126,32 @@ async def startup_event():
     except Exception as e:
         logger.warning(f"OCR service initialization warning: {e}")
     
-    # This will create the MongoClient and log connection status from database.py
+    # This will create the async MongoDB client and log connection status from database.py
     try:
-        get_mongodb_client()
+        await init_async_db()
     except Exception as e:
         logger.error(f"MongoDB connection failed: {e}")
         logger.warning("Application will continue but database features may not work")
+
+    # Start the transcription worker pool (jobs left over from a previous run are resumed)
+    try:
+        await start_transcription_workers()
+    except Exception as e:
+        logger.error(f"Failed to start transcription workers: {e}")
+
+    # Tail the status events collection when events are shared across workers
+    try:
+        await start_status_events()
+    except Exception as e:
+        logger.error(f"Failed to start status events: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_transcription_workers()
+    await stop_status_events()
+    shutdown_audio_process_pool()
+    stop_face_inference_service()
+    shutdown_llm_router()
+    await close_llm_clients()
+    close_db()
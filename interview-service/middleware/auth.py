@@ -2,7 +2,9 @@ from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from jose import jwt, JWTError
 from database import get_db
+from services.auth_cache import get_auth_cache
 from bson import ObjectId
+from typing import Dict, Optional
 import logging
 import os
 
@@ -11,6 +13,49 @@ ALGORITHM = "HS256"
 
 logger = logging.getLogger("backend.auth")
 
+
+async def authenticate_token(token: str) -> Optional[Dict]:
+    """
+    Resolve a JWT to its user document, using the auth cache
+
+    Raises:
+        JWTError: if the token is invalid or expired (on cache miss)
+
+    Returns:
+        Dict: User with string _id, or None if the user does not exist
+    """
+    auth_cache = get_auth_cache()
+
+    user = auth_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    logger.debug(f"JWT payload: {payload}")
+
+    user_id = payload.get("id")
+    logger.debug(f"User ID from token: {user_id}")
+
+    if not user_id:
+        logger.warning("No user ID in JWT payload")
+        return None
+
+    async with get_db() as db:
+        logger.debug(f"Looking up user in database: {db.name}")
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
+
+    if not user:
+        logger.warning(f"User not found in database: {user_id}")
+        # Deleted user: drop the entries of their other tokens too
+        auth_cache.invalidate_user(user_id)
+        return None
+
+    logger.debug(f"User found: {user.get('email')}")
+    user["_id"] = str(user["_id"])
+    auth_cache.set(token, user, token_exp=payload.get("exp"))
+    return dict(user)
+
+
 class AuthMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         request.state.user = None
@@ -21,26 +66,8 @@ class AuthMiddleware(BaseHTTPMiddleware):
             logger.debug(f"Token received: {token[:20]}...")
 
             try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                logger.debug(f"JWT payload: {payload}")
-                
-                user_id = payload.get("id") 
-                logger.debug(f"User ID from token: {user_id}")
-
-                if user_id:
-                    with get_db() as db:
-                        logger.debug(f"Looking up user in database: {db.name}")
-                        user = db.users.find_one({"_id": ObjectId(user_id)})
-                        
-                        if user:
-                            logger.debug(f"User found: {user.get('email')}")
-                            user["_id"] = str(user["_id"])
-                            request.state.user = user
-                        else:
-                            logger.warning(f"User not found in database: {user_id}")
-                else:
-                    logger.warning("No user ID in JWT payload")
-                    
+                request.state.user = await authenticate_token(token)
+
             except JWTError as e:
                 logger.error(f"JWT decode error: {e}")
             except Exception as e:
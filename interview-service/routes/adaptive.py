@@ -1,13 +1,18 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from config import get_settings
 from database import get_db
 from services.llm_service import generate_adaptive_questions, generate_reference_answer
+from services.evaluation_engine import precompute_reference_answers
+from services.llm_metrics import llm_context
+from services.context_digest import prompt_context
 from datetime import datetime
 import uuid
 
 router = APIRouter()
 
 @router.post("/interview/adaptive/{session_id}")
-async def create_adaptive_interview(session_id: str, request: Request):
+async def create_adaptive_interview(session_id: str, request: Request, background_tasks: BackgroundTasks):
     """
     Create 3 adaptive interview sessions when performance is below 8:
     1. Same questions retry
@@ -16,9 +21,9 @@ async def create_adaptive_interview(session_id: str, request: Request):
     """
     user_id = request.state.user["_id"]
     
-    with get_db() as db:
+    async with get_db() as db:
         # Get the previous session
-        previous_session = db.interview_sessions.find_one({
+        previous_session = await db.interview_sessions.find_one({
             "id": session_id,
             "user_id": user_id
         })
@@ -46,7 +51,7 @@ async def create_adaptive_interview(session_id: str, request: Request):
         
         # Session 1: Same questions retry
         retry_session_id = str(uuid.uuid4())
-        db.interview_sessions.insert_one({
+        await db.interview_sessions.insert_one({
             "id": retry_session_id,
             "user_id": user_id,
             "parent_session_id": session_id,
@@ -55,9 +60,12 @@ async def create_adaptive_interview(session_id: str, request: Request):
             "weak_areas": weak_areas,
             "job_description": previous_session.get("job_description", ""),
             "resume_text": previous_session.get("resume_text", ""),
+            "context_digest": previous_session.get("context_digest"),
             "duration_seconds": duration,
             "interview_type": interview_type,
             "questions": previous_questions,  # Same questions
+            # Same questions, JD and resume -> same model answers
+            "reference_answers": previous_session.get("reference_answers", {}),
             "status": "created",
             "answers": {},
             "final_score": None,
@@ -70,21 +78,28 @@ async def create_adaptive_interview(session_id: str, request: Request):
             "label": "Same Questions Review"
         })
         
+        if get_settings().precompute_reference_answers:
+            background_tasks.add_task(precompute_reference_answers, retry_session_id)
+        
         # Session 2 & 3: Generate new questions with focus on weak areas
+        jd_text, resume_text = prompt_context(previous_session)
         for idx, practice_type in enumerate(["practice1", "practice2"], start=1):
             # Generate adaptive questions for this set
-            adaptive_questions = generate_adaptive_questions(
-                weak_areas=weak_areas,
-                job_description=previous_session.get("job_description", ""),
-                resume_text=previous_session.get("resume_text", ""),
-                duration_seconds=duration,
-                interview_type=interview_type,
-                previous_questions=previous_questions,
-                practice_num=idx  # Different questions for each set
-            )
+            # Sync LLM path: run it off the event loop
+            with llm_context(session_id=session_id):
+                adaptive_questions = await run_in_threadpool(
+                    generate_adaptive_questions,
+                    weak_areas=weak_areas,
+                    job_description=jd_text,
+                    resume_text=resume_text,
+                    duration_seconds=duration,
+                    interview_type=interview_type,
+                    previous_questions=previous_questions,
+                    practice_num=idx  # Different questions for each set
+                )
             
             practice_session_id = str(uuid.uuid4())
-            db.interview_sessions.insert_one({
+            await db.interview_sessions.insert_one({
                 "id": practice_session_id,
                 "user_id": user_id,
                 "parent_session_id": session_id,
@@ -93,6 +108,7 @@ async def create_adaptive_interview(session_id: str, request: Request):
                 "weak_areas": weak_areas,
                 "job_description": previous_session.get("job_description", ""),
                 "resume_text": previous_session.get("resume_text", ""),
+                "context_digest": previous_session.get("context_digest"),
                 "duration_seconds": duration,
                 "interview_type": interview_type,
                 "questions": adaptive_questions,  # New questions
@@ -108,8 +124,11 @@ async def create_adaptive_interview(session_id: str, request: Request):
                 "label": f"Focused Learning - Set {idx}"
             })
             
+            if get_settings().precompute_reference_answers:
+                background_tasks.add_task(precompute_reference_answers, practice_session_id)
+            
             # Store adaptive learning record for each session
-            db.interview_adaptive_learning.insert_one({
+            await db.interview_adaptive_learning.insert_one({
                 "id": str(uuid.uuid4()),
                 "user_id": user_id,
                 "original_session_id": session_id,
@@ -122,7 +141,7 @@ async def create_adaptive_interview(session_id: str, request: Request):
             })
         
         # Store learning record for retry session
-        db.interview_adaptive_learning.insert_one({
+        await db.interview_adaptive_learning.insert_one({
             "id": str(uuid.uuid4()),
             "user_id": user_id,
             "original_session_id": session_id,
@@ -183,11 +202,11 @@ async def get_adaptive_sessions(user_id: str, request: Request):
     if user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
-    with get_db() as db:
-        sessions = list(db.interview_sessions.find({
+    async with get_db() as db:
+        sessions = await db.interview_sessions.find({
             "user_id": user_id,
             "is_adaptive": True
-        }).sort("created_at", -1))
+        }).sort("created_at", -1).to_list(length=None)
         
         for s in sessions:
             s.pop("_id", None)
@@ -206,10 +225,10 @@ async def get_learning_progress(user_id: str, request: Request):
     if user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
-    with get_db() as db:
-        records = list(db.interview_adaptive_learning.find({
+    async with get_db() as db:
+        records = await db.interview_adaptive_learning.find({
             "user_id": user_id
-        }).sort("created_at", -1))
+        }).sort("created_at", -1).to_list(length=None)
         
         progress_data = []
         
@@ -217,7 +236,7 @@ async def get_learning_progress(user_id: str, request: Request):
             record.pop("_id", None)
             
             # Get adaptive session score if completed
-            adaptive_session = db.interview_sessions.find_one({
+            adaptive_session = await db.interview_sessions.find_one({
                 "id": record["adaptive_session_id"]
             })
             
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from database import get_db
-from services.llm_service import evaluate_answer, generate_reference_answer
+from services.evaluation_engine import evaluate_session, store_answer_scores
+from services.background_tasks import expire_stale_recording
 from services.export_service import generate_pdf_report
+from services.status_events import publish_answer_status, SCORED
 from datetime import datetime
-import time
+import asyncio
 
 router = APIRouter()
 
@@ -14,11 +16,14 @@ async def analyze_session(session_id: str, request: Request):
     Analyze interview session and generate scores
     
     This endpoint:
-    1. Waits for any pending transcriptions to complete
-    2. Evaluates all transcribed answers
-    3. Generates reference answers
-    4. Calculates final score
-    5. Marks session as completed
+    1. Waits for any pending transcriptions to complete (segmented answers
+       abandoned while recording are finished with the segments received)
+    2. Evaluates all transcribed answers concurrently, reusing the
+       reference answers precomputed at session creation and generating
+       any that are missing (see services/evaluation_engine.py)
+    3. Calculates final score
+    4. Writes scores (only to answers still unscored) and marks session
+       as completed
     
     Note: If transcriptions are still processing, returns status info
     """
@@ -27,8 +32,8 @@ async def analyze_session(session_id: str, request: Request):
 
     while retries < 3:
         try:
-            with get_db() as db:
-                session = db.interview_sessions.find_one({
+            async with get_db() as db:
+                session = await db.interview_sessions.find_one({
                     "id": session_id,
                     "user_id": user_id
                 })
@@ -36,6 +41,17 @@ async def analyze_session(session_id: str, request: Request):
                 if not session:
                     raise HTTPException(status_code=404, detail="Session not found")
 
+                # Segmented answers the client never completed are finished
+                # with what was received instead of staying pending forever
+                expired = False
+                for question_id, ans in (session.get("answers") or {}).items():
+                    expired |= await expire_stale_recording(session_id, question_id, ans)
+                if expired:
+                    session = await db.interview_sessions.find_one({
+                        "id": session_id,
+                        "user_id": user_id
+                    })
+
                 # Check if any transcriptions are still pending
                 answers_dict = session.get("answers", {})
                 pending_count = 0
@@ -43,7 +59,7 @@ async def analyze_session(session_id: str, request: Request):
                 
                 for ans in answers_dict.values():
                     status = ans.get("transcription_status", "completed")
-                    if status == "queued":
+                    if status in ("queued", "recording"):
                         pending_count += 1
                     elif status == "processing":
                         processing_count += 1
@@ -55,83 +71,21 @@ async def analyze_session(session_id: str, request: Request):
                         "message": f"Waiting for {pending_count + processing_count} transcriptions to complete",
                         "pending_count": pending_count,
                         "processing_count": processing_count,
-                        "retry_after": 5  # Suggest retry after 5 seconds
-                    }
-
-                questions = session.get("questions", [])
-                interview_type = session.get("interview_type", "technical")
-                jd_text = session.get("job_description", "")
-                resume_text = session.get("resume_text", "")
-
-                # Get answers from session document
-                answers = list(answers_dict.values()) if isinstance(answers_dict, dict) else []
-                q_map = {q["id"]: q.get("text", "") for q in questions}
-
-                total_score = 0
-                scored_count = 0
-                reference_cache = {}
-                updates = {}
-
-                for ans in answers:
-                    # Skip if already scored or no transcript
-                    if ans.get("score") is not None:
-                        # Count already scored answers
-                        total_score += ans.get("score", 0)
-                        scored_count += 1
-                        continue
-                    
-                    if not ans.get("transcript"):
-                        continue
-
-                    qid = ans.get("question_id")
-                    question_text = q_map.get(qid)
-                    if not question_text:
-                        continue
-
-                    if qid not in reference_cache:
-                        reference_cache[qid] = generate_reference_answer(
-                            question_text,
-                            jd_text,
-                            resume_text,
-                            interview_type
-                        )
-
-                    evaluation = evaluate_answer(
-                        question_text,
-                        ans["transcript"],
-                        reference_cache[qid],
-                        interview_type
-                    )
-
-                    score = evaluation.get("total_score") or evaluation.get("score") or 0
-                    feedback = evaluation.get("feedback", [])
-
-                    total_score += score
-                    scored_count += 1
-
-                    # Store update for this answer
-                    updates[qid] = {
-                        "score": score,
-                        "feedback": feedback,
-                        "model_answer": reference_cache[qid]
+                        "retry_after": 5,  # Suggest retry after 5 seconds
+                        # Or wait for the "completed" events instead of retrying blind
+                        "events_url": f"/api/transcription-events/{session_id}"
                     }
 
-                # Update all answers at once
-                for qid, update_data in updates.items():
-                    db.interview_sessions.update_one(
-                        {"id": session_id},
-                        {"$set": {
-                            f"answers.{qid}.score": update_data["score"],
-                            f"answers.{qid}.feedback": update_data["feedback"],
-                            f"answers.{qid}.model_answer": update_data["model_answer"]
-                        }}
-                    )
+                result = await evaluate_session(session)
+                stored = await store_answer_scores(session, result)
+                total_score = stored["total_score"]
+                scored_count = stored["scored_count"]
 
                 final_score = round(
                     total_score / scored_count, 2
                 ) if scored_count > 0 else 0
 
-                db.interview_sessions.update_one(
+                await db.interview_sessions.update_one(
                     {"id": session_id},
                     {"$set": {
                         "status": "completed",
@@ -140,15 +94,22 @@ async def analyze_session(session_id: str, request: Request):
                     }}
                 )
 
+            for question_id, update_data in stored["updates"].items():
+                await publish_answer_status(session_id, question_id, SCORED, score=update_data["score"])
+
             return {
                 "status": "success",
                 "final_score": final_score,
-                "scored_count": scored_count
+                "scored_count": scored_count,
+                "failed_questions": list(result["failed"].keys()),
+                "evaluation": result["evaluation"]
             }
 
+        except HTTPException:
+            raise
         except Exception as e:
             retries += 1
-            time.sleep(0.2 * retries)
+            await asyncio.sleep(0.2 * retries)
             if retries == 3:
                 raise HTTPException(status_code=500, detail=str(e))
 
@@ -157,8 +118,8 @@ async def analyze_session(session_id: str, request: Request):
 async def export_pdf(session_id: str, request: Request):
     user_id = request.state.user["_id"]
 
-    with get_db() as db:
-        session = db.interview_sessions.find_one({
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one({
             "id": session_id,
             "user_id": user_id
         })
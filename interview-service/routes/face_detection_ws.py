@@ -4,38 +4,74 @@ Real-time face detection using MediaPipe via WebSocket
 Simplified version with alert counting
 """
 
+import asyncio
+import json
 import time
-import base64
-import cv2
-import numpy as np
-import mediapipe as mp
 from fastapi import WebSocket, WebSocketDisconnect
 from database import get_db
+from services.evaluation_engine import evaluate_session, store_answer_scores
+from services.face_inference import get_face_inference_service, parse_binary_frame
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
-# MediaPipe face detector (global instance removed - now created per connection)
-mp_face = mp.solutions.face_detection
-
 
 async def face_monitor_websocket(websocket: WebSocket, session_id: str, user_id: str):
     """
     Production-ready WebSocket face monitoring
-    - Thread-safe (per-connection MediaPipe)
+    - Inference runs on the shared detector pool (services/face_inference.py),
+      never on the event loop
+    - Only the newest frame per connection is kept; frames that arrive while
+      the previous one is still being processed are dropped, not queued
     - Fair alert logic (time-based, not frame-based)
     - Stable multiple-face detection
-    - Scales to 100+ concurrent users
+
+    Frame protocol:
+    - Binary message: 13-byte header (see FRAME_HEADER in
+      services/face_inference.py) followed by raw JPEG bytes
+    - Text message (fallback): JSON {"frame": "<base64 JPEG>", "seq": optional}
+    The frame's seq (if any) is echoed back in the response.
     """
     await websocket.accept()
     logger.info(f"✅ WebSocket connected for session {session_id}")
 
-    # ✅ MediaPipe per connection (CRITICAL)
-    face_detector = mp.solutions.face_detection.FaceDetection(
-        model_selection=0,
-        min_detection_confidence=0.6
-    )
+    inference = get_face_inference_service()
+
+    # Latest unprocessed frame (older ones are overwritten)
+    pending = {"frame": None, "seq": None}
+    frame_ready = asyncio.Event()
+
+    async def receive_frames():
+        while True:
+            ws_message = await websocket.receive()
+            if ws_message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(ws_message.get("code", 1000))
+
+            if ws_message.get("bytes") is not None:
+                try:
+                    seq, _, frame = parse_binary_frame(ws_message["bytes"])
+                except ValueError:
+                    continue
+            elif ws_message.get("text"):
+                try:
+                    data = json.loads(ws_message["text"])
+                except ValueError:
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                frame = data.get("frame")
+                seq = data.get("seq")
+            else:
+                continue
+
+            if not frame:
+                continue
+            pending["frame"] = frame
+            pending["seq"] = seq
+            frame_ready.set()
+
+    receiver = asyncio.create_task(receive_frames())
 
     # ---- State ----
     alert_count = 0
@@ -52,25 +88,25 @@ async def face_monitor_websocket(websocket: WebSocket, session_id: str, user_id:
 
     try:
         while True:
-            data = await websocket.receive_json()
-            frame_b64 = data.get("frame")
-            if not frame_b64:
+            ready_wait = asyncio.create_task(frame_ready.wait())
+            await asyncio.wait({receiver, ready_wait}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver.done():
+                ready_wait.cancel()
+                # Re-raise WebSocketDisconnect / receive errors
+                receiver.result()
+
+            frame = pending["frame"]
+            seq = pending["seq"]
+            pending["frame"] = None
+            frame_ready.clear()
+
+            # ---- Detect faces on the shared pool ----
+            detection = await inference.detect(frame)
+            if detection is None:
+                # Undecodable, stale, or dropped under backpressure
                 continue
 
-            # ---- Decode frame safely ----
-            try:
-                frame_bytes = base64.b64decode(frame_b64)
-                frame_np = np.frombuffer(frame_bytes, dtype=np.uint8)
-                frame = cv2.imdecode(frame_np, cv2.IMREAD_COLOR)
-                if frame is None:
-                    continue
-            except Exception:
-                continue
-
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_detector.process(rgb)
-
-            face_count = len(results.detections) if results.detections else 0
+            face_count = detection["face_count"]
             now = time.time()
 
             status = "ok"
@@ -146,7 +182,9 @@ async def face_monitor_websocket(websocket: WebSocket, session_id: str, user_id:
                     "status": status,
                     "message": message,
                     "face_count": face_count,
-                    "alert_count": alert_count
+                    "alert_count": alert_count,
+                    "latency_ms": detection["latency_ms"],
+                    "seq": seq
                 })
                 break
 
@@ -155,7 +193,9 @@ async def face_monitor_websocket(websocket: WebSocket, session_id: str, user_id:
                 "status": status,
                 "message": message,
                 "face_count": face_count,
-                "alert_count": alert_count
+                "alert_count": alert_count,
+                "latency_ms": detection["latency_ms"],
+                "seq": seq
             })
 
     except WebSocketDisconnect:
@@ -165,6 +205,7 @@ async def face_monitor_websocket(websocket: WebSocket, session_id: str, user_id:
         logger.error(f"WebSocket error for session {session_id}: {e}")
 
     finally:
+        receiver.cancel()
         try:
             await websocket.close()
         except Exception:
@@ -178,8 +219,8 @@ async def terminate_interview(session_id: str, user_id: str, reason: str):
     Terminate interview and generate feedback with termination reason
     """
     try:
-        with get_db() as db:
-            session = db.interview_sessions.find_one({
+        async with get_db() as db:
+            session = await db.interview_sessions.find_one({
                 "id": session_id,
                 "user_id": user_id
             })
@@ -188,80 +229,21 @@ async def terminate_interview(session_id: str, user_id: str, reason: str):
                 logger.error(f"Session {session_id} not found for termination")
                 return
 
-            questions = session.get("questions", [])
-            interview_type = session.get("interview_type", "technical")
-            jd_text = session.get("job_description", "")
-            resume_text = session.get("resume_text", "")
-
-            # Get answers from session
-            answers_dict = session.get("answers", {})
-            answers = list(answers_dict.values()) if isinstance(answers_dict, dict) else []
-            q_map = {q["id"]: q.get("text", "") for q in questions}
+            result = await evaluate_session(session)
 
-            total_score = 0
-            scored_count = 0
-            reference_cache = {}
-            updates = {}
+            # Add termination reason to feedback
+            for update_data in result["updates"].values():
+                update_data["feedback"].append(f"⚠️ Interview terminated: {reason}")
 
-            # Evaluate existing answers
-            for ans in answers:
-                if ans.get("score") is not None or not ans.get("transcript"):
-                    continue
-
-                qid = ans.get("question_id")
-                question_text = q_map.get(qid)
-                if not question_text:
-                    continue
-
-                if qid not in reference_cache:
-                    from services.llm_service import generate_reference_answer
-                    reference_cache[qid] = generate_reference_answer(
-                        question_text,
-                        jd_text,
-                        resume_text,
-                        interview_type
-                    )
-
-                from services.llm_service import evaluate_answer
-                evaluation = evaluate_answer(
-                    question_text,
-                    ans["transcript"],
-                    reference_cache[qid],
-                    interview_type
-                )
-
-                score = evaluation.get("total_score") or evaluation.get("score") or 0
-                feedback = evaluation.get("feedback", [])
-
-                # Add termination reason to feedback
-                feedback.append(f"⚠️ Interview terminated: {reason}")
-
-                total_score += score
-                scored_count += 1
-
-                updates[qid] = {
-                    "score": score,
-                    "feedback": feedback,
-                    "model_answer": reference_cache[qid]
-                }
-
-            # Update all answers
-            for qid, update_data in updates.items():
-                db.interview_sessions.update_one(
-                    {"id": session_id},
-                    {"$set": {
-                        f"answers.{qid}.score": update_data["score"],
-                        f"answers.{qid}.feedback": update_data["feedback"],
-                        f"answers.{qid}.model_answer": update_data["model_answer"]
-                    }}
-                )
+            stored = await store_answer_scores(session, result)
+            total_score = stored["total_score"]
+            scored_count = stored["scored_count"]
 
             final_score = round(
                 total_score / scored_count, 2
             ) if scored_count > 0 else 0
 
-            # Mark session as terminated
-            db.interview_sessions.update_one(
+            await db.interview_sessions.update_one(
                 {"id": session_id},
                 {"$set": {
                     "status": "terminated",
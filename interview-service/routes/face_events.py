@@ -1,17 +1,254 @@
 """
 Face Events API Routes for Interview Service
 Handles face detection events and analytics storage via Python backend
+
+Events are appended to the time-ordered `face_event_buckets` collection
+(at most FACE_EVENT_BUCKET_SIZE events per bucket) with $push/$inc, so
+ingestion never rewrites the growing log. The `face_analytics` document
+only holds per-session state: running aggregates (maintained with $inc
+as events arrive, so summaries are O(1) reads), risk level and summary.
+Documents written before bucketing still carry embedded logs; they are
+read alongside the buckets until backfill_face_aggregates.py has
+computed their aggregates.
 """
 
 from fastapi import APIRouter, HTTPException, Request, status
 from datetime import datetime
+from typing import Dict, Iterable, List
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from models import FaceAnalyticsModel, PresenceLog, AttentionLog, EmotionLog, AntiCheatIncident
 from database import get_db
+from config import get_settings
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Bumped when the shape of `aggregates` changes; documents without the
+# current version fall back to scanning their logs
+AGGREGATES_VERSION = 1
+
+# Bucket field -> section of the (legacy) face_analytics document holding it
+LOG_SECTIONS = {
+    "presenceLogs": "presence",
+    "attentionLogs": "attention",
+    "emotionTimeline": "emotion",
+    "incidents": "antiCheat"
+}
+
+
+def _parse_timestamp(value) -> datetime:
+    """Client timestamp (epoch ms or ISO string) -> datetime, default now"""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            pass
+    return datetime.now()
+
+
+def _build_entries(body: Dict) -> Dict[str, List[Dict]]:
+    """
+    Convert one event payload into log entries keyed by bucket field
+
+    Payload keys: presence, attention, emotion, anti_cheat and an optional
+    timestamp (epoch ms or ISO string; defaults to receive time).
+    """
+    timestamp = _parse_timestamp(body.get("timestamp"))
+    entries = {field: [] for field in LOG_SECTIONS}
+
+    presence_data = body.get("presence")
+    attention_data = body.get("attention")
+    emotion_data = body.get("emotion")
+    anti_cheat_data = body.get("anti_cheat")
+
+    if presence_data:
+        entries["presenceLogs"].append({
+            "timestamp": timestamp,
+            "detected": presence_data.get("detected"),
+            "confidence": presence_data.get("confidence"),
+            "faceCount": presence_data.get("faceCount", 0)
+        })
+
+    if attention_data:
+        entries["attentionLogs"].append({
+            "timestamp": timestamp,
+            "lookingAway": attention_data.get("lookingAway"),
+            "headRotation": attention_data.get("headRotation"),
+            "eyeAspectRatio": attention_data.get("eyeAspectRatio"),
+            "eyesOpen": attention_data.get("eyesOpen"),
+            "attentionScore": attention_data.get("attentionScore")
+        })
+
+    if emotion_data and emotion_data.get("dominantEmotion"):
+        entries["emotionTimeline"].append({
+            "timestamp": timestamp,
+            "emotion": emotion_data.get("dominantEmotion"),
+            "confidence": emotion_data.get("dominantEmotionScore"),
+            "confidenceIndicator": emotion_data.get("confidenceIndicator")
+        })
+
+    if anti_cheat_data and anti_cheat_data.get("alerts"):
+        for alert in anti_cheat_data["alerts"]:
+            entries["incidents"].append({
+                "timestamp": timestamp,
+                "type": alert.get("type"),
+                "severity": alert.get("severity"),
+                "description": alert.get("message")
+            })
+
+    return entries
+
+
+async def _ingest_events(db, session_id: str, candidate_id: str, payloads: List[Dict]) -> Dict:
+    """
+    Append a batch of event payloads atomically
+
+    Returns:
+        dict: Per-log event counters of the session after this batch
+    """
+    entries = {field: [] for field in LOG_SECTIONS}
+    anti_cheat_state = {}
+
+    for body in payloads:
+        for field, items in _build_entries(body).items():
+            entries[field].extend(items)
+
+        anti_cheat_data = body.get("anti_cheat")
+        if anti_cheat_data and anti_cheat_data.get("alerts"):
+            anti_cheat_state = {
+                "antiCheat.cheatingRiskLevel": anti_cheat_data.get("riskLevel", "LOW"),
+                "antiCheat.multipleFacesDetected": anti_cheat_data.get("faceCount", 0)
+            }
+
+    now = datetime.now()
+    total = sum(len(items) for items in entries.values())
+
+    if total:
+        timestamps = [item["timestamp"] for items in entries.values() for item in items]
+
+        # Fill the open bucket; a new one is upserted once it reaches the size limit
+        await db.face_event_buckets.update_one(
+            {
+                "session_id": session_id,
+                "candidate_id": candidate_id,
+                "count": {"$lt": get_settings().face_event_bucket_size}
+            },
+            {
+                "$push": {
+                    field: {"$each": items}
+                    for field, items in entries.items() if items
+                },
+                "$inc": {"count": total},
+                "$min": {"first_event_at": min(timestamps)},
+                "$max": {"last_event_at": max(timestamps)},
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        )
+
+    update = {
+        "$set": {"updated_at": now, **anti_cheat_state},
+        "$setOnInsert": {"created_at": now, "aggregates_version": AGGREGATES_VERSION}
+    }
+    deltas = aggregate_deltas(entries)
+    if deltas:
+        update["$inc"] = {f"aggregates.{path}": value for path, value in deltas.items()}
+
+    for attempt in range(2):
+        try:
+            analytics = await db.face_analytics.find_one_and_update(
+                {"session_id": session_id, "candidate_id": candidate_id},
+                update,
+                projection={"aggregates": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            break
+        except DuplicateKeyError:
+            # Another batch inserted the document first (unique index on
+            # session_id + candidate_id); the retry updates it
+            if attempt:
+                raise
+
+    return analytics.get("aggregates", {})
+
+
+def _ingest_response(session_id: str, aggregates: Dict, accepted: int) -> Dict:
+    return {
+        "success": True,
+        "message": "Face events recorded",
+        "data": {
+            "session_id": session_id,
+            "accepted": accepted,
+            "presence_logs": aggregates.get("presence", {}).get("total", 0),
+            "attention_logs": aggregates.get("attention", {}).get("count", 0),
+            "emotion_logs": aggregates.get("emotion", {}).get("total", 0),
+            "anti_cheat_incidents": aggregates.get("incidents", {}).get("total", 0)
+        }
+    }
+
+
+async def _load_buckets(db, session_id: str, candidate_id: str) -> List[Dict]:
+    cursor = db.face_event_buckets.find(
+        {"session_id": session_id, "candidate_id": candidate_id},
+        {"_id": 0, **{field: 1 for field in LOG_SECTIONS}}
+    ).sort([("first_event_at", 1), ("_id", 1)])
+    return await cursor.to_list(length=None)
+
+
+async def _read_analytics(db, session_id: str, candidate_id: str, include_logs: bool = False):
+    """
+    Load a session's analytics document and its summary
+
+    Uses the running aggregates when the document has them (no log reads
+    unless `include_logs`); otherwise scans the legacy logs and buckets.
+
+    Returns:
+        tuple: (analytics, summary), analytics is None if not found
+    """
+    query = {"session_id": session_id, "candidate_id": candidate_id}
+    log_projection = None if include_logs else {
+        f"{section}.{field}": 0 for field, section in LOG_SECTIONS.items()
+    }
+
+    analytics = await db.face_analytics.find_one(query, log_projection)
+    if not analytics:
+        return None, None
+
+    buckets = None
+    if analytics.get("aggregates_version") == AGGREGATES_VERSION:
+        summary = summary_from_aggregates(analytics.get("aggregates", {}))
+    else:
+        if log_projection:
+            analytics = await db.face_analytics.find_one(query)
+        buckets = await _load_buckets(db, session_id, candidate_id)
+        summary = calculate_summary(analytics, buckets)
+
+    if include_logs:
+        if buckets is None:
+            buckets = await _load_buckets(db, session_id, candidate_id)
+        analytics = _merge_logs(analytics, buckets)
+    else:
+        for field, section in LOG_SECTIONS.items():
+            analytics.get(section, {}).pop(field, None)
+
+    return analytics, summary
+
+
+def _merge_logs(analytics: Dict, buckets: Iterable[Dict]) -> Dict:
+    """Attach the full event logs (legacy embedded + bucketed) to `analytics`"""
+    for field, section in LOG_SECTIONS.items():
+        merged = list(analytics.get(section, {}).get(field, []))
+        for bucket in buckets:
+            merged.extend(bucket.get(field, []))
+        analytics.setdefault(section, {})[field] = merged
+    return analytics
+
+
 @router.post("/face-events/{session_id}")
 async def record_face_events(session_id: str, request: Request):
     """
@@ -24,139 +261,82 @@ async def record_face_events(session_id: str, request: Request):
       - attention: Attention tracking data
       - emotion: Emotion analysis data
       - anti_cheat: Anti-cheating indicators
+      - timestamp: Optional client timestamp (epoch ms or ISO string)
     """
     user_id = request.state.user["_id"]
     
     try:
         body = await request.json()
-        presence_data = body.get("presence")
-        attention_data = body.get("attention")
-        emotion_data = body.get("emotion")
-        anti_cheat_data = body.get("anti_cheat")
         
-        with get_db() as db:
-            # Find or create face analytics record
-            analytics = db.face_analytics.find_one({
-                "session_id": session_id,
-                "candidate_id": str(user_id)
-            })
-            
-            if not analytics:
-                analytics = {
-                    "session_id": session_id,
-                    "candidate_id": str(user_id),
-                    "presence": {"presenceLogs": []},
-                    "attention": {"attentionLogs": []},
-                    "emotion": {"emotionTimeline": []},
-                    "antiCheat": {"incidents": []},
-                    "created_at": datetime.now(),
-                    "updated_at": datetime.now()
-                }
-            
-            # Update presence logs
-            if presence_data:
-                if "presenceLogs" not in analytics.get("presence", {}):
-                    analytics["presence"] = analytics.get("presence", {})
-                    analytics["presence"]["presenceLogs"] = []
-                
-                analytics["presence"]["presenceLogs"].append({
-                    "timestamp": datetime.now(),
-                    "detected": presence_data.get("detected"),
-                    "confidence": presence_data.get("confidence"),
-                    "faceCount": presence_data.get("faceCount", 0)
-                })
-            
-            # Update attention logs
-            if attention_data:
-                if "attentionLogs" not in analytics.get("attention", {}):
-                    analytics["attention"] = analytics.get("attention", {})
-                    analytics["attention"]["attentionLogs"] = []
-                
-                analytics["attention"]["attentionLogs"].append({
-                    "timestamp": datetime.now(),
-                    "lookingAway": attention_data.get("lookingAway"),
-                    "headRotation": attention_data.get("headRotation"),
-                    "eyeAspectRatio": attention_data.get("eyeAspectRatio"),
-                    "eyesOpen": attention_data.get("eyesOpen"),
-                    "attentionScore": attention_data.get("attentionScore")
-                })
-            
-            # Update emotion logs
-            if emotion_data and emotion_data.get("dominantEmotion"):
-                if "emotionTimeline" not in analytics.get("emotion", {}):
-                    analytics["emotion"] = analytics.get("emotion", {})
-                    analytics["emotion"]["emotionTimeline"] = []
-                
-                analytics["emotion"]["emotionTimeline"].append({
-                    "timestamp": datetime.now(),
-                    "emotion": emotion_data.get("dominantEmotion"),
-                    "confidence": emotion_data.get("dominantEmotionScore"),
-                    "confidenceIndicator": emotion_data.get("confidenceIndicator")
-                })
-            
-            # Update anti-cheat incidents
-            if anti_cheat_data and anti_cheat_data.get("alerts"):
-                if "incidents" not in analytics.get("antiCheat", {}):
-                    analytics["antiCheat"] = analytics.get("antiCheat", {})
-                    analytics["antiCheat"]["incidents"] = []
-                
-                for alert in anti_cheat_data["alerts"]:
-                    analytics["antiCheat"]["incidents"].append({
-                        "timestamp": datetime.now(),
-                        "type": alert.get("type"),
-                        "severity": alert.get("severity"),
-                        "description": alert.get("message")
-                    })
-                
-                analytics["antiCheat"]["cheatingRiskLevel"] = anti_cheat_data.get("riskLevel", "LOW")
-                analytics["antiCheat"]["multipleFacesDetected"] = anti_cheat_data.get("faceCount", 0)
+        async with get_db() as db:
+            aggregates = await _ingest_events(db, session_id, str(user_id), [body])
             
-            analytics["updated_at"] = datetime.now()
-            
-            # Save or update record
-            if "_id" in analytics:
-                db.face_analytics.update_one(
-                    {"_id": analytics["_id"]},
-                    {"$set": analytics}
-                )
-            else:
-                result = db.face_analytics.insert_one(analytics)
-                analytics["_id"] = result.inserted_id
+        logger.info(f"Face events recorded for session {session_id}")
+        
+        return _ingest_response(session_id, aggregates, accepted=1)
             
-            logger.info(f"Face events recorded for session {session_id}")
+    except Exception as e:
+        logger.error(f"Error recording face events: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error recording face events: {str(e)}"
+        )
+
+@router.post("/face-events/{session_id}/batch")
+async def record_face_events_batch(session_id: str, request: Request):
+    """
+    Record a batch of face detection events in one call
+    
+    Request body: {"events": [<payload as for POST /face-events/{session_id}>, ...]}
+    (at most FACE_EVENT_MAX_BATCH events). Each event should carry its own
+    client timestamp.
+    """
+    user_id = request.state.user["_id"]
+    
+    body = await request.json()
+    events = body.get("events") if isinstance(body, dict) else None
+    
+    if not isinstance(events, list) or not all(isinstance(e, dict) for e in events):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be {\"events\": [ ... ]}"
+        )
+    
+    max_batch = get_settings().face_event_max_batch
+    if len(events) > max_batch:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {max_batch} events per batch"
+        )
+    
+    try:
+        async with get_db() as db:
+            aggregates = await _ingest_events(db, session_id, str(user_id), events)
             
-            return {
-                "success": True,
-                "message": "Face events recorded",
-                "data": {
-                    "session_id": session_id,
-                    "presence_logs": len(analytics.get("presence", {}).get("presenceLogs", [])),
-                    "attention_logs": len(analytics.get("attention", {}).get("attentionLogs", [])),
-                    "emotion_logs": len(analytics.get("emotion", {}).get("emotionTimeline", [])),
-                    "anti_cheat_incidents": len(analytics.get("antiCheat", {}).get("incidents", []))
-                }
-            }
+        logger.info(f"{len(events)} face events recorded for session {session_id}")
+        
+        return _ingest_response(session_id, aggregates, accepted=len(events))
             
     except Exception as e:
-        logger.error(f"Error recording face events: {str(e)}")
+        logger.error(f"Error recording face events batch: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error recording face events: {str(e)}"
         )
 
 @router.get("/face-analytics/{session_id}")
-async def get_face_analytics(session_id: str, request: Request):
+async def get_face_analytics(session_id: str, request: Request, include_logs: bool = False):
     """
     Retrieve face analytics for a session
+    
+    The summary comes from the running aggregates. Event logs are only
+    returned with ?include_logs=true.
     """
     user_id = request.state.user["_id"]
     
     try:
-        with get_db() as db:
-            analytics = db.face_analytics.find_one({
-                "session_id": session_id,
-                "candidate_id": str(user_id)
-            })
+        async with get_db() as db:
+            analytics, summary = await _read_analytics(db, session_id, str(user_id), include_logs)
             
             if not analytics:
                 raise HTTPException(
@@ -166,9 +346,6 @@ async def get_face_analytics(session_id: str, request: Request):
             
             # Convert ObjectId to string for JSON serialization
             analytics["_id"] = str(analytics["_id"])
-            
-            # Calculate summary
-            summary = calculate_summary(analytics)
             analytics["summary"] = summary
             
             return {
@@ -186,18 +363,15 @@ async def get_face_analytics(session_id: str, request: Request):
         )
 
 @router.post("/face-analytics/{session_id}/finalize")
-async def finalize_face_analytics(session_id: str, request: Request):
+async def finalize_face_analytics(session_id: str, request: Request, include_logs: bool = False):
     """
     Finalize and calculate final analytics for a session
     """
     user_id = request.state.user["_id"]
     
     try:
-        with get_db() as db:
-            analytics = db.face_analytics.find_one({
-                "session_id": session_id,
-                "candidate_id": str(user_id)
-            })
+        async with get_db() as db:
+            analytics, summary = await _read_analytics(db, session_id, str(user_id), include_logs)
             
             if not analytics:
                 raise HTTPException(
@@ -205,15 +379,13 @@ async def finalize_face_analytics(session_id: str, request: Request):
                     detail="Analytics not found"
                 )
             
-            # Calculate final summary
-            summary = calculate_summary(analytics)
             analytics["summary"] = summary
             analytics["updated_at"] = datetime.now()
             
-            # Save
-            db.face_analytics.update_one(
+            # Save (only the summary - the event logs are never rewritten)
+            await db.face_analytics.update_one(
                 {"_id": analytics["_id"]},
-                {"$set": analytics}
+                {"$set": {"summary": summary, "updated_at": analytics["updated_at"]}}
             )
             
             logger.info(f"Face analytics finalized for session {session_id}")
@@ -235,47 +407,102 @@ async def finalize_face_analytics(session_id: str, request: Request):
             detail=f"Error finalizing analytics: {str(e)}"
         )
 
-def calculate_summary(analytics: dict) -> dict:
+def _aggregate_key(value) -> str:
+    """Make an emotion / severity label safe to use as a document key"""
+    return str(value or "UNKNOWN").replace(".", "_").replace("$", "_")
+
+def aggregate_deltas(entries: Dict[str, Iterable[dict]]) -> Dict[str, float]:
     """
-    Calculate summary statistics from analytics data
+    Running-aggregate increments for a set of log entries
+    
+    Args:
+        entries: Log entries keyed by bucket field (presenceLogs, ...)
+    
+    Returns:
+        dict: Dotted paths under `aggregates` -> increment
+    """
+    deltas = {}
+    
+    def inc(path, amount=1):
+        deltas[path] = deltas.get(path, 0) + amount
+    
+    for p in entries.get("presenceLogs", ()):
+        inc("presence.total")
+        if p.get("detected"):
+            inc("presence.detected")
+    
+    for a in entries.get("attentionLogs", ()):
+        inc("attention.count")
+        inc("attention.sum", a.get("attentionScore", 0) or 0)
+    
+    for e in entries.get("emotionTimeline", ()):
+        inc("emotion.total")
+        inc(f"emotion.counts.{_aggregate_key(e.get('emotion'))}")
+    
+    for i in entries.get("incidents", ()):
+        inc("incidents.total")
+        inc(f"incidents.severity.{_aggregate_key(i.get('severity'))}")
+    
+    return deltas
+
+def compute_aggregates(analytics: dict, buckets: Iterable[dict] = ()) -> dict:
+    """
+    Compute the aggregates of a session from scratch by scanning its logs
+    (legacy embedded arrays of `analytics` plus its event `buckets`)
+    """
+    buckets = list(buckets)
+    
+    def logs(field):
+        section = LOG_SECTIONS[field]
+        yield from analytics.get(section, {}).get(field, [])
+        for bucket in buckets:
+            yield from bucket.get(field, [])
+    
+    aggregates = {}
+    deltas = aggregate_deltas({field: logs(field) for field in LOG_SECTIONS})
+    for path, value in deltas.items():
+        node = aggregates
+        *parents, leaf = path.split(".")
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = value
+    return aggregates
+
+def summary_from_aggregates(aggregates: dict) -> dict:
+    """
+    Summary statistics from running aggregates (O(1))
     """
     summary = {}
     
     # Presence percentage
-    presence_logs = analytics.get("presence", {}).get("presenceLogs", [])
-    if presence_logs:
-        detected = len([p for p in presence_logs if p.get("detected")])
-        summary["presencePercentage"] = round((detected / len(presence_logs)) * 100, 2)
-    else:
-        summary["presencePercentage"] = 0
+    presence = aggregates.get("presence", {})
+    presence_total = presence.get("total", 0)
+    summary["presencePercentage"] = round((presence.get("detected", 0) / presence_total) * 100, 2) if presence_total else 0
     
     # Attention score
-    attention_logs = analytics.get("attention", {}).get("attentionLogs", [])
-    if attention_logs:
-        scores = [a.get("attentionScore", 0) for a in attention_logs]
-        summary["attentionScore"] = round(sum(scores) / len(scores), 2) if scores else 0
-    else:
-        summary["attentionScore"] = 0
+    attention = aggregates.get("attention", {})
+    attention_count = attention.get("count", 0)
+    summary["attentionScore"] = round(attention.get("sum", 0) / attention_count, 2) if attention_count else 0
     
     # Emotional consistency
-    emotion_timeline = analytics.get("emotion", {}).get("emotionTimeline", [])
-    if emotion_timeline:
-        emotion_counts = {}
-        for e in emotion_timeline:
-            emotion = e.get("emotion")
-            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-        
-        max_count = max(emotion_counts.values()) if emotion_counts else 0
-        summary["emotionalConsistency"] = round((max_count / len(emotion_timeline)) * 100, 2) if emotion_timeline else 0
-    else:
-        summary["emotionalConsistency"] = 0
+    emotion = aggregates.get("emotion", {})
+    emotion_total = emotion.get("total", 0)
+    max_count = max(emotion.get("counts", {}).values(), default=0)
+    summary["emotionalConsistency"] = round((max_count / emotion_total) * 100, 2) if emotion_total else 0
     
     # Overall suspicion score
-    summary["overallSuspicionScore"] = 0
-    incidents = analytics.get("antiCheat", {}).get("incidents", [])
-    if incidents:
-        critical = len([i for i in incidents if i.get("severity") == "CRITICAL"])
-        high = len([i for i in incidents if i.get("severity") == "HIGH"])
-        summary["overallSuspicionScore"] = min(100, (critical * 30) + (high * 15))
+    severity = aggregates.get("incidents", {}).get("severity", {})
+    critical = severity.get("CRITICAL", 0)
+    high = severity.get("HIGH", 0)
+    summary["overallSuspicionScore"] = min(100, (critical * 30) + (high * 15))
     
     return summary
+
+def calculate_summary(analytics: dict, buckets: Iterable[dict] = ()) -> dict:
+    """
+    Calculate summary statistics from analytics data
+    
+    Scans every log (legacy embedded arrays of `analytics` plus its event
+    `buckets`); used for documents that predate running aggregates.
+    """
+    return summary_from_aggregates(compute_aggregates(analytics, buckets))
@@ -0,0 +1,85 @@
+"""
+Health Routes - Liveness probes for infrastructure dependencies
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from config import get_settings
+from database import ping_async_db
+from services.auth_cache import get_auth_cache
+from services.job_queue import get_transcription_queue
+from services.face_inference import get_face_inference_stats
+from services.llm_clients import get_llm_client_stats
+from services.llm_cache import get_llm_cache
+from services.llm_router import get_llm_router_stats
+from services.status_events import get_status_event_bus
+from services.audio_analysis import get_audio_analysis_stats
+from services.transcript_dedup import get_transcript_dedup
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/db")
+async def database_health():
+    """Ping MongoDB through the async client (timeout: MONGODB_HEALTH_TIMEOUT_MS)"""
+    settings = get_settings()
+    probe = await ping_async_db()
+    probe["pool"] = {
+        "min_size": settings.mongodb_min_pool_size,
+        "max_size": settings.mongodb_max_pool_size
+    }
+
+    if not probe["ok"]:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "database": probe}
+        )
+
+    return {"status": "healthy", "database": probe}
+
+
+@router.get("/auth-cache")
+async def auth_cache_stats():
+    """Hit/miss counters of the token -> user cache used by AuthMiddleware"""
+    return get_auth_cache().stats()
+
+
+@router.get("/transcription-queue")
+async def transcription_queue_stats():
+    """Job counts per state in the durable transcription queue (incl. dead-lettered), pre-filter and dedup savings"""
+    return {
+        "workers": get_settings().transcription_workers,
+        "jobs": await get_transcription_queue().counts(),
+        "audio_analysis": get_audio_analysis_stats(),
+        "dedup": get_transcript_dedup().stats()
+    }
+
+
+@router.get("/face-inference")
+async def face_inference_stats():
+    """Shared face detection pool: queue depth, drops and latency percentiles"""
+    return get_face_inference_stats()
+
+
+@router.get("/llm-clients")
+async def llm_client_stats():
+    """Shared LLM clients: per-provider in-flight/peak counters, scheduler queue times and pool connections"""
+    return get_llm_client_stats()
+
+
+@router.get("/llm-cache")
+async def llm_cache_stats():
+    """LLM response cache hit rate per tier"""
+    return get_llm_cache().stats()
+
+
+@router.get("/llm-router")
+async def llm_router_stats():
+    """Provider routing: hedges, failovers, circuit breaker states and latency percentiles"""
+    return get_llm_router_stats()
+
+
+@router.get("/status-events")
+async def status_event_stats():
+    """Answer status push events: backend, open subscriptions and delivery counters"""
+    return get_status_event_bus().stats()
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 import os
 import logging
 from config import get_ocr_config
@@ -28,7 +29,7 @@ def allowed_file(filename: str) -> bool:
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def get_folder_path(db, folder_id: str) -> dict:
+async def get_folder_path(db, folder_id: str) -> dict:
     """
     Get complete folder path and context by traversing parent folders.
     Returns: {
@@ -55,7 +56,7 @@ def get_folder_path(db, folder_id: str) -> dict:
             if not current_id:
                 break
             
-            folder = db.folders.find_one({"_id": current_id})
+            folder = await db.folders.find_one({"_id": current_id})
             if not folder:
                 break
             
@@ -179,19 +180,19 @@ async def parse_document(file: UploadFile = File(...), folderId: str = Form(None
         
         # Get folder path and context if folderId provided
         folder_context = None
-        with get_db() as db:
+        async with get_db() as db:
             if folderId:
-                folder_context = get_folder_path(db, folderId)
+                folder_context = await get_folder_path(db, folderId)
                 logger.info(f"File location: {folder_context.get('path', 'Unknown')}")
         
         # Process document with GPT-4o-mini Vision
         try:
-            result = ocr_processor.process_document(file_bytes, file_ext)
+            result = await run_in_threadpool(ocr_processor.process_document, file_bytes, file_ext)
             logger.info(f"OCR result: {len(result.get('questions', []))} valid questions extracted")
             
             # Persist extracted questions to `parsedquestions` collection
             try:
-                with get_db() as db:
+                async with get_db() as db:
                     # ✅ NEW: Store all questions for this folder as a SINGLE document grouped by difficulty
                     
                     # Group questions by difficulty if available
@@ -261,14 +262,14 @@ async def parse_document(file: UploadFile = File(...), folderId: str = Form(None
                     
                     # Update or insert: If this folder already has parsed questions, update the document
                     if folderId:
-                        db.parsedquestions.update_one(
+                        await db.parsedquestions.update_one(
                             {"folderId": ObjectId(folderId)},
                             {"$set": parsed_doc},
                             upsert=True  # Create if doesn't exist, update if does
                         )
                         logger.info(f"Saved {len(result.get('questions', []))} parsed questions (with explanations) for folder {folderId} (location={parsed_doc.get('folderPath', 'Unknown')})")
                     else:
-                        db.parsedquestions.insert_one(parsed_doc)
+                        await db.parsedquestions.insert_one(parsed_doc)
                         logger.info(f"Saved {len(result.get('questions', []))} parsed questions (with explanations) to parsedquestions (id={parsed_doc['id']})")
             except Exception as db_err:
                 logger.exception(f"Failed to save parsed questions to DB: {db_err}")
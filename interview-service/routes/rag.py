@@ -6,9 +6,13 @@ Provides endpoints for:
 2. Finding similar questions
 3. Generating explanations for wrong answers
 4. Matching resumes to topics
+
+RAGService is synchronous (ChromaDB, sync OpenAI client behind the rate
+limiter), so every call runs in run_in_threadpool, off the event loop.
 """
 
 from fastapi import APIRouter, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import logging
@@ -74,7 +78,7 @@ async def get_stats():
     """Get RAG service statistics"""
     try:
         rag_service = get_rag_service()
-        stats = rag_service.get_stats()
+        stats = await run_in_threadpool(rag_service.get_stats)
         return {"success": True, "stats": stats}
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
@@ -86,7 +90,8 @@ async def embed_question(request: QuestionEmbedRequest):
     """Embed a single question into the vector store"""
     try:
         rag_service = get_rag_service()
-        success = rag_service.embed_question(
+        success = await run_in_threadpool(
+            rag_service.embed_question,
             question_id=request.questionId,
             question_text=request.text,
             options=request.options,
@@ -113,7 +118,7 @@ async def embed_questions_batch(request: BatchEmbedRequest):
     """Embed multiple questions in batch"""
     try:
         rag_service = get_rag_service()
-        count = rag_service.embed_questions_batch(request.questions)
+        count = await run_in_threadpool(rag_service.embed_questions_batch, request.questions)
         
         return {
             "success": True,
@@ -131,7 +136,8 @@ async def find_similar_questions(request: SimilarQuestionsRequest):
     """Find questions similar to the query"""
     try:
         rag_service = get_rag_service()
-        similar = rag_service.find_similar_questions(
+        similar = await run_in_threadpool(
+            rag_service.find_similar_questions,
             query_text=request.query,
             n_results=request.n_results,
             topic_filter=request.topic_filter,
@@ -150,7 +156,8 @@ async def generate_explanation(request: ExplanationRequest):
     """Generate explanation for a wrong answer using RAG"""
     try:
         rag_service = get_rag_service()
-        explanation = rag_service.generate_explanation(
+        explanation = await run_in_threadpool(
+            rag_service.generate_explanation,
             question_text=request.question_text,
             correct_answer=request.correct_answer,
             user_answer=request.user_answer,
@@ -169,7 +176,8 @@ async def embed_resume(request: EmbedResumeRequest):
     """Embed a student's resume for skill matching"""
     try:
         rag_service = get_rag_service()
-        success = rag_service.embed_resume(
+        success = await run_in_threadpool(
+            rag_service.embed_resume,
             student_id=request.student_id,
             resume_text=request.resume_text,
             skills=request.skills
@@ -190,7 +198,8 @@ async def match_resume_to_topics(request: ResumeMatchRequest):
     """Match resume content to relevant question topics"""
     try:
         rag_service = get_rag_service()
-        matches = rag_service.match_resume_to_topics(
+        matches = await run_in_threadpool(
+            rag_service.match_resume_to_topics,
             resume_text=request.resume_text,
             available_topics=request.available_topics,
             n_results=request.n_results
@@ -208,7 +217,7 @@ async def clear_embeddings():
     """Clear all embeddings (admin only, use with caution)"""
     try:
         rag_service = get_rag_service()
-        success = rag_service.clear_all()
+        success = await run_in_threadpool(rag_service.clear_all)
         
         if success:
             return {"success": True, "message": "All embeddings cleared"}
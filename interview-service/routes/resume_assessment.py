@@ -5,13 +5,24 @@ Handles resume PDF + job description analysis for assessment generation.
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from services.pdf_service import extract_text_from_pdf
-from openai import OpenAI
-import os
+from services.llm_clients import get_async_openai_client
+from services.llm_metrics import llm_context
+from services.llm_cache import cached_completion_async
 import json
 
 router = APIRouter(prefix="/resume-assessment", tags=["Resume Assessment"])
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+def _parse_llm_json(content: str):
+    """Parse JSON from an LLM response, stripping ``` code fences"""
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    return json.loads(content.strip())
 
 @router.post("/extract-topics")
 async def extract_topics_from_resume(
@@ -64,27 +75,21 @@ Return ONLY a JSON object with this structure:
 
 Return ONLY the JSON, no other text."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a technical assessment expert. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        
-        content = response.choices[0].message.content.strip()
+        # Repeated uploads of the same resume + JD are served from the LLM cache
+        with llm_context(call_site="resume_assessment.extract_topics"):
+            content = await cached_completion_async(
+                get_async_openai_client(),
+                validate=_parse_llm_json,
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": "You are a technical assessment expert. Return only valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=1000
+            )
         
-        # Parse JSON
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        
-        result = json.loads(content.strip())
+        result = _parse_llm_json(content)
         
         return {
             "success": True,
@@ -136,26 +141,20 @@ Return ONLY a JSON array:
 
 Return ONLY the JSON array, no other text."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a technical interviewer creating assessment questions. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.8,
-            max_tokens=2000
-        )
+        with llm_context(call_site="resume_assessment.generate_questions"):
+            response = await get_async_openai_client().chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": "You are a technical interviewer creating assessment questions. Return only valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.8,
+                max_tokens=2000
+            )
         
         content = response.choices[0].message.content.strip()
         
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        
-        questions = json.loads(content.strip())
+        questions = _parse_llm_json(content)
         
         # Add IDs
         for idx, q in enumerate(questions):
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from config import get_settings
 from database import get_db
 from services.pdf_service import extract_text_from_pdf
-from services.llm_service import generate_questions
+from services.llm_service import generate_questions, generate_questions_stream
+from services.evaluation_engine import precompute_reference_answers
+from services.llm_metrics import llm_context
+from services.context_digest import session_context_digest
+import json
+import logging
 import uuid
 from datetime import datetime
 
+logger = logging.getLogger("backend.session")
+
 router = APIRouter()
 
 @router.post("/create-session")
 async def create_session(
     request: Request,
+    background_tasks: BackgroundTasks,
     job_description: str = Form(...),
     resume: UploadFile = File(...),
     duration: int = Form(...),
@@ -23,21 +34,26 @@ async def create_session(
     resume_bytes = await resume.read()
     resume_text = extract_text_from_pdf(resume_bytes)
 
-    questions = generate_questions(
-        job_description,
-        resume_text,
-        duration,
-        interview_type
-    )
-
     session_id = str(uuid.uuid4())
 
-    with get_db() as db:
-        db.interview_sessions.insert_one({
+    # Sync LLM path (cache lookups, rate limiter waits): keep it off the event loop
+    with llm_context(session_id=session_id):
+        questions = await run_in_threadpool(
+            generate_questions,
+            job_description,
+            resume_text,
+            duration,
+            interview_type
+        )
+
+    async with get_db() as db:
+        await db.interview_sessions.insert_one({
             "id": session_id,
             "user_id": user_id,
             "job_description": job_description,
             "resume_text": resume_text,
+            # Compact JD/resume used by later prompts (raw texts kept for audit)
+            "context_digest": session_context_digest(job_description, resume_text),
             "duration_seconds": duration,
             "interview_type": interview_type,
             "questions": questions,
@@ -47,6 +63,10 @@ async def create_session(
             "completed_at": None
         })
 
+    # Generate model answers while the interview runs, not after it ends
+    if get_settings().precompute_reference_answers:
+        background_tasks.add_task(precompute_reference_answers, session_id)
+
     return {
         "session_id": session_id,
         "questions": questions,
@@ -55,12 +75,116 @@ async def create_session(
     }
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/create-session/stream")
+async def create_session_stream(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    job_description: str = Form(...),
+    resume: UploadFile = File(...),
+    duration: int = Form(...),
+    interview_type: str = Form("technical")
+):
+    """
+    Same as /create-session, but streams questions as server-sent events
+
+    Events:
+        session  - {session_id, duration_seconds, interview_type} (sent first)
+        question - one question object, as soon as the model has produced it
+        done     - {session_id, question_count}
+        error    - {detail}
+
+    The session is stored with status "generating" and each question is
+    appended to it as it arrives, so the first question can be shown (and
+    answered) before the rest of the set has been generated.
+    """
+    user_id = request.state.user["_id"]
+
+    if interview_type not in ["technical", "hr"]:
+        raise HTTPException(status_code=400, detail="Invalid interview type")
+
+    resume_bytes = await resume.read()
+    resume_text = extract_text_from_pdf(resume_bytes)
+
+    session_id = str(uuid.uuid4())
+
+    async with get_db() as db:
+        await db.interview_sessions.insert_one({
+            "id": session_id,
+            "user_id": user_id,
+            "job_description": job_description,
+            "resume_text": resume_text,
+            "context_digest": session_context_digest(job_description, resume_text),
+            "duration_seconds": duration,
+            "interview_type": interview_type,
+            "questions": [],
+            "status": "generating",
+            "final_score": None,
+            "created_at": datetime.utcnow(),
+            "completed_at": None
+        })
+
+    async def event_stream():
+        count = 0
+        try:
+            yield _sse("session", {
+                "session_id": session_id,
+                "duration_seconds": duration,
+                "interview_type": interview_type
+            })
+
+            with llm_context(session_id=session_id):
+                async for question in generate_questions_stream(
+                    job_description,
+                    resume_text,
+                    duration,
+                    interview_type
+                ):
+                    count += 1
+                    question.setdefault("id", f"q{count}")
+                    async with get_db() as db:
+                        await db.interview_sessions.update_one(
+                            {"id": session_id},
+                            {"$push": {"questions": question}}
+                        )
+                    yield _sse("question", question)
+
+            if count:
+                yield _sse("done", {"session_id": session_id, "question_count": count})
+            else:
+                yield _sse("error", {"detail": "No questions were generated"})
+        except Exception as e:
+            logger.error(f"Streaming question generation failed for session={session_id}: {e}")
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            # Also runs when the client disconnects mid-stream; whatever
+            # questions were stored so far remain usable
+            async with get_db() as db:
+                await db.interview_sessions.update_one(
+                    {"id": session_id, "status": "generating"},
+                    {"$set": {"status": "created" if count else "generation_failed"}}
+                )
+
+    # Runs once the stream has finished, i.e. with the full question set stored
+    if get_settings().precompute_reference_answers:
+        background_tasks.add_task(precompute_reference_answers, session_id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/session/{session_id}")
 async def get_session(session_id: str, request: Request):
     user_id = request.state.user["_id"]
 
-    with get_db() as db:
-        session = db.interview_sessions.find_one({
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one({
             "id": session_id,
             "user_id": user_id
         })
@@ -95,11 +219,12 @@ async def get_my_sessions(request: Request):
 
     print("Fetching sessions for user:", user_id)
 
-    with get_db() as db:
-        sessions = list(
+    async with get_db() as db:
+        sessions = await (
             db.interview_sessions
             .find({"user_id": user_id})
             .sort("created_at", -1)
+            .to_list(length=None)
         )
 
         for s in sessions:
@@ -7,11 +7,12 @@ Provides endpoints for:
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional
 import logging
 
-from database import get_mongodb_client
+from database import get_db
 from services.rag_service import get_rag_service
 
 logger = logging.getLogger(__name__)
@@ -29,28 +30,26 @@ class SyncResponse(BaseModel):
 async def sync_all_questions():
     """Sync all questions from MongoDB ParsedQuestions to RAG vector store"""
     try:
-        # get_mongodb_client returns the database, not the client
-        db = get_mongodb_client()
-        
-        # Try different collection name variations
-        parsed_questions = db["parsedquestions"]
+        async with get_db() as db:
+            # Try different collection name variations
+            parsed_questions = db["parsedquestions"]
+            
+            # Get all parsed question documents
+            docs = await parsed_questions.find({}).to_list(length=None)
+            logger.info(f"Found {len(docs)} ParsedQuestion documents")
+            
+            if not docs:
+                # Try alternate collection names
+                for coll_name in ["ParsedQuestion", "ParsedQuestions", "parsed_questions"]:
+                    alt_coll = db[coll_name]
+                    docs = await alt_coll.find({}).to_list(length=None)
+                    if docs:
+                        logger.info(f"Found {len(docs)} documents in {coll_name}")
+                        parsed_questions = alt_coll
+                        break
         
         rag_service = get_rag_service()
         
-        # Get all parsed question documents
-        docs = list(parsed_questions.find({}))
-        logger.info(f"Found {len(docs)} ParsedQuestion documents")
-        
-        if not docs:
-            # Try alternate collection names
-            for coll_name in ["ParsedQuestion", "ParsedQuestions", "parsed_questions"]:
-                alt_coll = db[coll_name]
-                docs = list(alt_coll.find({}))
-                if docs:
-                    logger.info(f"Found {len(docs)} documents in {coll_name}")
-                    parsed_questions = alt_coll
-                    break
-        
         all_questions = []
         for doc in docs:
             company = doc.get("company", "")
@@ -90,7 +89,8 @@ async def sync_all_questions():
         
         for i in range(0, len(all_questions), batch_size):
             batch = all_questions[i:i + batch_size]
-            count = rag_service.embed_questions_batch(batch)
+            # Off the event loop: the embedding calls may wait on the LLM scheduler
+            count = await run_in_threadpool(rag_service.embed_questions_batch, batch)
             synced += count
             logger.info(f"Synced batch {i//batch_size + 1}: {count} questions")
         
@@ -110,15 +110,12 @@ async def sync_all_questions():
 async def sync_company_questions(company: str):
     """Sync questions for a specific company"""
     try:
-        # get_mongodb_client returns the database, not the client
-        db = get_mongodb_client()
-        parsed_questions = db["parsedquestions"]
+        async with get_db() as db:
+            # Get parsed question documents for this company
+            docs = await db["parsedquestions"].find({"company": company}).to_list(length=None)
         
         rag_service = get_rag_service()
         
-        # Get parsed question documents for this company
-        docs = list(parsed_questions.find({"company": company}))
-        
         if not docs:
             return SyncResponse(
                 success=True,
@@ -148,7 +145,7 @@ async def sync_company_questions(company: str):
                         "company": company
                     })
         
-        synced = rag_service.embed_questions_batch(all_questions)
+        synced = await run_in_threadpool(rag_service.embed_questions_batch, all_questions)
         
         return SyncResponse(
             success=True,
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Request
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from jose import JWTError
+from pydantic import BaseModel, Field
+from config import get_settings
 from database import get_db
-from services.gridfs_service import get_gridfs_service
-from services.background_tasks import process_audio_transcription
+from middleware.auth import authenticate_token
+from services.gridfs_service import get_gridfs_service, guess_audio_content_type, AudioTooLargeError, EmptyAudioError
+from services.job_queue import get_transcription_queue
+from services.background_tasks import finalize_segmented_answer, score_transcribed_answer
+from services.transcript_dedup import get_transcript_dedup
+from services.status_events import get_status_event_bus, publish_answer_status, QUEUED, PROCESSING, RECORDING
 from typing import Dict, List
+import json
 import uuid
-import time
+import asyncio
 from datetime import datetime
 import logging
 
@@ -12,22 +21,60 @@ logger = logging.getLogger("backend.upload")
 
 router = APIRouter()
 
+
+class CompleteAnswerRequest(BaseModel):
+    segment_count: int = Field(..., ge=1)
+
+
+def _answer_status(question_id: str, answer: Dict) -> Dict:
+    """Status entry of one answer, as returned by the status endpoints"""
+    status = answer.get("transcription_status", "unknown")
+    info = {
+        "question_id": question_id,
+        "status": status
+    }
+    
+    if status == "completed":
+        info["transcript"] = answer.get("transcript", "")
+        if answer.get("score") is not None:
+            info["score"] = answer["score"]
+    
+    if status == "failed":
+        info["error"] = answer.get("transcription_error", "Unknown error")
+    
+    if answer.get("segments") and status in ("recording", "processing"):
+        segments = answer["segments"].values()
+        info["segments"] = {
+            "received": len(segments),
+            "transcribed": sum(
+                segment.get("transcription_status") in ("completed", "no_speech", "failed")
+                for segment in segments
+            )
+        }
+    
+    return info
+
+
 @router.post("/upload-answer/{session_id}/{question_id}")
 async def upload_answer(
     session_id: str,
     question_id: str,
+    background_tasks: BackgroundTasks,
     audio: UploadFile = File(...),
-    background_tasks: BackgroundTasks = None,
     request: Request = None
 ):
     """
     Upload audio answer and queue async transcription
     
     Flow:
-    1. Validate audio file
-    2. Store audio in MongoDB GridFS
+    1-2. Stream audio into MongoDB GridFS in chunks (size limit and
+         SHA-256 checksum computed on the fly)
+    2b. Dedup (TRANSCRIPT_DEDUP_ENABLED, see services/transcript_dedup.py):
+        a re-upload of this answer's audio returns the existing answer's
+        status, and audio already transcribed for another answer gets that
+        transcript; either way nothing is queued
     3. Create answer record in interview_sessions (without transcript)
-    4. Queue background transcription task
+    4. Enqueue a durable transcription job (run by the worker pool)
     5. Return immediately (non-blocking)
     
     Returns:
@@ -36,34 +83,89 @@ async def upload_answer(
             "message": "Audio uploaded successfully, transcription in progress",
             "file_id": "gridfs_file_id"
         }
+        with "deduplicated": true (and "transcript" once known) for
+        duplicate audio
     """
     
     try:
         # Get user ID from auth middleware
         user_id = request.state.user["_id"] if request else None
         
-        # Step 1: Validate audio file
-        content = await audio.read()
-        if not content:
-            raise HTTPException(status_code=400, detail="Empty audio file received")
+        # Step 1-2: Stream audio into GridFS without buffering the whole file
+        gridfs_service = get_gridfs_service()
+        file_extension = audio.filename.split(".")[-1] if "." in audio.filename else "webm"
+        filename = f"{uuid.uuid4()}.{file_extension}"
+        
+        try:
+            stored = await gridfs_service.store_audio_stream(
+                audio,
+                session_id=session_id,
+                question_id=question_id,
+                user_id=user_id,
+                filename=filename,
+                content_type=guess_audio_content_type(audio.filename, audio.content_type)
+            )
+        except EmptyAudioError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except AudioTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
+        file_id = stored["file_id"]
         logger.info(
             f"Received audio upload: session={session_id}, question={question_id}, "
-            f"size={len(content)} bytes"
+            f"size={stored['size']} bytes"
         )
         
-        # Step 2: Store audio in GridFS
-        gridfs_service = get_gridfs_service()
-        file_extension = audio.filename.split(".")[-1] if "." in audio.filename else "webm"
-        filename = f"{uuid.uuid4()}.{file_extension}"
+        # Step 2b: Same audio as before - don't transcribe it again
+        reused = None
+        if get_settings().transcript_dedup_enabled:
+            dedup = get_transcript_dedup()
+            async with get_db() as db:
+                session = await db.interview_sessions.find_one(
+                    {"id": session_id},
+                    {"_id": 0, f"answers.{question_id}": 1}
+                )
+            existing = ((session or {}).get("answers") or {}).get(question_id)
+            
+            if (
+                existing
+                and existing.get("audio_sha256") == stored["sha256"]
+                and existing.get("transcription_status") in ("queued", "processing", "completed", "no_speech")
+            ):
+                # Client retry: the first upload is queued or already transcribed
+                await gridfs_service.delete_audio(file_id)
+                dedup.record_duplicate_upload()
+                logger.info(f"Duplicate upload ignored: session={session_id}, question={question_id}")
+                status = existing["transcription_status"]
+                response = {
+                    "status": "processing" if status in ("queued", "processing") else "completed",
+                    "message": "Audio already uploaded, using the existing transcription",
+                    "file_id": existing.get("gridfs_file_id"),
+                    "transcription_status": status,
+                    "deduplicated": True
+                }
+                if status in ("completed", "no_speech"):
+                    response["transcript"] = existing.get("transcript") or ""
+                return response
+            
+            reused = await dedup.lookup(stored["sha256"])
         
-        file_id = gridfs_service.store_audio(
-            audio_data=content,
-            session_id=session_id,
-            question_id=question_id,
-            user_id=user_id,
-            filename=filename
-        )
+        answer_record = {
+            "gridfs_file_id": file_id,
+            "audio_size": stored["size"],
+            "audio_sha256": stored["sha256"],
+            "transcript": None,  # Will be filled by background task
+            "transcription_status": "queued"
+        }
+        if reused:
+            # Identical audio was transcribed for another answer
+            answer_record.update({
+                "gridfs_file_id": None,
+                "transcript": reused.get("transcript") or "",
+                "transcription_status": reused["status"],
+                "transcribed_at": datetime.utcnow(),
+                "transcript_reused": True
+            })
         
         # Step 3: Create answer record in database (without transcript yet)
         max_retries = 3
@@ -71,10 +173,10 @@ async def upload_answer(
         
         while retry_count < max_retries:
             try:
-                with get_db() as db:
+                async with get_db() as db:
                     answer_id = str(uuid.uuid4())
                     
-                    db.interview_sessions.update_one(
+                    await db.interview_sessions.update_one(
                         {"id": session_id},
                         {
                             "$set": {
@@ -82,9 +184,7 @@ async def upload_answer(
                                 f"answers.{question_id}": {
                                     "id": answer_id,
                                     "question_id": question_id,
-                                    "gridfs_file_id": file_id,
-                                    "transcript": None,  # Will be filled by background task
-                                    "transcription_status": "queued",
+                                    **answer_record,
                                     "score": None,
                                     "feedback": [],
                                     "model_answer": None,
@@ -101,7 +201,7 @@ async def upload_answer(
                 if retry_count >= max_retries:
                     # Cleanup GridFS file on database error
                     try:
-                        gridfs_service.delete_audio(file_id)
+                        await gridfs_service.delete_audio(file_id)
                     except:
                         pass
                     
@@ -109,20 +209,38 @@ async def upload_answer(
                         status_code=500,
                         detail=f"Database error after {max_retries} retries: {str(db_error)}"
                     )
-                time.sleep(0.1 * retry_count)
+                await asyncio.sleep(0.1 * retry_count)
         
-        # Step 4: Queue background transcription task
-        if background_tasks:
-            background_tasks.add_task(
-                process_audio_transcription,
-                file_id=file_id,
-                session_id=session_id,
-                question_id=question_id,
-                user_id=user_id
-            )
-            logger.info(f"Transcription task queued: file_id={file_id}")
-        else:
-            logger.warning("BackgroundTasks not available, transcription will not be processed")
+        if reused:
+            await gridfs_service.delete_audio(file_id)
+            get_transcript_dedup().record_reuse()
+            logger.info(f"Transcript reused for identical audio: session={session_id}, question={question_id}")
+            status = reused["status"]
+            if status == "completed":
+                await publish_answer_status(session_id, question_id, status, transcript=answer_record["transcript"])
+                background_tasks.add_task(score_transcribed_answer, session_id, question_id)
+            else:
+                await publish_answer_status(session_id, question_id, status)
+            return {
+                "status": "completed",
+                "message": "Identical audio was already transcribed",
+                "file_id": None,
+                "transcription_status": status,
+                "transcript": answer_record["transcript"],
+                "deduplicated": True
+            }
+        
+        # Step 4: Enqueue transcription job (survives restarts, retried on failure)
+        job_id = await get_transcription_queue().enqueue({
+            "file_id": file_id,
+            "session_id": session_id,
+            "question_id": question_id,
+            "answer_id": answer_id,
+            "user_id": user_id,
+            "sha256": stored["sha256"]
+        })
+        logger.info(f"Transcription job queued: job_id={job_id}, file_id={file_id}")
+        await publish_answer_status(session_id, question_id, QUEUED)
         
         # Step 5: Return immediately (non-blocking)
         return {
@@ -139,6 +257,286 @@ async def upload_answer(
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+@router.post("/upload-answer/{session_id}/{question_id}/segments/{segment}")
+async def upload_answer_segment(
+    session_id: str,
+    question_id: str,
+    segment: int,
+    audio: UploadFile = File(...),
+    restart: bool = False,
+    request: Request = None
+):
+    """
+    Upload one segment of an answer while it is still being recorded
+    
+    The client records the answer in short, independently decodable pieces
+    (e.g. by restarting MediaRecorder every 10 s - timeslice chunks after
+    the first have no header and cannot be transcribed on their own) and
+    uploads each one as soon as it is recorded, numbered from 0. Every
+    segment is queued for transcription right away, so by the time the
+    candidate stops, only the last one is left to transcribe.
+    
+    Segment 0 starts the answer with status "recording"; later segments
+    are only accepted while it is recording. A segment that was already
+    uploaded gets 409, including segment 0: to record the answer again,
+    upload segment 0 with ?restart=true, which discards the previous
+    recording and its segments. Finish the answer with
+    POST /upload-answer/{session_id}/{question_id}/complete; an answer
+    that gets no segment for ANSWER_RECORDING_TIMEOUT_SECONDS is finished
+    with the segments received (see expire_stale_recording).
+    
+    Returns:
+        {
+            "status": "recording",
+            "segment": 0,
+            "file_id": "gridfs_file_id",
+            "transcription_status": "queued"
+        }
+    """
+    max_segments = get_settings().answer_max_segments
+    if not 0 <= segment < max_segments:
+        raise HTTPException(status_code=400, detail=f"Segment index must be between 0 and {max_segments - 1}")
+    
+    try:
+        user_id = request.state.user["_id"] if request else None
+        path = f"answers.{question_id}"
+        
+        # Check the answer before streaming the audio in
+        async with get_db() as db:
+            session = await db.interview_sessions.find_one(
+                {"id": session_id, "user_id": user_id},
+                {"_id": 0, path: 1}
+            )
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        previous = (session.get("answers") or {}).get(question_id)
+        segments = (previous or {}).get("segments") or {}
+        if segment == 0:
+            if "0" in segments and not restart:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Segment already uploaded (upload segment 0 with restart=true to record the answer again)"
+                )
+        elif not previous or previous.get("transcription_status") != RECORDING:
+            raise HTTPException(status_code=409, detail="Answer is not being recorded (upload segment 0 first)")
+        elif str(segment) in segments:
+            raise HTTPException(status_code=409, detail="Segment already uploaded")
+        
+        gridfs_service = get_gridfs_service()
+        file_extension = audio.filename.split(".")[-1] if "." in audio.filename else "webm"
+        
+        try:
+            stored = await gridfs_service.store_audio_stream(
+                audio,
+                session_id=session_id,
+                question_id=question_id,
+                user_id=user_id,
+                filename=f"{uuid.uuid4()}.{file_extension}",
+                content_type=guess_audio_content_type(audio.filename, audio.content_type),
+                segment=segment
+            )
+        except EmptyAudioError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except AudioTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        
+        file_id = stored["file_id"]
+        segment_record = {
+            "gridfs_file_id": file_id,
+            "audio_size": stored["size"],
+            "audio_sha256": stored["sha256"],
+            "transcript": None,
+            "transcription_status": "queued"
+        }
+        
+        # Writes are conditional on the answer read above, so concurrent
+        # uploads of the same segment (or a restart) cannot both succeed
+        if previous:
+            answer_filter = {"id": session_id, f"{path}.id": previous.get("id")}
+        else:
+            answer_filter = {"id": session_id, path: {"$exists": False}}
+        
+        try:
+            async with get_db() as db:
+                now = datetime.utcnow()
+                if segment == 0:
+                    answer_id = str(uuid.uuid4())
+                    if not restart:
+                        answer_filter[f"{path}.segments.0"] = {"$exists": False}
+                    result = await db.interview_sessions.update_one(
+                        answer_filter,
+                        {
+                            "$set": {
+                                "status": "in_progress",
+                                path: {
+                                    "id": answer_id,
+                                    "question_id": question_id,
+                                    "gridfs_file_id": None,
+                                    "audio_size": stored["size"],
+                                    "transcript": None,  # Stitched from the segments
+                                    "transcription_status": RECORDING,
+                                    "segments": {"0": segment_record},
+                                    "segment_count": None,  # Set on completion
+                                    "recording_started_at": now,
+                                    "last_segment_at": now,
+                                    "score": None,
+                                    "feedback": [],
+                                    "model_answer": None,
+                                    "created_at": now
+                                }
+                            }
+                        }
+                    )
+                else:
+                    answer_id = previous["id"]
+                    result = await db.interview_sessions.update_one(
+                        {
+                            **answer_filter,
+                            f"{path}.transcription_status": RECORDING,
+                            f"{path}.segments.{segment}": {"$exists": False}
+                        },
+                        {
+                            "$set": {
+                                f"{path}.segments.{segment}": segment_record,
+                                f"{path}.last_segment_at": now
+                            },
+                            "$inc": {f"{path}.audio_size": stored["size"]}
+                        }
+                    )
+        except Exception:
+            try:
+                await gridfs_service.delete_audio(file_id)
+            except Exception:
+                pass
+            raise
+        
+        if not result.matched_count:
+            await gridfs_service.delete_audio(file_id)
+            raise HTTPException(status_code=409, detail="Answer changed while uploading, segment not stored")
+        
+        if segment == 0 and previous:
+            # Replaced: drop the audio of the discarded recording (its
+            # jobs no longer match the answer ID and store nothing)
+            old_files = [previous.get("gridfs_file_id")]
+            old_files += [state.get("gridfs_file_id") for state in segments.values()]
+            for old_file_id in filter(None, old_files):
+                try:
+                    await gridfs_service.delete_audio(old_file_id)
+                except Exception as delete_error:
+                    logger.error(f"Failed to delete audio of restarted answer: {delete_error}")
+        
+        job_id = await get_transcription_queue().enqueue({
+            "file_id": file_id,
+            "session_id": session_id,
+            "question_id": question_id,
+            "answer_id": answer_id,
+            "user_id": user_id,
+            "segment": segment
+        })
+        logger.info(
+            f"Segment transcription job queued: job_id={job_id}, session={session_id}, "
+            f"question={question_id}, segment={segment}, size={stored['size']} bytes"
+        )
+        if segment == 0:
+            await publish_answer_status(session_id, question_id, RECORDING)
+        
+        return {
+            "status": "recording",
+            "segment": segment,
+            "file_id": file_id,
+            "transcription_status": "queued"
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Segment upload failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+@router.post("/upload-answer/{session_id}/{question_id}/complete")
+async def complete_answer(
+    session_id: str,
+    question_id: str,
+    body: CompleteAnswerRequest,
+    request: Request,
+    background_tasks: BackgroundTasks
+):
+    """
+    Finish an answer uploaded in segments
+    
+    Once segments 0..segment_count-1 are all uploaded, the answer moves to
+    "processing" and its transcript is stitched as soon as the last segment
+    is transcribed. If that already happened, the transcript is returned
+    right away; otherwise wait for the "completed" event on
+    /transcription-events/{session_id}. Repeating the call is harmless.
+    
+    Returns:
+        Same as /transcription-status/{session_id}/{question_id}
+    """
+    user_id = request.state.user["_id"]
+    segment_count = body.segment_count
+    
+    try:
+        async with get_db() as db:
+            session = await db.interview_sessions.find_one(
+                {"id": session_id, "user_id": user_id},
+                {"_id": 0, f"answers.{question_id}": 1}
+            )
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        answer = (session.get("answers") or {}).get(question_id)
+        if not answer or "segments" not in answer:
+            raise HTTPException(status_code=404, detail="Segmented answer not found")
+        
+        if answer.get("transcription_status") != RECORDING:
+            if answer.get("segment_count") == segment_count:
+                return _answer_status(question_id, answer)
+            raise HTTPException(status_code=409, detail="Answer is already complete")
+        
+        received = {int(index) for index in answer["segments"]}
+        missing = sorted(set(range(segment_count)) - received)
+        unexpected = sorted(index for index in received if index >= segment_count)
+        if missing or unexpected:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Segments do not match segment_count={segment_count}: "
+                       f"missing {missing}, unexpected {unexpected}"
+            )
+        
+        async with get_db() as db:
+            result = await db.interview_sessions.update_one(
+                {"id": session_id, f"answers.{question_id}.transcription_status": RECORDING},
+                {"$set": {
+                    f"answers.{question_id}.segment_count": segment_count,
+                    f"answers.{question_id}.transcription_status": PROCESSING
+                }}
+            )
+        if not result.modified_count:
+            raise HTTPException(status_code=409, detail="Answer is already complete")
+        
+        # Every segment may already be transcribed: stitch now
+        if await finalize_segmented_answer(session_id, question_id):
+            background_tasks.add_task(score_transcribed_answer, session_id, question_id)
+        else:
+            await publish_answer_status(session_id, question_id, PROCESSING)
+        
+        async with get_db() as db:
+            session = await db.interview_sessions.find_one(
+                {"id": session_id},
+                {"_id": 0, f"answers.{question_id}": 1}
+            )
+        return _answer_status(question_id, session["answers"][question_id])
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to complete answer: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/transcription-status/{session_id}/{question_id}")
 async def get_transcription_status(
     session_id: str,
@@ -150,19 +548,21 @@ async def get_transcription_status(
     
     Returns:
         {
-            "status": "queued" | "processing" | "completed" | "failed",
+            "status": "recording" | "queued" | "processing" | "completed" | "failed" | "no_speech",
             "transcript": "text" (if completed),
-            "error": "error message" (if failed)
+            "error": "error message" (if failed),
+            "segments": {"received": 3, "transcribed": 2} (segmented answers in progress)
         }
     """
     user_id = request.state.user["_id"]
     
     try:
-        with get_db() as db:
-            session = db.interview_sessions.find_one({
-                "id": session_id,
-                "user_id": user_id
-            })
+        async with get_db() as db:
+            # Only this answer, not the whole session document
+            session = await db.interview_sessions.find_one(
+                {"id": session_id, "user_id": user_id},
+                {"_id": 0, f"answers.{question_id}": 1}
+            )
             
             if not session:
                 raise HTTPException(status_code=404, detail="Session not found")
@@ -173,20 +573,7 @@ async def get_transcription_status(
             if not answer:
                 raise HTTPException(status_code=404, detail="Answer not found")
             
-            status = answer.get("transcription_status", "unknown")
-            
-            response = {
-                "status": status,
-                "question_id": question_id
-            }
-            
-            if status == "completed":
-                response["transcript"] = answer.get("transcript", "")
-            
-            if status == "failed":
-                response["error"] = answer.get("transcription_error", "Unknown error")
-            
-            return response
+            return _answer_status(question_id, answer)
     
     except HTTPException:
         raise
@@ -209,7 +596,7 @@ async def get_all_transcription_status(
             "answers": [
                 {
                     "question_id": "...",
-                    "status": "queued" | "processing" | "completed" | "failed",
+                    "status": "recording" | "queued" | "processing" | "completed" | "failed" | "no_speech",
                     "transcript": "..." (if completed)
                 }
             ],
@@ -218,18 +605,20 @@ async def get_all_transcription_status(
                 "completed": 3,
                 "processing": 1,
                 "queued": 1,
-                "failed": 0
+                "failed": 0,
+                "no_speech": 0,
+                "recording": 0
             }
         }
     """
     user_id = request.state.user["_id"]
     
     try:
-        with get_db() as db:
-            session = db.interview_sessions.find_one({
-                "id": session_id,
-                "user_id": user_id
-            })
+        async with get_db() as db:
+            session = await db.interview_sessions.find_one(
+                {"id": session_id, "user_id": user_id},
+                {"_id": 0, "answers": 1}
+            )
             
             if not session:
                 raise HTTPException(status_code=404, detail="Session not found")
@@ -242,27 +631,17 @@ async def get_all_transcription_status(
                 "completed": 0,
                 "processing": 0,
                 "queued": 0,
-                "failed": 0
+                "failed": 0,
+                "no_speech": 0,
+                "recording": 0
             }
             
             for question_id, answer in answers_dict.items():
-                status = answer.get("transcription_status", "unknown")
+                answer_info = _answer_status(question_id, answer)
+                status = answer_info["status"]
                 
-                answer_info = {
-                    "question_id": question_id,
-                    "status": status
-                }
-                
-                if status == "completed":
-                    answer_info["transcript"] = answer.get("transcript", "")
-                    summary["completed"] += 1
-                elif status == "processing":
-                    summary["processing"] += 1
-                elif status == "queued":
-                    summary["queued"] += 1
-                elif status == "failed":
-                    answer_info["error"] = answer.get("transcription_error", "Unknown error")
-                    summary["failed"] += 1
+                if status in summary:
+                    summary[status] += 1
                 
                 summary["total"] += 1
                 answers_status.append(answer_info)
@@ -278,3 +657,79 @@ async def get_all_transcription_status(
     except Exception as e:
         logger.error(f"Failed to get transcription status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/transcription-events/{session_id}")
+async def transcription_events(session_id: str, request: Request):
+    """
+    Stream answer status changes of a session as server-sent events
+    (replaces polling /transcription-status)
+    
+    Events:
+        snapshot - {"session_id", "answers": [...]} current state, sent first
+        status   - {"session_id", "question_id", "status", ...} on every change;
+                   status is recording | queued | processing | partial |
+                   completed | failed | no_speech | scored,
+                   with "transcript" (partial, completed), "segment"
+                   (partial), "score" (scored) or "error"
+    
+    A comment line is sent every STATUS_EVENTS_HEARTBEAT_SECONDS so idle
+    connections are not closed by proxies. EventSource cannot set headers,
+    so the token may also be passed as ?token=.
+    """
+    user = request.state.user
+    token = request.query_params.get("token")
+    if user is None and token:
+        try:
+            user = await authenticate_token(token)
+        except JWTError:
+            user = None
+    if not user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    
+    bus = get_status_event_bus()
+    heartbeat = get_settings().status_events_heartbeat_seconds
+    
+    # Subscribe before reading the snapshot, so no change can fall in between
+    queue = bus.subscribe(session_id)
+    try:
+        async with get_db() as db:
+            session = await db.interview_sessions.find_one(
+                {"id": session_id, "user_id": user["_id"]},
+                {"_id": 0, "answers": 1}
+            )
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+    except BaseException:
+        bus.unsubscribe(session_id, queue)
+        raise
+    
+    async def event_stream():
+        try:
+            yield _sse("snapshot", {
+                "session_id": session_id,
+                "answers": [
+                    _answer_status(question_id, answer)
+                    for question_id, answer in (session.get("answers") or {}).items()
+                ]
+            })
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse("status", event)
+        finally:
+            bus.unsubscribe(session_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,368 @@
+"""
+Audio Analysis
+Pre-processing of each answer recording before transcription
+
+prepare_audio() decodes the recording once to 16 kHz mono PCM with ffmpeg and
+then runs two stages:
+
+1. Voice-activity pre-filter over VAD_FRAME_MS frames:
+   - recordings whose loudest frame stays below VAD_MIN_LEVEL_DBFS (skipped
+     questions, muted mics) or that are shorter than
+     VAD_MIN_DURATION_SECONDS are not transcribed at all. This is the only
+     case that short-circuits: a level relative to the recording's own
+     noise floor cannot tell speech in a noisy room (a few dB above the
+     noise, or without pauses) from no speech, and a wrongly skipped
+     answer is lost for good
+   - frames more than VAD_NOISE_MARGIN_DB above the noise floor count as
+     speech for trimming: leading / trailing silence beyond
+     VAD_PADDING_SECONDS is cut, so fewer seconds are uploaded and billed;
+     when no frame stands out, the whole recording is sent
+2. Normalization (AUDIO_NORMALIZE_ENABLED): the (trimmed) speech is
+   re-encoded as mono 16 kHz Opus in Ogg at AUDIO_NORMALIZE_BITRATE, whatever
+   the browser uploaded (stereo 48 kHz WebM, WAV, MP4, ...). The smaller file
+   is what gets transcribed and what stays in GridFS while the job is pending.
+   When normalization is off, trimming falls back to a stream copy.
+
+Decoding and encoding are CPU-bound, so prepare_audio() runs in a dedicated
+process pool (AUDIO_PROCESS_WORKERS) via prepare_audio_async(); neither the
+event loop nor the transcription threads do the work.
+
+Without an ffmpeg binary, or for audio ffmpeg cannot decode, the analysis
+returns None and the original recording is transcribed as before.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import get_settings
+
+logger = logging.getLogger("backend.audio_analysis")
+
+SAMPLE_RATE = 16000
+
+NORMALIZED_CONTENT_TYPE = "audio/ogg"
+NORMALIZED_EXTENSION = "ogg"
+
+# ffmpeg muxer able to write each container back out (sniffed from magic bytes)
+_CONTAINERS = [
+    (b"\x1a\x45\xdf\xa3", "webm"),
+    (b"OggS", "ogg"),
+    (b"RIFF", "wav"),
+    (b"ID3", "mp3"),
+    (b"\xff\xfb", "mp3"),
+    (b"\xff\xf3", "mp3"),
+]
+
+
+class AudioDecodeError(Exception):
+    """ffmpeg could not decode the recording"""
+
+
+_stats_lock = threading.Lock()
+_stats = {
+    "analyzed": 0,
+    "no_speech": 0,
+    "trimmed": 0,
+    "errors": 0,
+    "seconds_analyzed": 0.0,
+    "seconds_saved": 0.0,
+    "normalized": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+}
+_ffmpeg_missing_logged = False
+
+
+def _ffmpeg() -> Optional[str]:
+    global _ffmpeg_missing_logged
+    path = shutil.which(get_settings().ffmpeg_path)
+    if path is None and not _ffmpeg_missing_logged:
+        logger.warning("ffmpeg not found, audio pre-processing is disabled")
+        _ffmpeg_missing_logged = True
+    return path
+
+
+def _run_ffmpeg(args: list, audio_data: bytes) -> bytes:
+    ffmpeg = _ffmpeg()
+    if ffmpeg is None:
+        raise AudioDecodeError("ffmpeg is not installed")
+    process = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0", *args, "pipe:1"],
+        input=audio_data,
+        capture_output=True,
+        timeout=get_settings().ffmpeg_timeout_seconds
+    )
+    if process.returncode != 0:
+        raise AudioDecodeError(process.stderr.decode(errors="replace").strip()[-300:])
+    return process.stdout
+
+
+def decode_pcm(audio_data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode any ffmpeg-readable recording to mono float32 samples in [-1, 1]"""
+    raw = _run_ffmpeg(["-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "s16le"], audio_data)
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def detect_speech(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Dict:
+    """
+    Energy-based voice activity over fixed-size frames
+
+    Returns:
+        dict: {
+            "duration": float,        # seconds of audio
+            "peak_dbfs": float | None,  # level of the loudest frame
+            "speech_seconds": float,  # seconds of frames above the noise floor margin
+            "start": float | None,    # first speech frame (seconds)
+            "end": float | None       # end of the last speech frame (seconds)
+        }
+    """
+    settings = get_settings()
+    frame = max(1, int(sample_rate * settings.vad_frame_ms / 1000))
+    duration = len(samples) / sample_rate
+    frames = len(samples) // frame
+
+    if frames == 0:
+        return {"duration": duration, "peak_dbfs": None, "speech_seconds": 0.0, "start": None, "end": None}
+
+    blocks = samples[:frames * frame].reshape(frames, frame)
+    rms = np.sqrt(np.mean(blocks * blocks, axis=1))
+    level = 20 * np.log10(np.maximum(rms, 1e-10))
+
+    # The quietest frames approximate the room / mic noise floor
+    noise_floor = np.percentile(level, 10)
+    threshold = max(settings.vad_min_level_dbfs, noise_floor + settings.vad_noise_margin_db)
+    speech = np.flatnonzero(level > threshold)
+    peak = round(float(level.max()), 1)
+
+    frame_seconds = frame / sample_rate
+    if len(speech) == 0:
+        return {"duration": duration, "peak_dbfs": peak, "speech_seconds": 0.0, "start": None, "end": None}
+    return {
+        "duration": duration,
+        "peak_dbfs": peak,
+        "speech_seconds": len(speech) * frame_seconds,
+        "start": speech[0] * frame_seconds,
+        "end": (speech[-1] + 1) * frame_seconds
+    }
+
+
+def _container(audio_data: bytes) -> Optional[str]:
+    return next((fmt for magic, fmt in _CONTAINERS if audio_data.startswith(magic)), None)
+
+
+def trim_audio(audio_data: bytes, start: float, end: float) -> Optional[bytes]:
+    """Cut [start, end] seconds out of the recording without re-encoding (None if unsupported)"""
+    container = _container(audio_data)
+    if container is None:
+        return None
+    return _run_ffmpeg(
+        ["-vn", "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-c", "copy", "-f", container],
+        audio_data
+    )
+
+
+def encode_speech(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Encode mono float samples as low-bitrate speech Opus (Ogg container)"""
+    settings = get_settings()
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    ffmpeg = _ffmpeg()
+    if ffmpeg is None:
+        raise AudioDecodeError("ffmpeg is not installed")
+    process = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error",
+         "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+         "-c:a", settings.audio_normalize_codec, "-b:a", settings.audio_normalize_bitrate,
+         "-application", "voip", "-f", "ogg", "pipe:1"],
+        input=pcm,
+        capture_output=True,
+        timeout=settings.ffmpeg_timeout_seconds
+    )
+    if process.returncode != 0:
+        raise AudioDecodeError(process.stderr.decode(errors="replace").strip()[-300:])
+    return process.stdout
+
+
+def _record(analysis: Optional[Dict]):
+    with _stats_lock:
+        if analysis is None:
+            if shutil.which(get_settings().ffmpeg_path) is not None:
+                _stats["errors"] += 1
+            return
+        _stats["analyzed"] += 1
+        _stats["seconds_analyzed"] += analysis["duration"]
+        _stats["seconds_saved"] += analysis["seconds_saved"]
+        if not analysis["has_speech"]:
+            _stats["no_speech"] += 1
+            return
+        if analysis["trimmed"]:
+            _stats["trimmed"] += 1
+        if analysis["normalized"]:
+            _stats["normalized"] += 1
+        _stats["bytes_in"] += analysis["original_bytes"]
+        _stats["bytes_out"] += analysis["bytes"]
+
+
+def _prepare_audio(audio_data: bytes, vad: bool = True, normalize: bool = True) -> Optional[Dict]:
+    """
+    Decide whether (and which part of) a recording needs transcribing, and
+    produce the bytes to transcribe
+
+    Blocking (runs ffmpeg); counters are updated by the callers, in the
+    server process.
+
+    Returns:
+        dict: {
+            "has_speech": bool,
+            "audio": bytes,           # recording to transcribe (trimmed / normalized when possible)
+            "content_type": str | None,  # of "audio" when normalized, None if unchanged format
+            "duration": float,
+            "peak_dbfs": float | None,
+            "speech_seconds": float,
+            "trimmed": bool,
+            "normalized": bool,
+            "seconds_saved": float,   # audio not sent to the transcription API
+            "original_bytes": int,
+            "bytes": int,
+            "analysis_ms": float
+        }
+        or None if the recording could not be analyzed
+    """
+    settings = get_settings()
+    started = time.perf_counter()
+
+    try:
+        samples = decode_pcm(audio_data)
+    except (AudioDecodeError, subprocess.TimeoutExpired, OSError) as e:
+        if _ffmpeg() is not None:
+            logger.warning(f"Audio analysis failed, transcribing as-is: {e}")
+        return None
+
+    duration = len(samples) / SAMPLE_RATE
+    if vad:
+        speech = detect_speech(samples)
+        has_speech = (
+            duration >= settings.vad_min_duration_seconds
+            and speech["peak_dbfs"] is not None
+            and speech["peak_dbfs"] >= settings.vad_min_level_dbfs
+        )
+    else:
+        speech = {"duration": duration, "peak_dbfs": None, "speech_seconds": duration, "start": 0.0, "end": duration}
+        has_speech = True
+
+    analysis = {
+        "has_speech": has_speech,
+        "audio": audio_data,
+        "content_type": None,
+        "duration": round(duration, 3),
+        "peak_dbfs": speech["peak_dbfs"],
+        "speech_seconds": round(speech["speech_seconds"], 3),
+        "trimmed": False,
+        "normalized": False,
+        "seconds_saved": 0.0,
+        "original_bytes": len(audio_data),
+        "bytes": len(audio_data)
+    }
+
+    if not analysis["has_speech"]:
+        analysis["seconds_saved"] = round(duration, 3)
+    else:
+        if speech["start"] is None:
+            # Nothing stands out from the noise: send everything
+            start, end = 0.0, duration
+        else:
+            start = max(0.0, speech["start"] - settings.vad_padding_seconds)
+            end = min(duration, speech["end"] + settings.vad_padding_seconds)
+        trim = vad and start + (duration - end) >= settings.vad_min_trim_seconds
+        if not trim:
+            start, end = 0.0, duration
+
+        try:
+            if normalize:
+                output = encode_speech(samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)])
+                # Already compact uploads are kept unless trimming shortened them
+                if len(output) < len(audio_data) or trim:
+                    analysis["normalized"] = True
+                    analysis["content_type"] = NORMALIZED_CONTENT_TYPE
+                else:
+                    output = None
+            else:
+                output = trim_audio(audio_data, start, end) if trim else None
+        except (AudioDecodeError, subprocess.TimeoutExpired, OSError) as e:
+            logger.warning(f"Failed to trim / normalize audio, transcribing the original: {e}")
+            output = None
+            analysis["normalized"] = False
+            analysis["content_type"] = None
+
+        if output:
+            analysis["audio"] = output
+            analysis["bytes"] = len(output)
+            if trim:
+                analysis["trimmed"] = True
+                analysis["seconds_saved"] = round(start + (duration - end), 3)
+
+    analysis["analysis_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return analysis
+
+
+# Process pool for _prepare_audio (created on first use)
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn: the server process has many threads, which fork does not copy safely
+            _process_pool = ProcessPoolExecutor(
+                max_workers=get_settings().audio_process_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+
+def prepare_audio(audio_data: bytes, vad: bool = True, normalize: bool = True) -> Optional[Dict]:
+    """Run the pre-processing stages in this process (see _prepare_audio for the result)"""
+    analysis = _prepare_audio(audio_data, vad, normalize)
+    _record(analysis)
+    return analysis
+
+
+async def prepare_audio_async(audio_data: bytes, vad: bool = True, normalize: bool = True) -> Optional[Dict]:
+    """prepare_audio() in the audio process pool, off the event loop and transcription threads"""
+    loop = asyncio.get_running_loop()
+    analysis = await loop.run_in_executor(_get_process_pool(), _prepare_audio, audio_data, vad, normalize)
+    _record(analysis)
+    return analysis
+
+
+def shutdown_audio_process_pool():
+    """Stop the audio worker processes (called on shutdown)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def get_audio_analysis_stats() -> Dict:
+    """Process-wide pre-processing counters (exposed on /api/health/transcription-queue)"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["seconds_analyzed"] = round(stats["seconds_analyzed"], 1)
+    stats["seconds_saved"] = round(stats["seconds_saved"], 1)
+    stats["enabled"] = get_settings().vad_enabled
+    stats["normalize_enabled"] = get_settings().audio_normalize_enabled
+    stats["ffmpeg"] = shutil.which(get_settings().ffmpeg_path) is not None
+    if stats["bytes_in"]:
+        stats["size_reduction"] = round(1 - stats["bytes_out"] / stats["bytes_in"], 3)
+    return stats
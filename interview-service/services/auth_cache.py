@@ -0,0 +1,126 @@
+"""
+Auth Cache Service
+Bounded TTL + LRU cache of authenticated users keyed by JWT, so that
+status polls and static files don't cost a users lookup per request
+
+Users are created and updated by the Node backend, which cannot reach this
+cache, so a role or active-status change (or a logout) is only picked up
+once the entry expires: AUTH_CACHE_TTL_SECONDS, or the token's own expiry
+if sooner, is the bound on staleness. The one case seen here, a token whose
+user no longer exists, drops every entry of that user (invalidate_user).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from config import get_settings
+
+
+class AuthCache:
+    """LRU cache of token -> user document with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[Dict]:
+        """
+        Return a copy of the cached user for this token, or None on miss
+
+        Expired entries are dropped and counted as misses.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user = entry
+            if expires_at <= now:
+                del self._entries[token]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return dict(user)
+
+    def set(self, token: str, user: Dict, token_exp: Optional[float] = None):
+        """
+        Cache a user for this token
+
+        Args:
+            token: Raw JWT
+            user: User document (with string _id)
+            token_exp: JWT "exp" claim; the entry never outlives the token
+        """
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+
+        with self._lock:
+            self._entries[token] = (expires_at, dict(user))
+            self._entries.move_to_end(token)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop every token cached for a user (e.g. once the user is deleted)"""
+        with self._lock:
+            tokens = [
+                token for token, (_, user) in self._entries.items()
+                if user.get("_id") == str(user_id)
+            ]
+            for token in tokens:
+                del self._entries[token]
+            self.invalidations += len(tokens)
+            return len(tokens)
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+# Singleton instance
+_auth_cache = None
+
+
+def get_auth_cache() -> AuthCache:
+    """Get or create auth cache singleton"""
+    global _auth_cache
+    if _auth_cache is None:
+        settings = get_settings()
+        _auth_cache = AuthCache(
+            max_entries=settings.auth_cache_max_entries,
+            ttl_seconds=settings.auth_cache_ttl_seconds
+        )
+    return _auth_cache
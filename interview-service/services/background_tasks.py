@@ -1,152 +1,685 @@
 """
 Background Task Service for async audio transcription
 Handles transcription processing without blocking API responses
+
+Transcription jobs are queued in the durable `transcription_jobs` collection
+(services/job_queue.py) and executed by the worker pool in
+services/transcription_worker.py, which calls run_transcription_job().
+
+With SCORE_ON_TRANSCRIPTION enabled, each answer is also scored right after
+its transcript is stored, so /api/analyze mostly aggregates.
+
+Recordings first go through the voice-activity pre-filter
+(services/audio_analysis.py): silent ones are stored as "no_speech" with an
+empty transcript without calling the API, and leading / trailing silence is
+trimmed off the rest. The audio seconds this saves are added up per session
+in `audio_seconds_saved`.
+
+Jobs carry the SHA-256 of the upload: audio that is identical to an
+already transcribed recording gets that transcript attached, and a job
+whose audio is being transcribed for another answer right now waits for it
+(services/transcript_dedup.py) instead of calling the API again.
+
+Every answer status change is also published to services/status_events.py,
+which pushes it to /api/transcription-events subscribers.
+
+Answers recorded in segments get one job per segment (payload "segment"),
+so segments are transcribed while the candidate is still talking. Each
+segment's result is stored under `answers.<question_id>.segments.<index>`,
+and finalize_segmented_answer() stitches the transcripts in order once the
+answer is complete and every segment is done. An answer whose client went
+away before completing it is finished by expire_stale_recording().
 """
 
+import asyncio
+import contextvars
 import logging
-from datetime import datetime
-from typing import Optional
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
 from io import BytesIO
 
-from services.gridfs_service import get_gridfs_service
-from services.transcription_service import transcribe_audio
+from services.gridfs_service import get_gridfs_service, audio_extension
+from services.audio_analysis import prepare_audio_async
+from services.transcription_service import get_transcriber
+from services.job_queue import JobQueue, DEAD as JOB_DEAD
+from services.transcript_dedup import get_transcript_dedup
+from services.evaluation_engine import score_answer_on_transcription
+from services.llm_metrics import llm_context
+from services.status_events import (
+    publish_answer_status, PROCESSING, COMPLETED, QUEUED, FAILED, SCORED, NO_SPEECH, RECORDING, PARTIAL
+)
 from database import get_db
+from config import get_settings
 
 logger = logging.getLogger("backend.background_tasks")
 
 
+class PermanentTranscriptionError(Exception):
+    """Failure that retrying cannot fix (e.g. the audio file is gone)"""
+
+
+class TranscriptionDeferred(Exception):
+    """Identical audio is being transcribed for another upload; run the job again later"""
+
+
+class AnswerReplaced(Exception):
+    """The answer was recorded again since the job was queued; its result is not wanted"""
+
+
+def _transcribe_bytes(transcriber: Callable, audio_data: bytes, filename: str = "answer.webm") -> str:
+    """Run a (blocking) transcriber over in-memory audio"""
+    # Create BytesIO object for transcription service
+    audio_stream = BytesIO(audio_data)
+    audio_stream.name = filename  # Required by OpenAI API (format is taken from the extension)
+    return transcriber(audio_stream)
+
+
+def _answer_path(question_id: str, segment: Optional[int] = None) -> str:
+    path = f"answers.{question_id}"
+    return path if segment is None else f"{path}.segments.{segment}"
+
+
+async def _set_answer_fields(
+    session_id: str,
+    question_id: str,
+    fields: Dict,
+    segment: Optional[int] = None,
+    answer_id: Optional[str] = None
+) -> bool:
+    """
+    Update fields of an answer, or of one of its segments
+
+    With `answer_id` (the answer the job was queued for) nothing is written
+    once the answer has been replaced by a new recording.
+
+    Returns:
+        bool: False if the answer was replaced
+    """
+    path = _answer_path(question_id, segment)
+    query = {"id": session_id}
+    if answer_id is not None:
+        query[f"answers.{question_id}.id"] = answer_id
+    async with get_db() as db:
+        result = await db.interview_sessions.update_one(
+            query,
+            {"$set": {f"{path}.{key}": value for key, value in fields.items()}}
+        )
+    return bool(result.matched_count)
+
+
+async def _answer_is_current(session_id: str, question_id: str, answer_id: str) -> bool:
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one(
+            {"id": session_id, f"answers.{question_id}.id": answer_id},
+            {"_id": 1}
+        )
+    return session is not None
+
+
+async def _record_seconds_saved(session_id: str, analysis: Optional[Dict]):
+    if analysis and analysis["seconds_saved"] > 0:
+        async with get_db() as db:
+            await db.interview_sessions.update_one(
+                {"id": session_id},
+                {"$inc": {"audio_seconds_saved": analysis["seconds_saved"]}}
+            )
+
+
+def _analysis_summary(analysis: Optional[Dict]) -> Optional[Dict]:
+    """Stored on the answer (everything but the audio itself)"""
+    if analysis is None:
+        return None
+    return {key: value for key, value in analysis.items() if key != "audio"}
+
+
+async def _delete_audio(file_id: str):
+    try:
+        await get_gridfs_service().delete_audio(file_id)
+        logger.info(f"Audio deleted from GridFS after transcription: {file_id}")
+    except Exception as delete_error:
+        logger.error(f"Failed to delete audio from GridFS: {delete_error}")
+        # Don't fail the whole task if deletion fails
+
+
+async def _attach_transcript(
+    file_id: str,
+    session_id: str,
+    question_id: str,
+    entry: Dict,
+    answer_id: Optional[str] = None
+) -> bool:
+    """Complete an answer with the transcript of identical, already transcribed audio"""
+    status = entry["status"]
+    transcript = entry.get("transcript") or ""
+    if not await _set_answer_fields(session_id, question_id, {
+        "transcript": transcript,
+        "transcription_status": status,
+        "transcribed_at": datetime.utcnow(),
+        "transcript_reused": True,
+        "gridfs_file_id": None
+    }, answer_id=answer_id):
+        raise AnswerReplaced(f"Answer {answer_id} was replaced")
+    get_transcript_dedup().record_reuse()
+    logger.info(f"Transcript reused for identical audio: session={session_id}, question={question_id}")
+    await _delete_audio(file_id)
+    if status == NO_SPEECH:
+        await publish_answer_status(session_id, question_id, NO_SPEECH)
+    else:
+        await publish_answer_status(session_id, question_id, COMPLETED, transcript=transcript)
+    return True
+
+
+async def _store_normalized_audio(
+    file_id: str,
+    analysis: Dict,
+    session_id: str,
+    question_id: str,
+    user_id: str,
+    segment: Optional[int] = None,
+    answer_id: Optional[str] = None
+) -> Optional[str]:
+    """
+    Replace the uploaded file with its normalized version in GridFS
+
+    The copy is written before the original is deleted, and records which
+    file it replaces (`normalized_from`), so a retried job still finds its
+    audio. The analysis is stored on the answer at the same time, since a
+    retry does not run it again. Returns the new file ID, or None if the
+    original is kept.
+    """
+    gridfs_service = get_gridfs_service()
+    try:
+        normalized_id = await gridfs_service.store_audio(
+            analysis["audio"],
+            session_id=session_id,
+            question_id=question_id,
+            user_id=user_id,
+            filename=f"answer.{audio_extension(analysis['content_type'])}",
+            content_type=analysis["content_type"],
+            normalized_from=file_id,
+            original_size=analysis["original_bytes"]
+        )
+    except Exception as e:
+        logger.error(f"Failed to store normalized audio, keeping the original: {e}")
+        return None
+
+    if not await _set_answer_fields(session_id, question_id, {
+        "gridfs_file_id": normalized_id,
+        "audio_analysis": _analysis_summary(analysis)
+    }, segment, answer_id):
+        await _delete_audio(normalized_id)
+        raise AnswerReplaced(f"Answer {answer_id} was replaced")
+    await _record_seconds_saved(session_id, analysis)
+    await _delete_audio(file_id)
+    return normalized_id
+
+
 async def process_audio_transcription(
     file_id: str,
     session_id: str,
     question_id: str,
-    user_id: str
-):
+    user_id: str,
+    transcriber: Optional[Callable] = None,
+    executor: Optional[Executor] = None,
+    segment: Optional[int] = None,
+    sha256: Optional[str] = None,
+    answer_id: Optional[str] = None
+) -> bool:
     """
-    Background task to transcribe audio and update database
-    
+    Transcribe one answer (or one segment of it) and update database
+
     This function:
     1. Retrieves audio from GridFS
-    2. Transcribes using Whisper API
-    3. Updates interview_sessions with transcript
-    4. Deletes audio from GridFS (keep only text)
-    5. Handles errors gracefully
+    2. Runs the voice-activity pre-filter and normalization in the audio
+       process pool; silent recordings stop here with status "no_speech",
+       others are trimmed and re-encoded (mono 16 kHz Opus), and the
+       normalized file replaces the upload in GridFS
+    3. Transcribes using Whisper API (in `executor`, off the event loop)
+    4. Updates interview_sessions with transcript
+    5. Deletes audio from GridFS (keep only text)
+
+    For a segment, steps 3-4 apply to `answers.<question_id>.segments.<segment>`
+    and the answer is stitched when it was the last one outstanding.
     
+    Errors are raised to the caller so the job queue can retry them;
+    PermanentTranscriptionError marks failures that should not be retried,
+    TranscriptionDeferred a job that has to wait for identical audio, and
+    AnswerReplaced a job whose answer was recorded again (every write is
+    conditional on `answer_id`, so a stale job never touches the new one).
+
     Args:
         file_id: GridFS file ID
         session_id: Interview session ID
         question_id: Question ID
         user_id: User ID
+        transcriber: Blocking transcription function (defaults to TRANSCRIPTION_BACKEND)
+        executor: Executor used for the blocking call (defaults to asyncio's)
+        segment: Index of the segment, for answers uploaded in segments
+        sha256: Hash of the uploaded audio, to reuse identical transcriptions
+        answer_id: ID of the answer the job was queued for
+    
+    Returns:
+        bool: True once the answer's final transcript is stored
     """
     gridfs_service = get_gridfs_service()
-    
-    try:
+    transcriber = transcriber or get_transcriber()
+
+    logger.info(
+        f"Starting transcription: session={session_id}, "
+        f"question={question_id}, segment={segment}, file={file_id}"
+    )
+
+    # Identical audio: reuse its transcript, or wait while it is being transcribed
+    dedup = None
+    if sha256 and segment is None and get_settings().transcript_dedup_enabled:
+        dedup = get_transcript_dedup()
+        entry = await dedup.claim(sha256, file_id)
+        if entry is not None:
+            if entry["status"] == PROCESSING:
+                raise TranscriptionDeferred(f"Identical audio is being transcribed for {entry.get('owner')}")
+            return await _attach_transcript(file_id, session_id, question_id, entry, answer_id)
+
+    # Step 1: Retrieve audio from GridFS
+    audio_file = await gridfs_service.get_audio_file(file_id)
+
+    if audio_file is None:
+        # An earlier attempt may have replaced the upload with its normalized copy
+        normalized_id = await gridfs_service.find_normalized_audio(file_id)
+        if normalized_id:
+            file_id = normalized_id
+            audio_file = await gridfs_service.get_audio_file(file_id)
+
+    if not audio_file or not audio_file["data"]:
+        if answer_id is not None and not await _answer_is_current(session_id, question_id, answer_id):
+            # Deleted along with the recording it belonged to
+            raise AnswerReplaced(f"Answer {answer_id} was replaced")
+        logger.error(f"Audio file not found in GridFS: {file_id}")
+        raise PermanentTranscriptionError("Audio file not found")
+
+    # Mark as processing
+    if not await _set_answer_fields(session_id, question_id, {
+        "transcription_status": "processing",
+        "gridfs_file_id": file_id
+    }, segment, answer_id):
+        raise AnswerReplaced(f"Answer {answer_id} was replaced")
+    if segment is None:
+        await publish_answer_status(session_id, question_id, PROCESSING)
+
+    audio_data = audio_file["data"]
+    content_type = audio_file["content_type"]
+
+    # Step 2: Voice-activity pre-filter + normalization (ffmpeg, in the audio
+    # process pool); skipped for files that were already normalized
+    settings = get_settings()
+    analysis = None
+    if audio_file.get("normalized_from") is None and (settings.vad_enabled or settings.audio_normalize_enabled):
+        analysis = await prepare_audio_async(
+            audio_data,
+            vad=settings.vad_enabled,
+            normalize=settings.audio_normalize_enabled
+        )
+
+    if analysis is not None and not analysis["has_speech"]:
         logger.info(
-            f"Starting transcription: session={session_id}, "
-            f"question={question_id}, file={file_id}"
+            f"No speech detected, skipping transcription: session={session_id}, "
+            f"question={question_id}, duration={analysis['duration']}s"
         )
-        
-        # Mark as processing
-        with get_db() as db:
-            db.interview_sessions.update_one(
-                {"id": session_id},
-                {"$set": {
-                    f"answers.{question_id}.transcription_status": "processing",
-                    f"answers.{question_id}.gridfs_file_id": file_id
-                }}
+        current = await _set_answer_fields(session_id, question_id, {
+            "transcript": "",
+            "transcription_status": "no_speech",
+            "transcribed_at": datetime.utcnow(),
+            "audio_analysis": _analysis_summary(analysis),
+            "gridfs_file_id": None
+        }, segment, answer_id)
+        if dedup is not None:
+            await dedup.store(sha256, NO_SPEECH, "")
+        if not current:
+            raise AnswerReplaced(f"Answer {answer_id} was replaced")
+        await _record_seconds_saved(session_id, analysis)
+        await _delete_audio(file_id)
+        if segment is not None:
+            return await _segment_done(session_id, question_id, segment, transcript="")
+        await publish_answer_status(session_id, question_id, NO_SPEECH)
+        return True
+
+    if analysis is not None:
+        audio_data = analysis["audio"]
+        if analysis["normalized"]:
+            content_type = analysis["content_type"]
+            logger.info(
+                f"Audio normalized: session={session_id}, question={question_id}, "
+                f"{analysis['original_bytes']} -> {analysis['bytes']} bytes"
             )
-        
-        # Step 1: Retrieve audio from GridFS
-        audio_data = gridfs_service.get_audio(file_id)
-        
-        if not audio_data:
-            logger.error(f"Audio file not found in GridFS: {file_id}")
-            # Mark as failed
-            with get_db() as db:
-                db.interview_sessions.update_one(
-                    {"id": session_id},
-                    {"$set": {
-                        f"answers.{question_id}.transcription_status": "failed",
-                        f"answers.{question_id}.transcript": "",
-                        f"answers.{question_id}.transcription_error": "Audio file not found"
-                    }}
-                )
-            return
-        
-        # Step 2: Transcribe audio using Whisper API
-        try:
-            # Create BytesIO object for transcription service
-            audio_stream = BytesIO(audio_data)
-            audio_stream.name = "answer.webm"  # Required by OpenAI API
-            
-            transcript = transcribe_audio(audio_stream)
-            
-            if not transcript:
-                transcript = ""
-                logger.warning(f"Empty transcript for session={session_id}, question={question_id}")
-        
-        except Exception as transcription_error:
-            logger.error(f"Transcription failed: {transcription_error}")
-            transcript = ""
-            
-            # Mark as failed with error
-            with get_db() as db:
-                db.interview_sessions.update_one(
-                    {"id": session_id},
-                    {"$set": {
-                        f"answers.{question_id}.transcription_status": "failed",
-                        f"answers.{question_id}.transcript": "",
-                        f"answers.{question_id}.transcription_error": str(transcription_error)
-                    }}
-                )
-            
-            # Still delete the audio file to free space
-            try:
-                gridfs_service.delete_audio(file_id)
-            except Exception as delete_error:
-                logger.error(f"Failed to delete audio after transcription error: {delete_error}")
-            
-            return
-        
-        # Step 3: Update database with transcript
-        with get_db() as db:
-            db.interview_sessions.update_one(
-                {"id": session_id},
-                {"$set": {
-                    f"answers.{question_id}.transcript": transcript,
-                    f"answers.{question_id}.transcription_status": "completed",
-                    f"answers.{question_id}.transcribed_at": datetime.utcnow(),
-                    f"answers.{question_id}.gridfs_file_id": None  # Clear file reference
-                }}
+            normalized_id = await _store_normalized_audio(
+                file_id, analysis, session_id, question_id, user_id, segment, answer_id
             )
-        
-        logger.info(
-            f"Transcription completed: session={session_id}, "
-            f"question={question_id}, length={len(transcript)}"
+            if normalized_id:
+                # Already recorded on the answer with the normalized file
+                file_id, analysis = normalized_id, None
+
+    loop = asyncio.get_running_loop()
+
+    # Step 3: Transcribe audio off the event loop (in a copy of this context,
+    # so the request is tagged with the session in the LLM call metrics)
+    with llm_context(session_id=session_id):
+        context = contextvars.copy_context()
+    transcript = await loop.run_in_executor(
+        executor, context.run, _transcribe_bytes, transcriber, audio_data, f"answer.{audio_extension(content_type)}"
+    )
+
+    if not transcript:
+        transcript = ""
+        logger.warning(f"Empty transcript for session={session_id}, question={question_id}")
+
+    # Step 4: Update database with transcript
+    fields = {
+        "transcript": transcript,
+        "transcription_status": "completed",
+        "transcribed_at": datetime.utcnow(),
+        "gridfs_file_id": None  # Clear file reference
+    }
+    if analysis is not None:
+        fields["audio_analysis"] = _analysis_summary(analysis)
+    current = await _set_answer_fields(session_id, question_id, fields, segment, answer_id)
+    if dedup is not None:
+        await dedup.store(sha256, COMPLETED, transcript)
+    if not current:
+        raise AnswerReplaced(f"Answer {answer_id} was replaced")
+    await _record_seconds_saved(session_id, analysis)
+
+    logger.info(
+        f"Transcription completed: session={session_id}, "
+        f"question={question_id}, segment={segment}, length={len(transcript)}"
+    )
+
+    # Step 5: Delete audio from GridFS (keep only text)
+    await _delete_audio(file_id)
+
+    if segment is not None:
+        return await _segment_done(session_id, question_id, segment, transcript=transcript)
+    await publish_answer_status(session_id, question_id, COMPLETED, transcript=transcript)
+    return True
+
+
+async def _segment_done(session_id: str, question_id: str, segment: int, **fields) -> bool:
+    """Announce a finished segment and stitch the answer if it was the last one"""
+    await publish_answer_status(session_id, question_id, PARTIAL, segment=segment, **fields)
+    return await finalize_segmented_answer(session_id, question_id)
+
+
+async def finalize_segmented_answer(session_id: str, question_id: str) -> bool:
+    """
+    Stitch the transcript of an answer uploaded in segments
+    
+    Does nothing until the answer is complete (`segment_count` is set by
+    POST /upload-answer/.../complete) and every segment is transcribed,
+    no_speech or failed. Segment transcripts are joined in index order;
+    failed segments are skipped and listed in `failed_segments`, and the
+    answer only fails if all of them did.
+    
+    Called after every segment and on completion; the conditional update
+    makes sure only one caller stores and announces the result.
+    
+    Returns:
+        bool: True if this call stored the final transcript
+    """
+    path = _answer_path(question_id)
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one(
+            {"id": session_id},
+            {"_id": 0, path: 1}
         )
-        
-        # Step 4: Delete audio from GridFS (keep only text)
-        try:
-            gridfs_service.delete_audio(file_id)
-            logger.info(f"Audio deleted from GridFS after transcription: {file_id}")
-        except Exception as delete_error:
-            logger.error(f"Failed to delete audio from GridFS: {delete_error}")
-            # Don't fail the whole task if deletion fails
+    answer = ((session or {}).get("answers") or {}).get(question_id)
+    if not answer or answer.get("segment_count") is None:
+        return False
+    if answer.get("transcription_status") not in (RECORDING, PROCESSING):
+        return False
+    
+    segments = answer.get("segments") or {}
+    states = [segments.get(str(index)) or {} for index in range(answer["segment_count"])]
+    if any(state.get("transcription_status") not in (COMPLETED, NO_SPEECH, FAILED) for state in states):
+        return False
+    
+    failed = [index for index, state in enumerate(states) if state["transcription_status"] == FAILED]
+    transcript = " ".join(
+        state["transcript"].strip() for state in states
+        if state["transcription_status"] == COMPLETED and (state.get("transcript") or "").strip()
+    )
+    fields = {
+        "transcript": transcript,
+        "transcribed_at": datetime.utcnow(),
+        "gridfs_file_id": None
+    }
+    if failed and len(failed) == len(states):
+        status = FAILED
+        fields["transcription_error"] = states[-1].get("transcription_error") or "All segments failed"
+    elif not transcript and not failed:
+        status = NO_SPEECH
+    else:
+        status = COMPLETED
+    fields["transcription_status"] = status
+    if failed:
+        fields["failed_segments"] = failed
     
+    async with get_db() as db:
+        result = await db.interview_sessions.update_one(
+            {
+                "id": session_id,
+                f"{path}.id": answer.get("id"),
+                f"{path}.transcription_status": answer["transcription_status"]
+            },
+            {"$set": {f"{path}.{key}": value for key, value in fields.items()}}
+        )
+    if not result.modified_count:
+        return False
+    
+    logger.info(
+        f"Segmented answer stitched: session={session_id}, question={question_id}, "
+        f"segments={len(states)}, failed={failed}, status={status}"
+    )
+    if status == COMPLETED:
+        await publish_answer_status(session_id, question_id, COMPLETED, transcript=transcript)
+    elif status == FAILED:
+        await publish_answer_status(session_id, question_id, FAILED, error=fields["transcription_error"])
+    else:
+        await publish_answer_status(session_id, question_id, NO_SPEECH)
+    return True
+
+
+def recording_is_stale(answer: Dict, now: Optional[datetime] = None) -> bool:
+    """A segmented answer that got no segment for ANSWER_RECORDING_TIMEOUT_SECONDS"""
+    if answer.get("transcription_status") != RECORDING:
+        return False
+    last_activity = answer.get("last_segment_at") or answer.get("created_at")
+    if last_activity is None:
+        return True
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=get_settings().answer_recording_timeout_seconds)
+    return last_activity < cutoff
+
+
+async def expire_stale_recording(session_id: str, question_id: str, answer: Dict) -> bool:
+    """
+    Finish a segmented answer whose client never called /complete (tab
+    closed, crash, lost connection)
+
+    The answer is completed with the segments received so far: segment_count
+    becomes the highest index + 1, and missing indices are recorded as
+    failed segments, so finalize_segmented_answer() stitches the rest (or
+    fails the answer if no segment has a transcript). The update is
+    conditional on no segment having arrived since `answer` was read.
+
+    Returns:
+        bool: True if this call expired the recording
+    """
+    if not recording_is_stale(answer):
+        return False
+
+    path = _answer_path(question_id)
+    received = {int(index) for index in (answer.get("segments") or {})}
+    segment_count = max(received) + 1 if received else 0
+    fields = {
+        f"{path}.segment_count": segment_count,
+        f"{path}.transcription_status": PROCESSING,
+        f"{path}.recording_expired": True
+    }
+    for index in set(range(segment_count)) - received:
+        fields[f"{path}.segments.{index}"] = {
+            "transcript": "",
+            "transcription_status": FAILED,
+            "transcription_error": "Segment never uploaded"
+        }
+    if not segment_count:
+        fields[f"{path}.transcription_status"] = FAILED
+        fields[f"{path}.transcription_error"] = "Recording abandoned before any segment was stored"
+
+    async with get_db() as db:
+        result = await db.interview_sessions.update_one(
+            {
+                "id": session_id,
+                f"{path}.id": answer.get("id"),
+                f"{path}.transcription_status": RECORDING,
+                f"{path}.last_segment_at": answer.get("last_segment_at")
+            },
+            {"$set": fields}
+        )
+    if not result.modified_count:
+        return False
+
+    logger.warning(
+        f"Recording abandoned, finishing with {len(received)} segment(s): "
+        f"session={session_id}, question={question_id}"
+    )
+    if not segment_count:
+        await publish_answer_status(session_id, question_id, FAILED, error=fields[f"{path}.transcription_error"])
+    elif not await finalize_segmented_answer(session_id, question_id):
+        await publish_answer_status(session_id, question_id, PROCESSING)
+    return True
+
+
+async def score_transcribed_answer(session_id: str, question_id: str):
+    """Score a freshly transcribed answer when SCORE_ON_TRANSCRIPTION is on"""
+    if not get_settings().score_on_transcription:
+        return
+    # Best effort: analyze_session scores anything left unscored
+    try:
+        result = await score_answer_on_transcription(session_id, question_id)
+        if result is not None:
+            await publish_answer_status(session_id, question_id, SCORED, score=result["score"])
     except Exception as e:
-        logger.error(f"Background transcription task failed: {e}", exc_info=True)
-        
-        # Mark as failed
+        logger.error(
+            f"Scoring on transcription failed: session={session_id}, "
+            f"question={question_id}: {e}"
+        )
+
+
+async def _delete_job_audio(file_id: str):
+    """Delete a job's upload and any normalized copy of it"""
+    try:
+        gridfs_service = get_gridfs_service()
+        normalized_id = await gridfs_service.find_normalized_audio(file_id)
+        await gridfs_service.delete_audio(file_id)
+        if normalized_id:
+            await gridfs_service.delete_audio(normalized_id)
+    except Exception as delete_error:
+        logger.error(f"Failed to delete audio of transcription job: {delete_error}")
+
+
+async def run_transcription_job(
+    queue: JobQueue,
+    job: Dict,
+    transcriber: Optional[Callable] = None,
+    executor: Optional[Executor] = None
+):
+    """
+    Execute a claimed transcription job and record its outcome
+
+    On a retryable failure the answer goes back to "queued"; once the job is
+    dead-lettered (here, or by the queue when its worker was lost on the
+    last attempt) the answer is marked "failed" and its audio is deleted.
+    For a segment job the same applies to the segment, and a dead-lettered
+    segment is left out of the stitched transcript. A job whose answer was
+    recorded again in the meantime is dropped along with its audio.
+    """
+    payload = job["payload"]
+    session_id = payload["session_id"]
+    question_id = payload["question_id"]
+    file_id = payload["file_id"]
+    segment = payload.get("segment")
+    sha256 = payload.get("sha256")
+    answer_id = payload.get("answer_id")
+
+    if job["status"] == JOB_DEAD:
+        # Dead-lettered on claim: its lease expired on the last attempt
+        error, dead = job["last_error"], True
+    else:
         try:
-            with get_db() as db:
-                db.interview_sessions.update_one(
-                    {"id": session_id},
-                    {"$set": {
-                        f"answers.{question_id}.transcription_status": "failed",
-                        f"answers.{question_id}.transcription_error": str(e)
-                    }}
-                )
-        except Exception as db_error:
-            logger.error(f"Failed to update error status in database: {db_error}")
+            finished = await process_audio_transcription(
+                file_id=file_id,
+                session_id=session_id,
+                question_id=question_id,
+                user_id=payload.get("user_id"),
+                transcriber=transcriber,
+                executor=executor,
+                segment=segment,
+                sha256=sha256,
+                answer_id=answer_id
+            )
+            await queue.complete(job)
+        except TranscriptionDeferred as e:
+            logger.info(f"Transcription deferred: session={session_id}, question={question_id}: {e}")
+            get_transcript_dedup().record_deferred()
+            await queue.defer(job, get_settings().transcript_dedup_wait_seconds)
+            return
+        except AnswerReplaced as e:
+            logger.info(f"Transcription dropped: session={session_id}, question={question_id}: {e}")
+            await queue.complete(job)
+            if sha256 and segment is None:
+                await get_transcript_dedup().release(sha256, file_id)
+            await _delete_job_audio(file_id)
+            return
+        except PermanentTranscriptionError as e:
+            error = str(e)
+            dead = await queue.fail(job, error, permanent=True)
+        except Exception as e:
+            logger.error(f"Transcription failed: {e}", exc_info=True)
+            error = str(e)
+            dead = await queue.fail(job, error)
+        else:
+            if finished:
+                await score_transcribed_answer(session_id, question_id)
+            return
+
+    if sha256 and segment is None:
+        # Let a job waiting for the same audio transcribe it instead
+        await get_transcript_dedup().release(sha256, file_id)
+
+    try:
+        if dead:
+            current = await _set_answer_fields(session_id, question_id, {
+                "transcription_status": "failed",
+                "transcript": "",
+                "transcription_error": error
+            }, segment, answer_id)
+
+            # Still delete the audio file (and any normalized copy) to free space
+            await _delete_job_audio(file_id)
+            
+            if not current:
+                return
+            if segment is None:
+                await publish_answer_status(session_id, question_id, FAILED, error=error)
+            else:
+                await _segment_done(session_id, question_id, segment, error=error)
+        else:
+            current = await _set_answer_fields(session_id, question_id, {
+                "transcription_status": "queued",
+                "transcription_error": error
+            }, segment, answer_id)
+            if current and segment is None:
+                await publish_answer_status(session_id, question_id, QUEUED, error=error)
+    except Exception as db_error:
+        logger.error(f"Failed to update error status in database: {db_error}")
 
 
 def process_audio_transcription_sync(
@@ -158,15 +691,13 @@ def process_audio_transcription_sync(
     """
     Synchronous wrapper for background transcription
     Used by Celery or other sync task queues
-    
+
     Args:
         file_id: GridFS file ID
         session_id: Interview session ID
         question_id: Question ID
         user_id: User ID
     """
-    import asyncio
-    
     # Run async function in sync context
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
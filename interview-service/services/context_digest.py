@@ -0,0 +1,234 @@
+"""
+Context Digest
+Bounded-size digest of a session's job description and resume for LLM prompts
+
+Reference answers and adaptive questions used to re-send the full JD and
+resume text with every call. build_context_digest() runs once at session
+creation and keeps, within CONTEXT_DIGEST_MAX_TOKENS:
+- job requirements: JD lines about skills / experience / responsibilities
+- candidate skills: the resume's skills section
+- candidate experience and key projects: the first lines of each entry
+
+The digest is purely extractive and deterministic (same input, same budget
+-> same digest), so it never invents facts and cached LLM responses keyed on
+it stay valid. The raw texts stay on the session for audit; the digest is
+stored next to them as `context_digest`.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from config import get_settings
+from services.token_counter import count_tokens
+
+logger = logging.getLogger("backend.context_digest")
+
+# Bump when the extraction rules change (stored with each digest)
+DIGEST_VERSION = 1
+
+# Share of the budget per section; budget left unused by a section flows
+# on to the next one
+SECTION_SHARES = [
+    ("requirements", 0.40),
+    ("skills", 0.15),
+    ("experience", 0.20),
+    ("projects", 0.25),
+]
+
+# Characters kept per extracted line
+MAX_LINE_CHARS = 220
+
+_BULLET = re.compile(r"^[\s\-\*•▪●◦‣⁃>·o]+(?=\S)")
+_WHITESPACE = re.compile(r"\s+")
+
+_REQUIREMENT_HINTS = re.compile(
+    r"\b(require|must|should|experience|proficien|knowledge|familiar|skill|"
+    r"responsib|qualif|years?|degree|strong|understanding|ability|hands-on|expert)",
+    re.IGNORECASE
+)
+
+_RESUME_SECTIONS = {
+    "skills": re.compile(r"^(technical\s+)?skills?(\s+(summary|&\s*tools|and\s+tools))?$|^tech(nical)?\s+stack$|^tools(\s+and\s+technologies)?$", re.IGNORECASE),
+    "experience": re.compile(r"^(work\s+|professional\s+)?experience$|^internships?$|^employment(\s+history)?$", re.IGNORECASE),
+    "projects": re.compile(r"^(academic\s+|personal\s+|key\s+)?projects?$", re.IGNORECASE),
+    "other": re.compile(r"^(education|certifications?|achievements?|awards|summary|objective|profile|"
+                        r"interests|hobbies|languages|publications|extra[- ]curricular(\s+activities)?|"
+                        r"positions?\s+of\s+responsibility|contact|references)$", re.IGNORECASE),
+}
+
+
+def _clean_lines(text: str) -> List[str]:
+    lines = []
+    for raw in (text or "").splitlines():
+        line = _WHITESPACE.sub(" ", _BULLET.sub("", raw)).strip()
+        if line:
+            lines.append(line[:MAX_LINE_CHARS])
+    return lines
+
+
+def _dedupe(lines: List[str]) -> List[str]:
+    seen = set()
+    unique = []
+    for line in lines:
+        key = line.lower()
+        if key not in seen:
+            seen.add(key)
+            unique.append(line)
+    return unique
+
+
+def _resume_sections(resume_text: str) -> Dict[str, List[str]]:
+    """Split a resume into sections by their (short, heading-like) titles"""
+    sections: Dict[str, List[str]] = {}
+    current = "header"
+    for line in _clean_lines(resume_text):
+        heading = line.rstrip(":").strip()
+        if len(heading) <= 40:
+            matched = next((name for name, pattern in _RESUME_SECTIONS.items() if pattern.match(heading)), None)
+            if matched:
+                current = matched
+                sections.setdefault(current, [])
+                continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _requirement_lines(job_description: str) -> List[str]:
+    lines = _dedupe(_clean_lines(job_description))
+    # Requirement-like lines first, then the rest, each in document order;
+    # headings ("Requirements:") are not requirements themselves
+    hinted = [line for line in lines if _REQUIREMENT_HINTS.search(line) and len(line.split()) > 3]
+    return hinted + [line for line in lines if line not in hinted]
+
+
+def _skills(lines: List[str]) -> List[str]:
+    """Individual skills from a skills section ("Languages: Python, Java | SQL")"""
+    skills = []
+    for line in lines:
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        skills.extend(part.strip() for part in re.split(r"[,|;/]", line) if part.strip())
+    return _dedupe(skills)
+
+
+def _entry_lines(lines: List[str], per_entry: int = 2) -> List[str]:
+    """
+    First lines of each experience / project entry
+
+    An entry starts at a line that looks like a title (short, no final
+    period); only its first `per_entry` lines are kept so every entry gets
+    represented before any single one is described in detail.
+    """
+    entries: List[List[str]] = []
+    for line in lines:
+        is_title = len(line) <= 90 and not line.endswith(".")
+        if is_title or not entries:
+            entries.append([line])
+        else:
+            entries[-1].append(line)
+
+    kept = [entry[:per_entry] for entry in entries]
+    # Round-robin: titles of all entries first, then their second lines
+    return [entry[i] for i in range(per_entry) for entry in kept if i < len(entry)]
+
+
+def _fit(items: List[str], budget: int, separator_tokens: int = 1) -> Tuple[List[str], int]:
+    """Longest prefix of `items` within `budget` tokens (the first item is truncated if needed)"""
+    kept, used = [], 0
+    for item in items:
+        tokens = count_tokens(item) + separator_tokens
+        if used + tokens > budget:
+            if not kept and budget > separator_tokens:
+                # Truncate proportionally so a section is never left empty
+                chars = max(1, int(len(item) * (budget - separator_tokens) / tokens))
+                item = item[:chars].rstrip()
+                kept.append(item)
+                used += count_tokens(item) + separator_tokens
+            break
+        kept.append(item)
+        used += tokens
+    return kept, used
+
+
+def build_context_digest(job_description: str, resume_text: str, max_tokens: Optional[int] = None) -> Dict:
+    """
+    Build the prompt digest of a JD + resume pair
+
+    Returns:
+        dict: {
+            "version": int,
+            "job_description": str,   # digest used in place of the JD
+            "resume": str,            # digest used in place of the resume text
+            "tokens": int,            # tokens of both digests
+            "source_tokens": int,     # tokens of the raw texts
+            "max_tokens": int
+        }
+    """
+    if max_tokens is None:
+        max_tokens = get_settings().context_digest_max_tokens
+
+    sections = _resume_sections(resume_text)
+    has_structure = any(name in sections for name in ("skills", "experience", "projects"))
+
+    candidates = {
+        "requirements": _requirement_lines(job_description),
+        "skills": _skills(sections.get("skills", [])),
+        "experience": _entry_lines(sections.get("experience", [])),
+        # Without recognisable sections, fall back to the top of the resume
+        "projects": _entry_lines(sections.get("projects", [])) if has_structure
+                    else _clean_lines(resume_text),
+    }
+
+    selected: Dict[str, List[str]] = {}
+    carry = 0
+    used_total = 0
+    for name, share in SECTION_SHARES:
+        budget = int(max_tokens * share) + carry
+        separator = 1 if name == "skills" else 2
+        selected[name], used = _fit(candidates[name], budget, separator)
+        carry = budget - used
+        used_total += used
+
+    jd_digest = "\n".join(f"- {line}" for line in selected["requirements"])
+
+    resume_parts = []
+    if selected["skills"]:
+        resume_parts.append("Skills: " + ", ".join(selected["skills"]))
+    if selected["experience"]:
+        resume_parts.append("Experience:\n" + "\n".join(f"- {line}" for line in selected["experience"]))
+    if selected["projects"]:
+        label = "Key projects" if has_structure else "Background"
+        resume_parts.append(f"{label}:\n" + "\n".join(f"- {line}" for line in selected["projects"]))
+    resume_digest = "\n".join(resume_parts)
+
+    digest = {
+        "version": DIGEST_VERSION,
+        "job_description": jd_digest,
+        "resume": resume_digest,
+        "tokens": count_tokens(jd_digest) + count_tokens(resume_digest),
+        "source_tokens": count_tokens(job_description or "") + count_tokens(resume_text or ""),
+        "max_tokens": max_tokens
+    }
+    logger.debug(f"Context digest: {digest['source_tokens']} -> {digest['tokens']} tokens")
+    return digest
+
+
+def session_context_digest(job_description: str, resume_text: str) -> Optional[Dict]:
+    """Digest to store on a new session, or None when compaction is disabled"""
+    if not get_settings().context_digest_enabled:
+        return None
+    try:
+        return build_context_digest(job_description, resume_text)
+    except Exception as e:
+        # Prompts fall back to the raw texts
+        logger.error(f"Failed to build context digest: {e}")
+        return None
+
+
+def prompt_context(session: Dict) -> Tuple[str, str]:
+    """(job description, resume) to put in prompts: the digest when present, else the raw texts"""
+    digest = session.get("context_digest")
+    if digest and digest.get("version") == DIGEST_VERSION:
+        return digest.get("job_description", ""), digest.get("resume", "")
+    return session.get("job_description", ""), session.get("resume_text", "")
@@ -0,0 +1,486 @@
+"""
+Evaluation Engine for interview sessions
+Scores all answers of a session concurrently instead of one by one
+
+Reference (model) answers only depend on the question, JD and resume, so
+they are precomputed in the background when a session is created
+(precompute_reference_answers) and stored under `reference_answers.<qid>`.
+Scoring reuses them and only generates the ones that are missing.
+
+EVALUATION_MODE selects how answers are scored: "per_answer" (one
+evaluate_answer call each) or "batched" (several answers per request
+within a token budget, falling back to per-answer calls for anything the
+batch could not score).
+
+LLM calls are routed across providers by services/llm_router.py. Prompts
+use the session's context digest (services/context_digest.py) instead of the
+raw JD / resume when one was stored at creation.
+
+Scores are only written to an answer that is still unscored and is still
+the recording that was scored (same answer `id`), whichever path writes
+them (store_answer_scores, score_answer_on_transcription).
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from config import get_settings
+from database import get_db
+from services.llm_metrics import llm_context
+from services.context_digest import prompt_context
+from services.llm_service import (
+    generate_reference_answer_async,
+    evaluate_answer_async,
+    evaluate_answers_batch_async,
+    plan_evaluation_batches,
+    per_answer_prompt_tokens,
+    batch_prompt_tokens,
+)
+
+logger = logging.getLogger("backend.evaluation_engine")
+
+
+async def _score_answer(
+    semaphore: asyncio.Semaphore,
+    question_text: str,
+    transcript: str,
+    jd_text: str,
+    resume_text: str,
+    interview_type: str,
+    reference_answer: Optional[str] = None
+) -> dict:
+    """Evaluate one transcript, generating the reference answer if not precomputed"""
+    if not reference_answer:
+        async with semaphore:
+            reference_answer = await generate_reference_answer_async(
+                question_text,
+                jd_text,
+                resume_text,
+                interview_type
+            )
+
+    async with semaphore:
+        evaluation = await evaluate_answer_async(
+            question_text,
+            transcript,
+            reference_answer,
+            interview_type
+        )
+
+    return _score_result(evaluation, reference_answer)
+
+
+def _score_result(evaluation: dict, reference_answer: str) -> dict:
+    return {
+        "score": evaluation.get("total_score") or evaluation.get("score") or 0,
+        "feedback": evaluation.get("feedback", []),
+        "model_answer": reference_answer
+    }
+
+
+async def _score_batched(
+    semaphore: asyncio.Semaphore,
+    pending: Dict[str, dict],
+    q_map: Dict[str, str],
+    reference_answers: Dict[str, str],
+    jd_text: str,
+    resume_text: str,
+    interview_type: str
+) -> tuple:
+    """
+    Batched evaluation mode for evaluate_session
+
+    Returns:
+        tuple: ({question_id: result or Exception}, evaluation stats)
+    """
+    settings = get_settings()
+    results: Dict[str, object] = {}
+
+    # 1. Reference answers (precomputed ones are reused)
+    async def reference_for(qid: str) -> str:
+        if reference_answers.get(qid):
+            return reference_answers[qid]
+        async with semaphore:
+            return await generate_reference_answer_async(
+                q_map[qid], jd_text, resume_text, interview_type
+            )
+
+    qids = list(pending.keys())
+    references = await asyncio.gather(*[reference_for(qid) for qid in qids], return_exceptions=True)
+
+    items = []
+    for qid, reference in zip(qids, references):
+        if isinstance(reference, Exception):
+            results[qid] = reference
+            continue
+        items.append({
+            "question_id": qid,
+            "question": q_map[qid],
+            "transcript": pending[qid]["transcript"],
+            "reference_answer": reference
+        })
+
+    # 2. Batches within the token budget
+    batches = plan_evaluation_batches(
+        items,
+        interview_type,
+        max_items=settings.evaluation_batch_size,
+        max_tokens=settings.evaluation_batch_max_tokens
+    )
+    stats = {"batches": len(batches), "batched_answers": 0, "fallback_answers": 0, "tokens_saved": 0}
+
+    async def score_individually(item: dict):
+        try:
+            async with semaphore:
+                evaluation = await evaluate_answer_async(
+                    item["question"], item["transcript"], item["reference_answer"],
+                    interview_type
+                )
+            results[item["question_id"]] = _score_result(evaluation, item["reference_answer"])
+        except Exception as e:
+            results[item["question_id"]] = e
+        stats["fallback_answers"] += 1
+
+    async def score_batch(batch: list):
+        try:
+            async with semaphore:
+                evaluations = await evaluate_answers_batch_async(batch, interview_type)
+        except Exception as e:
+            logger.warning(f"Batched evaluation failed ({len(batch)} answers), falling back: {e}")
+            evaluations = {}
+
+        if evaluations:
+            scored = [item for item in batch if item["question_id"] in evaluations]
+            stats["batched_answers"] += len(scored)
+            # Prompt tokens avoided vs. one evaluate_answer call per scored answer
+            stats["tokens_saved"] += (
+                sum(per_answer_prompt_tokens(item, interview_type) for item in scored)
+                - batch_prompt_tokens(batch, interview_type)
+            )
+            for item in scored:
+                results[item["question_id"]] = _score_result(
+                    evaluations[item["question_id"]], item["reference_answer"]
+                )
+
+        await asyncio.gather(*[
+            score_individually(item) for item in batch
+            if item["question_id"] not in evaluations
+        ])
+
+    await asyncio.gather(*[score_batch(batch) for batch in batches])
+
+    return results, stats
+
+
+async def evaluate_session(session: dict, max_concurrency: Optional[int] = None, mode: Optional[str] = None) -> dict:
+    """
+    Score every unscored, transcribed answer of a session concurrently
+
+    Each question runs as its own task (reference answer, then evaluation)
+    and all LLM calls share one semaphore, so wall time is roughly that of
+    the slowest question. A failing question is logged and reported in
+    ``failed`` without affecting the others.
+
+    Args:
+        session: Interview session document
+        max_concurrency: Max in-flight LLM calls (defaults to settings)
+        mode: "per_answer" or "batched" (defaults to EVALUATION_MODE)
+
+    Returns:
+        dict: {
+            "updates": {question_id: {"score", "feedback", "model_answer"}},
+            "failed": {question_id: "error message"},
+            "total_score": float,   # includes previously scored answers
+            "scored_count": int,
+            "evaluation": {"mode", ...}  # batched: batches, fallbacks, tokens_saved
+        }
+    """
+    if max_concurrency is None:
+        max_concurrency = get_settings().llm_max_concurrency
+    if mode is None:
+        mode = get_settings().evaluation_mode
+
+    questions = session.get("questions", [])
+    interview_type = session.get("interview_type", "technical")
+    jd_text, resume_text = prompt_context(session)
+    reference_answers = session.get("reference_answers") or {}
+
+    answers_dict = session.get("answers", {})
+    answers = list(answers_dict.values()) if isinstance(answers_dict, dict) else []
+    q_map = {q["id"]: q.get("text", "") for q in questions}
+
+    total_score = 0
+    scored_count = 0
+    pending: Dict[str, dict] = {}
+
+    for ans in answers:
+        # Skip if already scored or no transcript
+        if ans.get("score") is not None:
+            total_score += ans.get("score", 0)
+            scored_count += 1
+            continue
+
+        if not ans.get("transcript"):
+            continue
+
+        qid = ans.get("question_id")
+        question_text = q_map.get(qid)
+        if not question_text or qid in pending:
+            continue
+
+        pending[qid] = ans
+
+    updates: Dict[str, dict] = {}
+    failed: Dict[str, str] = {}
+    evaluation_stats = {"mode": mode}
+
+    if pending:
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        qids: List[str] = list(pending.keys())
+        # Tag the LLM calls with the session (services/llm_metrics.py)
+        with llm_context(session_id=session.get("id")):
+            if mode == "batched":
+                batched_results, batch_stats = await _score_batched(
+                    semaphore, pending, q_map, reference_answers,
+                    jd_text, resume_text, interview_type
+                )
+                results = [batched_results[qid] for qid in qids]
+                evaluation_stats.update(batch_stats)
+            else:
+                results = await asyncio.gather(
+                    *[
+                        _score_answer(
+                            semaphore,
+                            q_map[qid],
+                            pending[qid]["transcript"],
+                            jd_text,
+                            resume_text,
+                            interview_type,
+                            reference_answer=reference_answers.get(qid)
+                        )
+                        for qid in qids
+                    ],
+                    return_exceptions=True
+                )
+
+        for qid, result in zip(qids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Scoring failed: session={session.get('id')}, question={qid}: {result}")
+                failed[qid] = str(result)
+                continue
+
+            updates[qid] = result
+            total_score += result["score"]
+            scored_count += 1
+
+    return {
+        "updates": updates,
+        "failed": failed,
+        "total_score": total_score,
+        "scored_count": scored_count,
+        "evaluation": evaluation_stats
+    }
+
+
+async def precompute_reference_answers(session_id: str, max_concurrency: Optional[int] = None) -> dict:
+    """
+    Generate and store reference answers for every question of a session
+
+    Runs in the background right after the session is created, while the
+    interview is in progress. Each answer is stored as soon as it is ready
+    (`reference_answers.<qid>`), so a partially finished run still helps;
+    questions that already have one are skipped. Failures are only logged -
+    scoring generates whatever is missing.
+
+    Returns:
+        dict: {"generated": int, "failed": {question_id: "error message"}}
+    """
+    if max_concurrency is None:
+        max_concurrency = get_settings().llm_max_concurrency
+
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one(
+            {"id": session_id},
+            {"questions": 1, "job_description": 1, "resume_text": 1, "context_digest": 1,
+             "interview_type": 1, "reference_answers": 1}
+        )
+
+    if not session:
+        logger.warning(f"Reference answer precompute: session {session_id} not found")
+        return {"generated": 0, "failed": {}}
+
+    existing = session.get("reference_answers") or {}
+    questions = [
+        q for q in session.get("questions", [])
+        if q.get("id") and q.get("text") and not existing.get(q["id"])
+    ]
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    jd_text, resume_text = prompt_context(session)
+
+    async def generate_and_store(question: dict):
+        async with semaphore:
+            reference_answer = await generate_reference_answer_async(
+                question["text"],
+                jd_text,
+                resume_text,
+                session.get("interview_type", "technical")
+            )
+        async with get_db() as db:
+            await db.interview_sessions.update_one(
+                {"id": session_id},
+                {"$set": {f"reference_answers.{question['id']}": reference_answer}}
+            )
+
+    with llm_context(session_id=session_id):
+        results = await asyncio.gather(
+            *[generate_and_store(q) for q in questions],
+            return_exceptions=True
+        )
+
+    failed = {}
+    for question, result in zip(questions, results):
+        if isinstance(result, Exception):
+            logger.error(
+                f"Reference answer precompute failed: session={session_id}, "
+                f"question={question['id']}: {result}"
+            )
+            failed[question["id"]] = str(result)
+
+    generated = len(questions) - len(failed)
+    logger.info(f"Precomputed {generated}/{len(questions)} reference answers for session {session_id}")
+    return {"generated": generated, "failed": failed}
+
+
+async def score_answer_on_transcription(session_id: str, question_id: str) -> Optional[dict]:
+    """
+    Score a single answer as soon as its transcript is written
+
+    Optional pipeline stage (SCORE_ON_TRANSCRIPTION) so that analyze_session
+    only has to aggregate. Idempotent with evaluate_session: answers that
+    already have a score are skipped, and the write only applies while
+    `answers.<qid>.score` is still None and the answer was not re-recorded,
+    so a concurrent analyze never gets overwritten.
+
+    Returns:
+        dict: {"score", "feedback", "model_answer"}, or None if skipped
+    """
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one(
+            {"id": session_id},
+            {"questions": 1, "job_description": 1, "resume_text": 1, "context_digest": 1, "interview_type": 1,
+             f"reference_answers.{question_id}": 1, f"answers.{question_id}": 1}
+        )
+
+    if not session:
+        return None
+
+    answer = (session.get("answers") or {}).get(question_id) or {}
+    if answer.get("score") is not None or not answer.get("transcript"):
+        return None
+
+    question_text = next(
+        (q.get("text") for q in session.get("questions", []) if q.get("id") == question_id),
+        None
+    )
+    if not question_text:
+        return None
+
+    jd_text, resume_text = prompt_context(session)
+    with llm_context(session_id=session_id):
+        result = await _score_answer(
+            asyncio.Semaphore(1),
+            question_text,
+            answer["transcript"],
+            jd_text,
+            resume_text,
+            session.get("interview_type", "technical"),
+            reference_answer=(session.get("reference_answers") or {}).get(question_id)
+        )
+
+    async with get_db() as db:
+        write = await db.interview_sessions.update_one(
+            _unscored_answer(session_id, question_id, answer.get("id")),
+            {"$set": build_answer_updates({question_id: result})}
+        )
+
+    if not write.modified_count:
+        logger.info(f"Answer already scored: session={session_id}, question={question_id}")
+        return None
+
+    logger.info(f"Scored on transcription: session={session_id}, question={question_id}, score={result['score']}")
+    return result
+
+
+def _unscored_answer(session_id: str, question_id: str, answer_id: Optional[str]) -> dict:
+    """Filter matching the scored answer only while it is unscored and not replaced"""
+    return {
+        "id": session_id,
+        f"answers.{question_id}.id": answer_id,
+        f"answers.{question_id}.score": None
+    }
+
+
+async def store_answer_scores(session: dict, result: dict) -> dict:
+    """
+    Write the scores from evaluate_session(session)
+
+    All answers go in one unordered bulk write, each update conditional
+    (see _unscored_answer), so a score stored concurrently by
+    score_answer_on_transcription is kept, and a score for a recording that
+    was replaced is dropped. If any update was skipped, the stored answers
+    are read back to tell which scores are ours and to recompute the totals.
+
+    Returns:
+        dict: {"updates": stored updates, "total_score", "scored_count"}
+    """
+    session_id = session.get("id")
+    answers = session.get("answers") or {}
+    updates = result["updates"]
+    if not updates:
+        return {"updates": {}, "total_score": result["total_score"], "scored_count": result["scored_count"]}
+
+    async with get_db() as db:
+        write = await db.interview_sessions.bulk_write(
+            [
+                UpdateOne(
+                    _unscored_answer(session_id, qid, (answers.get(qid) or {}).get("id")),
+                    {"$set": build_answer_updates({qid: update_data})}
+                )
+                for qid, update_data in updates.items()
+            ],
+            ordered=False
+        )
+    if write.modified_count == len(updates):
+        return {"updates": updates, "total_score": result["total_score"], "scored_count": result["scored_count"]}
+
+    async with get_db() as db:
+        current = await db.interview_sessions.find_one({"id": session_id}, {"_id": 0, "answers": 1})
+    current_answers = (current or {}).get("answers") or {}
+    stored = {
+        qid: update_data for qid, update_data in updates.items()
+        if (current_answers.get(qid) or {}).get("id") == (answers.get(qid) or {}).get("id")
+        and all((current_answers.get(qid) or {}).get(field) == update_data[field]
+                for field in ("score", "feedback", "model_answer"))
+    }
+    logger.info(
+        f"Kept {len(updates) - len(stored)} score(s) written concurrently or for "
+        f"replaced answers: session={session_id}, questions={sorted(set(updates) - set(stored))}"
+    )
+    scores = [answer["score"] for answer in current_answers.values() if answer.get("score") is not None]
+
+    return {"updates": stored, "total_score": sum(scores), "scored_count": len(scores)}
+
+
+def build_answer_updates(updates: Dict[str, dict]) -> dict:
+    """Flatten per-question results into a single $set document"""
+    fields = {}
+    for qid, update_data in updates.items():
+        fields[f"answers.{qid}.score"] = update_data["score"]
+        fields[f"answers.{qid}.feedback"] = update_data["feedback"]
+        fields[f"answers.{qid}.model_answer"] = update_data["model_answer"]
+    return fields
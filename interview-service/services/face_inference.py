@@ -0,0 +1,265 @@
+"""
+Face Inference Service
+Shared pool of MediaPipe face detectors for the /ws/monitor websocket
+
+Frames are decoded and run through MediaPipe on worker threads, never on the
+event loop. Each worker thread owns its own FaceDetection instance (MediaPipe
+graphs are not thread-safe). The pool is fed through a bounded queue; under
+backpressure the oldest queued frame is dropped, and frames that waited
+longer than FACE_FRAME_MAX_AGE_MS are skipped as stale.
+"""
+
+import asyncio
+import base64
+import logging
+import queue
+import struct
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+import mediapipe as mp
+
+from config import get_settings
+
+logger = logging.getLogger("backend.face_inference")
+
+FrameData = Union[str, bytes, bytearray, memoryview, np.ndarray]
+
+# Binary websocket frame: version (u8), sequence number (u32), client
+# timestamp in ms (u64), network byte order, followed by the JPEG bytes
+FRAME_HEADER = struct.Struct("!BIQ")
+FRAME_PROTOCOL_VERSION = 1
+
+
+def parse_binary_frame(data: bytes) -> Tuple[int, int, memoryview]:
+    """
+    Split a binary websocket frame into its header and JPEG payload
+
+    The payload is returned as a memoryview over `data`, so it can be handed
+    to np.frombuffer without copying.
+
+    Raises:
+        ValueError: if the message is too short or has an unknown version
+
+    Returns:
+        tuple: (seq, timestamp_ms, jpeg_payload)
+    """
+    if len(data) <= FRAME_HEADER.size:
+        raise ValueError("Frame too short")
+    version, seq, timestamp_ms = FRAME_HEADER.unpack_from(data)
+    if version != FRAME_PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported frame version: {version}")
+    return seq, timestamp_ms, memoryview(data)[FRAME_HEADER.size:]
+
+
+def decode_frame(frame: FrameData) -> Optional[np.ndarray]:
+    """
+    Decode a JPEG frame into an RGB image
+
+    Args:
+        frame: base64 string (JSON protocol), raw JPEG bytes or a memoryview
+               over them (binary protocol), or a uint8 array over JPEG bytes
+
+    Returns:
+        np.ndarray: RGB image, or None if the frame could not be decoded
+    """
+    try:
+        if isinstance(frame, str):
+            frame = base64.b64decode(frame)
+        if not isinstance(frame, np.ndarray):
+            frame = np.frombuffer(frame, dtype=np.uint8)
+        image = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    except Exception:
+        return None
+
+
+class _FrameJob:
+    __slots__ = ("frame", "submitted_at", "future", "loop")
+
+    def __init__(self, frame: FrameData, future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.frame = frame
+        self.submitted_at = time.perf_counter()
+        self.future = future
+        self.loop = loop
+
+    def resolve(self, result: Optional[Dict]):
+        def _set():
+            if not self.future.done():
+                self.future.set_result(result)
+        self.loop.call_soon_threadsafe(_set)
+
+
+class FaceInferenceService:
+    """Bounded pool of detector threads fed through a queue"""
+
+    def __init__(self, workers: int = 4, queue_size: int = 64, max_frame_age_ms: float = 1000.0):
+        self.workers = max(1, workers)
+        self.max_frame_age = max_frame_age_ms / 1000
+        self._queue: "queue.Queue[Optional[_FrameJob]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._threads = []
+        self._lock = threading.Lock()
+
+        self.processed = 0
+        self.dropped_backpressure = 0
+        self.dropped_stale = 0
+        self.decode_errors = 0
+        self._latencies = deque(maxlen=1000)
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run_worker,
+                name=f"face-inference-{index}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Face inference pool started with {self.workers} worker(s)")
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def _run_worker(self):
+        # MediaPipe detector per thread (not thread-safe to share)
+        face_detector = mp.solutions.face_detection.FaceDetection(
+            model_selection=0,
+            min_detection_confidence=0.6
+        )
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+
+            queue_time = time.perf_counter() - job.submitted_at
+            if queue_time > self.max_frame_age:
+                with self._lock:
+                    self.dropped_stale += 1
+                job.resolve(None)
+                continue
+
+            started = time.perf_counter()
+            rgb = decode_frame(job.frame)
+            if rgb is None:
+                with self._lock:
+                    self.decode_errors += 1
+                job.resolve(None)
+                continue
+
+            try:
+                results = face_detector.process(rgb)
+                face_count = len(results.detections) if results.detections else 0
+            except Exception as e:
+                logger.error(f"Face detection failed: {e}")
+                job.resolve(None)
+                continue
+
+            finished = time.perf_counter()
+            latency_ms = (finished - job.submitted_at) * 1000
+            with self._lock:
+                self.processed += 1
+                self._latencies.append(latency_ms)
+
+            job.resolve({
+                "face_count": face_count,
+                "latency_ms": round(latency_ms, 2),
+                "queue_ms": round(queue_time * 1000, 2),
+                "inference_ms": round((finished - started) * 1000, 2)
+            })
+
+        face_detector.close()
+
+    async def detect(self, frame: FrameData) -> Optional[Dict]:
+        """
+        Run face detection on one frame
+
+        Returns:
+            dict: {"face_count", "latency_ms", "queue_ms", "inference_ms"},
+                  or None if the frame was dropped or could not be decoded
+        """
+        loop = asyncio.get_running_loop()
+        job = _FrameJob(frame, loop.create_future(), loop)
+
+        while True:
+            try:
+                self._queue.put_nowait(job)
+                break
+            except queue.Full:
+                # Backpressure: drop the oldest queued frame in favour of this one
+                try:
+                    stale = self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                if stale is None:
+                    # Shutdown sentinel - put it back and give up on this frame
+                    self._queue.put(None)
+                    return None
+                with self._lock:
+                    self.dropped_backpressure += 1
+                stale.resolve(None)
+
+        return await job.future
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize(),
+                "queue_size": self._queue.maxsize,
+                "processed": self.processed,
+                "dropped_backpressure": self.dropped_backpressure,
+                "dropped_stale": self.dropped_stale,
+                "decode_errors": self.decode_errors
+            }
+        if latencies:
+            stats["latency_ms"] = {
+                "p50": round(latencies[len(latencies) // 2], 2),
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+                "max": round(latencies[-1], 2)
+            }
+        return stats
+
+
+# Singleton instance
+_face_inference_service = None
+
+
+def get_face_inference_service() -> FaceInferenceService:
+    """Get or create (and start) the face inference pool singleton"""
+    global _face_inference_service
+    if _face_inference_service is None:
+        settings = get_settings()
+        _face_inference_service = FaceInferenceService(
+            workers=settings.face_inference_workers,
+            queue_size=settings.face_inference_queue_size,
+            max_frame_age_ms=settings.face_frame_max_age_ms
+        )
+        _face_inference_service.start()
+    return _face_inference_service
+
+
+def get_face_inference_stats() -> Dict:
+    """Pool stats without starting the pool"""
+    if _face_inference_service is None:
+        return {"running": False}
+    return {"running": True, **_face_inference_service.stats()}
+
+
+def stop_face_inference_service():
+    """Stop the pool (called on shutdown)"""
+    global _face_inference_service
+    if _face_inference_service is not None:
+        _face_inference_service.stop()
+        _face_inference_service = None
@@ -4,29 +4,74 @@ Handles audio file storage and retrieval for interview recordings
 """
 
 import gridfs
+import hashlib
+import mimetypes
+from bson import ObjectId
 from datetime import datetime
-from typing import BinaryIO, Optional
-from database import get_mongodb_client
+from typing import BinaryIO, Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket, AsyncIOMotorGridIn
+from config import get_settings
+from database import get_async_mongodb_client
 import logging
 
 logger = logging.getLogger("backend.gridfs_service")
 
+DEFAULT_AUDIO_CONTENT_TYPE = "audio/webm"
+
+# File extension the transcription API expects for each stored content type
+AUDIO_EXTENSIONS = {
+    "audio/webm": "webm",
+    "video/webm": "webm",
+    "audio/ogg": "ogg",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/mpeg": "mp3",
+    "audio/mp4": "m4a",
+    "audio/x-m4a": "m4a",
+    "video/mp4": "mp4",
+}
+
+
+def guess_audio_content_type(filename: Optional[str], declared: Optional[str] = None) -> str:
+    """Content type of an upload: the client's declared type, else from the filename"""
+    for candidate in (declared, mimetypes.guess_type(filename or "")[0]):
+        if candidate:
+            # "audio/webm;codecs=opus" -> "audio/webm"
+            content_type = candidate.split(";")[0].strip().lower()
+            if content_type in AUDIO_EXTENSIONS:
+                return content_type
+    return DEFAULT_AUDIO_CONTENT_TYPE
+
+
+def audio_extension(content_type: Optional[str]) -> str:
+    return AUDIO_EXTENSIONS.get(content_type or "", "webm")
+
+
+class AudioTooLargeError(Exception):
+    """Upload exceeded MAX_AUDIO_UPLOAD_BYTES while streaming"""
+
+
+class EmptyAudioError(Exception):
+    """Upload contained no data"""
+
 
 class GridFSService:
-    """Service for managing audio files in MongoDB GridFS"""
+    """Service for managing audio files in MongoDB GridFS (async, Motor-backed)"""
     
     def __init__(self):
         """Initialize GridFS connection"""
-        self.db = get_mongodb_client()
-        self.fs = gridfs.GridFS(self.db)
+        self.db = get_async_mongodb_client()
+        self.fs = AsyncIOMotorGridFSBucket(self.db)
     
-    def store_audio(
+    async def store_audio(
         self,
         audio_data: bytes,
         session_id: str,
         question_id: str,
         user_id: str,
-        filename: str = "answer.webm"
+        filename: str = "answer.webm",
+        content_type: str = DEFAULT_AUDIO_CONTENT_TYPE,
+        **metadata
     ) -> str:
         """
         Store audio file in GridFS
@@ -37,22 +82,28 @@ class GridFSService:
             question_id: Question ID
             user_id: User ID
             filename: Original filename
+            content_type: MIME type of audio_data
+            **metadata: Extra fields stored on the file document
             
         Returns:
             str: GridFS file ID
         """
         try:
             # Store with metadata for easy querying
-            file_id = self.fs.put(
-                audio_data,
+            grid_in = AsyncIOMotorGridIn(
+                self.db.fs,
                 filename=filename,
                 session_id=session_id,
                 question_id=question_id,
                 user_id=user_id,
-                content_type="audio/webm",
+                content_type=content_type,
                 upload_date=datetime.utcnow(),
-                status="pending_transcription"
+                status="pending_transcription",
+                **metadata
             )
+            await grid_in.write(audio_data)
+            await grid_in.close()
+            file_id = grid_in._id
             
             logger.info(
                 f"Audio stored in GridFS: file_id={file_id}, "
@@ -65,7 +116,103 @@ class GridFSService:
             logger.error(f"Failed to store audio in GridFS: {e}")
             raise
     
-    def get_audio(self, file_id: str) -> Optional[bytes]:
+    async def store_audio_stream(
+        self,
+        stream,
+        session_id: str,
+        question_id: str,
+        user_id: str,
+        filename: str = "answer.webm",
+        content_type: str = DEFAULT_AUDIO_CONTENT_TYPE,
+        max_bytes: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        **metadata
+    ) -> Dict:
+        """
+        Stream an upload into GridFS chunk by chunk
+        
+        The whole recording is never held in memory: each chunk is read from
+        the upload, hashed and written to GridFS. The size limit is enforced
+        as bytes arrive and the partial file is removed if it is exceeded.
+        
+        Args:
+            stream: Object with an async read(size) method (e.g. UploadFile)
+            session_id: Interview session ID
+            question_id: Question ID
+            user_id: User ID
+            filename: Stored filename
+            content_type: MIME type of the upload (see guess_audio_content_type)
+            max_bytes: Max upload size (defaults to MAX_AUDIO_UPLOAD_BYTES)
+            chunk_size: Read size (defaults to AUDIO_UPLOAD_CHUNK_SIZE)
+            **metadata: Extra fields stored on the file document
+            
+        Raises:
+            AudioTooLargeError: upload exceeded max_bytes
+            EmptyAudioError: upload was empty
+            
+        Returns:
+            dict: {"file_id": str, "size": int, "sha256": str}
+        """
+        settings = get_settings()
+        max_bytes = max_bytes or settings.max_audio_upload_bytes
+        chunk_size = chunk_size or settings.audio_upload_chunk_size
+        
+        grid_in = AsyncIOMotorGridIn(
+            self.db.fs,
+            filename=filename,
+            session_id=session_id,
+            question_id=question_id,
+            user_id=user_id,
+            content_type=content_type,
+            upload_date=datetime.utcnow(),
+            status="pending_transcription",
+            chunk_size=chunk_size,
+            **metadata
+        )
+        
+        digest = hashlib.sha256()
+        size = 0
+        
+        try:
+            while True:
+                chunk = await stream.read(chunk_size)
+                if not chunk:
+                    break
+                
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AudioTooLargeError(
+                        f"Audio exceeds maximum size of {max_bytes} bytes"
+                    )
+                
+                digest.update(chunk)
+                await grid_in.write(chunk)
+            
+            if size == 0:
+                raise EmptyAudioError("Empty audio file received")
+            
+            checksum = digest.hexdigest()
+            await grid_in.set("sha256", checksum)
+            await grid_in.close()
+        
+        except Exception as e:
+            try:
+                await grid_in.abort()
+            except Exception:
+                pass
+            if not isinstance(e, (AudioTooLargeError, EmptyAudioError)):
+                logger.error(f"Failed to stream audio into GridFS: {e}")
+            raise
+        
+        file_id = str(grid_in._id)
+        logger.info(
+            f"Audio streamed to GridFS: file_id={file_id}, size={size}, "
+            f"sha256={checksum[:12]}, session={session_id}, question={question_id}"
+        )
+        
+        return {"file_id": file_id, "size": size, "sha256": checksum}
+    
+    async def get_audio(self, file_id: str) -> Optional[bytes]:
         """
         Retrieve audio file from GridFS
         
@@ -76,9 +223,8 @@ class GridFSService:
             bytes: Audio file data or None if not found
         """
         try:
-            from bson import ObjectId
-            grid_out = self.fs.get(ObjectId(file_id))
-            return grid_out.read()
+            grid_out = await self.fs.open_download_stream(ObjectId(file_id))
+            return await grid_out.read()
         except gridfs.errors.NoFile:
             logger.warning(f"Audio file not found in GridFS: {file_id}")
             return None
@@ -86,7 +232,46 @@ class GridFSService:
             logger.error(f"Failed to retrieve audio from GridFS: {e}")
             raise
     
-    def get_audio_by_session_question(
+    async def get_audio_file(self, file_id: str) -> Optional[Dict]:
+        """
+        Retrieve audio file data together with its stored metadata
+        
+        Args:
+            file_id: GridFS file ID
+            
+        Returns:
+            dict: {"file_id", "data", "content_type", "filename", "normalized_from"}
+                  or None if not found
+        """
+        try:
+            file_doc = await self.db.fs.files.find_one({"_id": ObjectId(file_id)})
+            if not file_doc:
+                logger.warning(f"Audio file not found in GridFS: {file_id}")
+                return None
+            grid_out = await self.fs.open_download_stream(file_doc["_id"])
+            return {
+                "file_id": file_id,
+                "data": await grid_out.read(),
+                "content_type": file_doc.get("content_type") or file_doc.get("contentType") or DEFAULT_AUDIO_CONTENT_TYPE,
+                "filename": file_doc.get("filename"),
+                "normalized_from": file_doc.get("normalized_from")
+            }
+        except gridfs.errors.NoFile:
+            logger.warning(f"Audio file not found in GridFS: {file_id}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to retrieve audio from GridFS: {e}")
+            raise
+    
+    async def find_normalized_audio(self, original_file_id: str) -> Optional[str]:
+        """
+        ID of the normalized copy that replaced `original_file_id`, if any
+        (a transcription attempt stores it before deleting the original)
+        """
+        file_doc = await self.db.fs.files.find_one({"normalized_from": original_file_id}, {"_id": 1})
+        return str(file_doc["_id"]) if file_doc else None
+    
+    async def get_audio_by_session_question(
         self,
         session_id: str,
         question_id: str
@@ -102,13 +287,14 @@ class GridFSService:
             tuple: (file_id, audio_data) or None if not found
         """
         try:
-            grid_out = self.fs.find_one({
+            file_doc = await self.db.fs.files.find_one({
                 "session_id": session_id,
                 "question_id": question_id
             })
             
-            if grid_out:
-                return str(grid_out._id), grid_out.read()
+            if file_doc:
+                grid_out = await self.fs.open_download_stream(file_doc["_id"])
+                return str(file_doc["_id"]), await grid_out.read()
             
             return None
         
@@ -116,7 +302,7 @@ class GridFSService:
             logger.error(f"Failed to find audio in GridFS: {e}")
             raise
     
-    def delete_audio(self, file_id: str) -> bool:
+    async def delete_audio(self, file_id: str) -> bool:
         """
         Delete audio file from GridFS
         
@@ -127,8 +313,7 @@ class GridFSService:
             bool: True if deleted successfully
         """
         try:
-            from bson import ObjectId
-            self.fs.delete(ObjectId(file_id))
+            await self.fs.delete(ObjectId(file_id))
             logger.info(f"Audio deleted from GridFS: {file_id}")
             return True
         except gridfs.errors.NoFile:
@@ -138,7 +323,7 @@ class GridFSService:
             logger.error(f"Failed to delete audio from GridFS: {e}")
             raise
     
-    def update_status(self, file_id: str, status: str) -> bool:
+    async def update_status(self, file_id: str, status: str) -> bool:
         """
         Update transcription status of audio file
         
@@ -150,7 +335,6 @@ class GridFSService:
             bool: True if updated successfully
         """
         try:
-            from bson import ObjectId
             # GridFS doesn't support direct metadata updates
             # We'll track status in the interview_sessions collection instead
             logger.info(f"Audio status updated: {file_id} -> {status}")
@@ -159,7 +343,7 @@ class GridFSService:
             logger.error(f"Failed to update audio status: {e}")
             return False
     
-    def cleanup_old_audio(self, hours: int = 24) -> int:
+    async def cleanup_old_audio(self, hours: int = 24) -> int:
         """
         Clean up audio files older than specified hours
         Used for maintenance/cleanup tasks
@@ -175,8 +359,10 @@ class GridFSService:
             cutoff_date = datetime.utcnow() - timedelta(hours=hours)
             
             deleted_count = 0
-            for grid_file in self.fs.find({"upload_date": {"$lt": cutoff_date}}):
-                self.fs.delete(grid_file._id)
+            async for file_doc in self.db.fs.files.find(
+                {"upload_date": {"$lt": cutoff_date}}, {"_id": 1}
+            ):
+                await self.fs.delete(file_doc["_id"])
                 deleted_count += 1
             
             logger.info(f"Cleaned up {deleted_count} old audio files")
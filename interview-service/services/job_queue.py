@@ -0,0 +1,255 @@
+"""
+Durable Job Queue backed by a MongoDB collection
+Jobs survive process restarts: workers claim a job with a lease, and a job
+whose lease expires (worker crashed) becomes claimable again
+
+Workers renew the lease of a running job (renew()), so a long job is not
+claimed a second time while it is still running. Every claim counts as an
+attempt: a job whose lease expired on its last attempt (it keeps killing
+its worker, e.g. out of memory) is dead-lettered when it is next claimed.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from pymongo import ASCENDING, ReturnDocument
+
+from config import get_settings
+from database import get_async_mongodb_client
+
+logger = logging.getLogger("backend.job_queue")
+
+# Job states
+QUEUED = "queued"
+PROCESSING = "processing"
+COMPLETED = "completed"
+DEAD = "dead"  # Dead-letter: retries exhausted or permanent failure
+
+
+class JobQueue:
+    """
+    Claim/lease job queue stored in a Mongo collection
+
+    Lifecycle: queued -> processing -> completed
+                              |
+                              +-> queued (retry after backoff) -> ... -> dead
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        max_attempts: int = 3,
+        lease_seconds: int = 300,
+        retry_backoff_seconds: float = 10.0,
+        max_backoff_seconds: float = 600.0
+    ):
+        self.collection = get_async_mongodb_client()[collection_name]
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    async def ensure_indexes(self):
+        """Create indexes used by claim()"""
+        await self.collection.create_index([("status", ASCENDING), ("available_at", ASCENDING)])
+        await self.collection.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+
+    async def enqueue(self, payload: Dict, delay_seconds: float = 0) -> str:
+        """
+        Add a job to the queue
+
+        Args:
+            payload: Job arguments (stored under "payload")
+            delay_seconds: Do not run before now + delay
+
+        Returns:
+            str: Job ID
+        """
+        now = datetime.utcnow()
+        result = await self.collection.insert_one({
+            "payload": payload,
+            "status": QUEUED,
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "available_at": now + timedelta(seconds=delay_seconds),
+            "lease_expires_at": None,
+            "worker_id": None,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now
+        })
+        return str(result.inserted_id)
+
+    async def claim(self, worker_id: str) -> Optional[Dict]:
+        """
+        Atomically claim the oldest runnable job
+
+        A job is runnable if it is queued and due, or if it is processing
+        but its lease has expired. An expired job that already used all its
+        attempts is dead-lettered instead of run again; it is still
+        returned (with status "dead" and `last_error` set) so the caller
+        can record the failure.
+
+        Returns:
+            dict: The claimed job document, or None if the queue is empty
+        """
+        now = datetime.utcnow()
+        job = await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": QUEUED, "available_at": {"$lte": now}},
+                {"status": PROCESSING, "lease_expires_at": {"$lte": now}}
+            ]},
+            {
+                "$set": {
+                    "status": PROCESSING,
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+        if job is not None and job["attempts"] > job.get("max_attempts", self.max_attempts):
+            error = f"Lease expired on the last of {job['attempts'] - 1} attempt(s), worker lost"
+            job.update({"status": DEAD, "lease_expires_at": None, "last_error": error, "dead_at": now})
+            await self.collection.update_one(
+                {"_id": job["_id"], "worker_id": worker_id},
+                {
+                    "$set": {
+                        "status": DEAD,
+                        "lease_expires_at": None,
+                        "last_error": error,
+                        "dead_at": now,
+                        "updated_at": now
+                    },
+                    "$inc": {"attempts": -1}
+                }
+            )
+            job["attempts"] -= 1
+            logger.error(f"Job dead-lettered after {job['attempts']} attempt(s): {job['_id']} - {error}")
+
+        return job
+
+    async def renew(self, job: Dict) -> bool:
+        """
+        Extend the lease of a running job
+
+        Returns:
+            bool: False if the job is no longer held by this worker
+        """
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"], "status": PROCESSING},
+            {"$set": {
+                "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                "updated_at": now
+            }}
+        )
+        return bool(result.matched_count)
+
+    async def complete(self, job: Dict):
+        """Mark a claimed job as completed"""
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"]},
+            {"$set": {
+                "status": COMPLETED,
+                "lease_expires_at": None,
+                "completed_at": now,
+                "updated_at": now
+            }}
+        )
+
+    async def fail(self, job: Dict, error: str, permanent: bool = False) -> bool:
+        """
+        Record a failed attempt
+
+        The job is re-queued with exponential backoff unless it has used all
+        its attempts or the failure is permanent, in which case it moves to
+        the dead-letter state.
+
+        Returns:
+            bool: True if the job was dead-lettered
+        """
+        now = datetime.utcnow()
+        attempts = job.get("attempts", 1)
+        dead = permanent or attempts >= job.get("max_attempts", self.max_attempts)
+
+        update = {
+            "lease_expires_at": None,
+            "last_error": error,
+            "updated_at": now
+        }
+
+        if dead:
+            update["status"] = DEAD
+            update["dead_at"] = now
+        else:
+            backoff = min(
+                self.retry_backoff_seconds * (2 ** (attempts - 1)),
+                self.max_backoff_seconds
+            )
+            update["status"] = QUEUED
+            update["available_at"] = now + timedelta(seconds=backoff)
+
+        await self.collection.update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"]},
+            {"$set": update}
+        )
+
+        if dead:
+            logger.error(f"Job dead-lettered after {attempts} attempt(s): {job['_id']} - {error}")
+        else:
+            logger.warning(f"Job failed (attempt {attempts}), will retry: {job['_id']} - {error}")
+
+        return dead
+
+    async def defer(self, job: Dict, delay_seconds: float):
+        """
+        Put a claimed job back in the queue without counting the attempt
+        (it could not run yet, e.g. it waits for another job's result)
+        """
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"]},
+            {
+                "$set": {
+                    "status": QUEUED,
+                    "available_at": now + timedelta(seconds=delay_seconds),
+                    "lease_expires_at": None,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": -1}
+            }
+        )
+
+    async def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        counts = {QUEUED: 0, PROCESSING: 0, COMPLETED: 0, DEAD: 0}
+        async for row in self.collection.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+
+# Singleton instance
+_transcription_queue = None
+
+
+def get_transcription_queue() -> JobQueue:
+    """Get or create the transcription job queue singleton"""
+    global _transcription_queue
+    if _transcription_queue is None:
+        settings = get_settings()
+        _transcription_queue = JobQueue(
+            "transcription_jobs",
+            max_attempts=settings.transcription_max_attempts,
+            lease_seconds=settings.transcription_lease_seconds,
+            retry_backoff_seconds=settings.transcription_retry_backoff_seconds
+        )
+    return _transcription_queue
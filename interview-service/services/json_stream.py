@@ -0,0 +1,118 @@
+"""
+Incremental JSON parser for streamed LLM output
+Yields the objects of a JSON array as soon as each one is complete
+
+    parser = JSONArrayStreamParser("questions")
+    for chunk in stream:
+        for question in parser.feed(chunk):
+            ...
+
+Only the array under `array_key` (anywhere in the document) is tracked, so
+surrounding text such as ``` fences or other keys is ignored.
+"""
+
+import json
+import logging
+from typing import Any, Iterator, List
+
+logger = logging.getLogger("backend.json_stream")
+
+
+class JSONArrayStreamParser:
+    """Scan streamed text and emit each complete object of one array"""
+
+    def __init__(self, array_key: str):
+        self._key_token = json.dumps(array_key)
+        self._buffer = ""
+        self._pos = 0
+
+        self._in_array = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._depth = 0
+        self._object_start = None
+        self.items_emitted = 0
+
+    @property
+    def done(self) -> bool:
+        """True once the tracked array has been closed"""
+        return self._done
+
+    def _find_array_start(self) -> bool:
+        key_at = self._buffer.find(self._key_token, self._pos)
+        if key_at == -1:
+            # Keep enough of the tail to match a key split across chunks
+            self._pos = max(self._pos, len(self._buffer) - len(self._key_token))
+            return False
+
+        rest = self._buffer[key_at + len(self._key_token):].lstrip()
+        if not rest or (rest[0] == ":" and not rest[1:].lstrip()):
+            # Key seen but ":" / "[" not streamed yet
+            self._pos = key_at
+            return False
+        if rest[0] != ":" or rest[1:].lstrip()[:1] != "[":
+            # Same text used as a plain string value - keep looking
+            self._pos = key_at + len(self._key_token)
+            return self._find_array_start()
+
+        self._pos = self._buffer.index("[", key_at + len(self._key_token)) + 1
+        self._in_array = True
+        return True
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Add streamed text; returns the objects completed by it (in order)"""
+        if self._done or not chunk:
+            return []
+
+        self._buffer += chunk
+        if not self._in_array and not self._find_array_start():
+            return []
+
+        items = []
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer):
+            char = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._object_start = i
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._object_start is not None:
+                    raw = buffer[self._object_start:i + 1]
+                    self._object_start = None
+                    try:
+                        items.append(json.loads(raw))
+                        self.items_emitted += 1
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping malformed streamed object: {e}")
+            elif char == "]" and self._depth == 0:
+                self._done = True
+                i += 1
+                break
+            i += 1
+
+        # Drop consumed text, keeping any partially streamed object
+        keep_from = self._object_start if self._object_start is not None else i
+        self._buffer = buffer[keep_from:]
+        if self._object_start is not None:
+            self._object_start = 0
+        self._pos = i - keep_from
+        return items
+
+    def iter_feed(self, chunks) -> Iterator[Any]:
+        """Convenience generator over an iterable of chunks"""
+        for chunk in chunks:
+            yield from self.feed(chunk)
@@ -0,0 +1,288 @@
+"""
+LLM Response Cache
+Content-addressed cache of chat-completion results
+
+Keys are sha256 over the model, the normalized messages and the sampling
+parameters, so an identical request (same question/JD/resume prompt, same
+temperature, ...) is answered without calling the provider. Two tiers:
+- in-process LRU (LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS)
+- MongoDB `llm_response_cache` collection, expired by a TTL index on
+  `expires_at`, shared across workers and restarts
+
+Call sites opt out with cache=False. Cache failures never fail a call.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from config import get_settings
+from database import get_db, get_sync_db
+
+logger = logging.getLogger("backend.llm_cache")
+
+CACHE_COLLECTION = "llm_response_cache"
+
+# Bump to invalidate every existing entry (e.g. when post-processing changes)
+KEY_VERSION = "v1"
+
+
+def _normalize_content(content):
+    if isinstance(content, str):
+        return "\n".join(line.rstrip() for line in content.strip().splitlines())
+    return content
+
+
+def cache_key(request: Dict) -> str:
+    """
+    sha256 key for a chat-completion request
+
+    Args:
+        request: kwargs for chat.completions.create (model, messages, temperature, ...)
+    """
+    messages = [
+        {**message, "content": _normalize_content(message.get("content"))}
+        for message in request.get("messages", [])
+    ]
+    params = {k: v for k, v in request.items() if k not in ("model", "messages")}
+    canonical = json.dumps(
+        {"v": KEY_VERSION, "model": request.get("model"), "messages": messages, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier (LRU + MongoDB) cache of completion content by request key"""
+
+    def __init__(self, max_entries: int = 2000, ttl_seconds: float = 604800.0, use_mongo: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.use_mongo = use_mongo
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+
+    # ---- in-process tier ----
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, content = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return content
+
+    def _memory_set(self, key: str, content: str, expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _record_store(self):
+        with self._lock:
+            self.stores += 1
+
+    def _record_error(self, tier_error: Exception):
+        with self._lock:
+            self.errors += 1
+        logger.warning(f"LLM cache MongoDB tier error: {tier_error}")
+
+    def _mongo_hit(self, doc: Dict) -> str:
+        content = doc["content"]
+        expires_at = doc["expires_at"]
+        self._memory_set(doc["_id"], content, time.time() + max(0.0, (expires_at - datetime.utcnow()).total_seconds()))
+        with self._lock:
+            self.mongo_hits += 1
+        return content
+
+    def _mongo_doc(self, key: str, content: str, model: Optional[str]) -> Dict:
+        now = datetime.utcnow()
+        return {
+            "_id": key,
+            "model": model,
+            "content": content,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl_seconds)
+        }
+
+    # ---- async API ----
+
+    async def get(self, key: str) -> Optional[str]:
+        content = self._memory_get(key)
+        if content is not None:
+            return content
+
+        if self.use_mongo:
+            try:
+                async with get_db() as db:
+                    doc = await db[CACHE_COLLECTION].find_one(
+                        {"_id": key, "expires_at": {"$gt": datetime.utcnow()}}
+                    )
+                if doc:
+                    return self._mongo_hit(doc)
+            except Exception as e:
+                self._record_error(e)
+
+        self._record_miss()
+        return None
+
+    async def set(self, key: str, content: str, model: Optional[str] = None):
+        self._memory_set(key, content, time.time() + self.ttl_seconds)
+        self._record_store()
+
+        if self.use_mongo:
+            doc = self._mongo_doc(key, content, model)
+            try:
+                async with get_db() as db:
+                    await db[CACHE_COLLECTION].replace_one({"_id": key}, doc, upsert=True)
+            except Exception as e:
+                self._record_error(e)
+
+    # ---- sync API (for sync call sites) ----
+
+    def get_sync(self, key: str) -> Optional[str]:
+        content = self._memory_get(key)
+        if content is not None:
+            return content
+
+        if self.use_mongo:
+            try:
+                with get_sync_db() as db:
+                    doc = db[CACHE_COLLECTION].find_one(
+                        {"_id": key, "expires_at": {"$gt": datetime.utcnow()}}
+                    )
+                if doc:
+                    return self._mongo_hit(doc)
+            except Exception as e:
+                self._record_error(e)
+
+        self._record_miss()
+        return None
+
+    def set_sync(self, key: str, content: str, model: Optional[str] = None):
+        self._memory_set(key, content, time.time() + self.ttl_seconds)
+        self._record_store()
+
+        if self.use_mongo:
+            doc = self._mongo_doc(key, content, model)
+            try:
+                with get_sync_db() as db:
+                    db[CACHE_COLLECTION].replace_one({"_id": key}, doc, upsert=True)
+            except Exception as e:
+                self._record_error(e)
+
+    def clear(self):
+        """Drop the in-process tier (MongoDB entries expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self.memory_hits + self.mongo_hits
+            lookups = hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "mongo_hits": self.mongo_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "errors": self.errors
+            }
+
+
+# Singleton instance
+_llm_cache = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get or create the LLM response cache singleton"""
+    global _llm_cache
+    if _llm_cache is None:
+        settings = get_settings()
+        _llm_cache = LLMResponseCache(
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            use_mongo=settings.llm_cache_mongo
+        )
+    return _llm_cache
+
+
+def cached_completion(client, cache: bool = True, validate: Optional[Callable[[str], Any]] = None, **request) -> str:
+    """
+    client.chat.completions.create(**request) through the cache
+
+    Args:
+        client: Sync OpenAI-compatible client
+        cache: False to bypass the cache for this call
+        validate: Optional check run before storing (e.g. JSON parsing);
+                  if it raises, the response is not cached and the error propagates
+
+    Returns:
+        str: Stripped message content of the first choice
+    """
+    use_cache = cache and get_settings().llm_cache_enabled
+    if use_cache:
+        llm_cache = get_llm_cache()
+        key = cache_key(request)
+        content = llm_cache.get_sync(key)
+        if content is not None:
+            return content
+
+    response = client.chat.completions.create(**request)
+    content = response.choices[0].message.content.strip()
+
+    if use_cache:
+        if validate is not None:
+            validate(content)
+        llm_cache.set_sync(key, content, model=request.get("model"))
+    return content
+
+
+async def cached_completion_async(client, cache: bool = True, validate: Optional[Callable[[str], Any]] = None, **request) -> str:
+    """Async variant of cached_completion (client is an async client)"""
+    use_cache = cache and get_settings().llm_cache_enabled
+    if use_cache:
+        llm_cache = get_llm_cache()
+        key = cache_key(request)
+        content = await llm_cache.get(key)
+        if content is not None:
+            return content
+
+    response = await client.chat.completions.create(**request)
+    content = response.choices[0].message.content.strip()
+
+    if use_cache:
+        if validate is not None:
+            validate(content)
+        await llm_cache.set(key, content, model=request.get("model"))
+    return content
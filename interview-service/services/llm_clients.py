@@ -0,0 +1,375 @@
+"""
+LLM Client Registry
+Process-wide OpenAI / Groq clients over shared keep-alive connection pools
+
+Every module gets its LLM clients from here instead of constructing its own,
+so all calls reuse warm HTTPS connections (no TLS handshake per call).
+For each provider there is one sync and one async client, backed by one
+httpx.Client and one httpx.AsyncClient respectively.
+
+Outbound concurrency is capped per provider across sync and async callers
+(LLM_MAX_CONCURRENCY_<PROVIDER>): the transport holds a slot from sending
+the request until the response is closed, so streamed responses count until
+fully consumed.
+
+Before taking a slot, every request also waits for the provider's
+requests/tokens-per-minute budget in priority order (services/llm_scheduler.py),
+and is measured from send to close (services/llm_metrics.py).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict
+
+import httpx
+from groq import Groq, AsyncGroq
+from openai import OpenAI, AsyncOpenAI
+
+from config import get_settings, get_settingsgpt
+from services.llm_scheduler import ProviderScheduler, estimate_request_tokens, parse_request_body
+from services.llm_metrics import LLMCallRecord, start_call
+
+logger = logging.getLogger("backend.llm_clients")
+
+OPENAI = "openai"
+GROQ = "groq"
+
+
+class ProviderLimiter:
+    """Concurrency cap and request counters for one provider"""
+
+    def __init__(self, provider: str, max_concurrency: int):
+        self.provider = provider
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+
+    def _acquired(self, started: float, waited: bool):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.requests += 1
+            if waited:
+                self.waited += 1
+                self.wait_seconds += time.perf_counter() - started
+
+    def acquire(self):
+        started = time.perf_counter()
+        waited = not self._slots.acquire(blocking=False)
+        if waited:
+            self._slots.acquire()
+        self._acquired(started, waited)
+
+    async def acquire_async(self):
+        # Poll rather than block so the event loop keeps running and a
+        # cancelled caller never ends up owning a slot
+        started = time.perf_counter()
+        waited = False
+        delay = 0.005
+        while not self._slots.acquire(blocking=False):
+            waited = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+        self._acquired(started, waited)
+
+    def release(self, error: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            if error:
+                self.errors += 1
+        self._slots.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "requests": self.requests,
+                "errors": self.errors,
+                "waited": self.waited,
+                "wait_seconds": round(self.wait_seconds, 3)
+            }
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, limiter: ProviderLimiter,
+                 call: LLMCallRecord, status: str):
+        self._stream = stream
+        self._limiter = limiter
+        self._call = call
+        self._status = status
+        self._released = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._call.on_chunk(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._limiter.release()
+                self._call.finish(self._status)
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, limiter: ProviderLimiter,
+                 call: LLMCallRecord, status: str):
+        self._stream = stream
+        self._limiter = limiter
+        self._call = call
+        self._status = status
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._call.on_chunk(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._limiter.release()
+                self._call.finish(self._status)
+
+
+class LimitedTransport(httpx.BaseTransport):
+    """httpx transport that holds a provider slot for the life of each response"""
+
+    def __init__(self, limiter: ProviderLimiter, scheduler: ProviderScheduler, **transport_kwargs):
+        self.limiter = limiter
+        self.scheduler = scheduler
+        self.transport = httpx.HTTPTransport(**transport_kwargs)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body = parse_request_body(request)
+        self.scheduler.acquire(estimate_request_tokens(body))
+        self.limiter.acquire()
+        call = start_call(self.limiter.provider, body, request.headers)
+        try:
+            response = self.transport.handle_request(request)
+        except Exception:
+            self.limiter.release(error=True)
+            call.finish("error")
+            raise
+        self.scheduler.observe(response)
+        response.stream = _ReleasingStream(response.stream, self.limiter, call, str(response.status_code))
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncLimitedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of LimitedTransport (shares the provider's limiter)"""
+
+    def __init__(self, limiter: ProviderLimiter, scheduler: ProviderScheduler, **transport_kwargs):
+        self.limiter = limiter
+        self.scheduler = scheduler
+        self.transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = parse_request_body(request)
+        await self.scheduler.acquire_async(estimate_request_tokens(body))
+        await self.limiter.acquire_async()
+        call = start_call(self.limiter.provider, body, request.headers)
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            self.limiter.release(error=True)
+            call.finish("error")
+            raise
+        self.scheduler.observe(response)
+        response.stream = _AsyncReleasingStream(response.stream, self.limiter, call, str(response.status_code))
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def _pool_stats(transport) -> Dict:
+    """Connection counts from the underlying httpcore pool (best effort)"""
+    try:
+        connections = list(transport.transport._pool.connections)
+    except AttributeError:
+        return {}
+    return {
+        "connections": len(connections),
+        "idle": sum(1 for c in connections if c.is_idle()),
+        "active": sum(1 for c in connections if not c.is_idle() and not c.is_closed())
+    }
+
+
+class LLMClientRegistry:
+    """Lazily built, shared sync/async clients per provider"""
+
+    def __init__(self):
+        settings = get_settings()
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._http_clients = {}
+        self._transports = {}
+
+        self.limits = httpx.Limits(
+            max_connections=settings.llm_pool_max_connections,
+            max_keepalive_connections=settings.llm_pool_max_keepalive,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds
+        )
+        self.timeout = httpx.Timeout(
+            settings.llm_request_timeout_seconds,
+            connect=settings.llm_connect_timeout_seconds
+        )
+        self.limiters = {
+            OPENAI: ProviderLimiter(OPENAI, settings.llm_max_concurrency_openai),
+            GROQ: ProviderLimiter(GROQ, settings.llm_max_concurrency_groq)
+        }
+        self.schedulers = {
+            OPENAI: ProviderScheduler(
+                OPENAI,
+                requests_per_minute=settings.llm_rpm_openai,
+                tokens_per_minute=settings.llm_tpm_openai,
+                interactive_reserve=settings.llm_scheduler_interactive_reserve
+            ),
+            GROQ: ProviderScheduler(
+                GROQ,
+                requests_per_minute=settings.llm_rpm_groq,
+                tokens_per_minute=settings.llm_tpm_groq,
+                interactive_reserve=settings.llm_scheduler_interactive_reserve
+            )
+        }
+
+    def _api_key(self, provider: str) -> str:
+        if provider == OPENAI:
+            api_key = get_settingsgpt().openai_api_key
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY is required. Please set it in your .env file.")
+        else:
+            api_key = get_settings().groq_api_key
+            if not api_key:
+                raise ValueError("GROQ_API_KEY is required. Please set it in your .env file.")
+        return api_key
+
+    def _http_client(self, provider: str, is_async: bool):
+        key = (provider, is_async)
+        if key not in self._http_clients:
+            if is_async:
+                transport = AsyncLimitedTransport(self.limiters[provider], self.schedulers[provider], limits=self.limits)
+                http_client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+            else:
+                transport = LimitedTransport(self.limiters[provider], self.schedulers[provider], limits=self.limits)
+                http_client = httpx.Client(transport=transport, timeout=self.timeout)
+            self._transports[key] = transport
+            self._http_clients[key] = http_client
+        return self._http_clients[key]
+
+    def get(self, provider: str, is_async: bool = False):
+        key = (provider, is_async)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            if key not in self._clients:
+                api_key = self._api_key(provider)
+                http_client = self._http_client(provider, is_async)
+                if provider == OPENAI:
+                    client_cls = AsyncOpenAI if is_async else OpenAI
+                else:
+                    client_cls = AsyncGroq if is_async else Groq
+                self._clients[key] = client_cls(
+                    api_key=api_key,
+                    http_client=http_client,
+                    timeout=self.timeout
+                )
+                logger.info(f"Created shared {'async ' if is_async else ''}{provider} client")
+            return self._clients[key]
+
+    def stats(self) -> Dict:
+        stats = {}
+        for provider, limiter in self.limiters.items():
+            stats[provider] = {
+                **limiter.stats(),
+                "scheduler": self.schedulers[provider].stats(),
+                "pools": {
+                    ("async" if is_async else "sync"): _pool_stats(transport)
+                    for (name, is_async), transport in self._transports.items()
+                    if name == provider
+                }
+            }
+        return stats
+
+    async def aclose(self):
+        for (_, is_async), http_client in list(self._http_clients.items()):
+            try:
+                if is_async:
+                    await http_client.aclose()
+                else:
+                    http_client.close()
+            except Exception as e:
+                logger.warning(f"Error closing LLM HTTP client: {e}")
+        self._http_clients.clear()
+        self._transports.clear()
+        self._clients.clear()
+
+
+# Singleton instance
+_registry = None
+
+
+def get_llm_client_registry() -> LLMClientRegistry:
+    """Get or create the LLM client registry singleton"""
+    global _registry
+    if _registry is None:
+        _registry = LLMClientRegistry()
+    return _registry
+
+
+def get_openai_client() -> OpenAI:
+    """Shared sync OpenAI client"""
+    return get_llm_client_registry().get(OPENAI)
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Shared async OpenAI client"""
+    return get_llm_client_registry().get(OPENAI, is_async=True)
+
+
+def get_groq_client() -> Groq:
+    """Shared sync Groq client"""
+    return get_llm_client_registry().get(GROQ)
+
+
+def get_async_groq_client() -> AsyncGroq:
+    """Shared async Groq client"""
+    return get_llm_client_registry().get(GROQ, is_async=True)
+
+
+def get_llm_client_stats() -> Dict:
+    """Per-provider concurrency counters, scheduler queues and connection pool stats"""
+    if _registry is None:
+        return {}
+    return _registry.stats()
+
+
+async def close_llm_clients():
+    """Close all pooled connections (called on shutdown)"""
+    global _registry
+    if _registry is not None:
+        await _registry.aclose()
+        _registry = None
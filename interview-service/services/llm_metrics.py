@@ -0,0 +1,209 @@
+"""
+LLM Call Metrics
+Latency, tokens, retries and estimated cost of every LLM request, per call site
+
+Recording happens in the shared clients' transports (services/llm_clients.py),
+so every OpenAI / Groq HTTP request is measured, including SDK retries.
+Call sites only label their calls:
+
+    @llm_call_site("llm_service.evaluate_answer")
+    def evaluate_answer(...): ...
+
+    with llm_context(session_id=session_id):
+        await evaluate_session(session)
+
+For each request this records
+- wall time (request sent -> response fully read) and time to first token
+  (first body chunk; for streamed completions, the first delta)
+- prompt / completion tokens from the response's `usage`
+- whether it was an SDK retry (x-stainless-retry-count) and its status
+- estimated cost from LLM_PRICES (USD per 1M prompt / completion tokens)
+
+and exports them as Prometheus metrics on /metrics (when prometheus_client
+is installed) plus one structured `llm_call` log line, which also carries
+the session_id if one is set. session_id is not a metric label, to keep
+label cardinality bounded.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from config import get_settings
+
+logger = logging.getLogger("backend.llm_metrics")
+
+try:
+    from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# USD per 1M tokens: (prompt, completion)
+DEFAULT_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "text-embedding-3-small": (0.02, 0.0),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+}
+
+_LABELS = ["call_site", "provider", "model"]
+_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+if PROMETHEUS_AVAILABLE:
+    LLM_REQUESTS = Counter(
+        "llm_requests_total", "LLM HTTP requests", _LABELS + ["status"]
+    )
+    LLM_RETRIES = Counter(
+        "llm_retries_total", "LLM HTTP requests that were SDK retries", _LABELS
+    )
+    LLM_DURATION = Histogram(
+        "llm_request_duration_seconds", "LLM request wall time", _LABELS, buckets=_LATENCY_BUCKETS
+    )
+    LLM_TTFT = Histogram(
+        "llm_time_to_first_token_seconds", "Time until the first response body chunk", _LABELS,
+        buckets=_LATENCY_BUCKETS
+    )
+    LLM_TOKENS = Counter(
+        "llm_tokens_total", "Tokens reported in response usage", _LABELS + ["kind"]
+    )
+    LLM_COST = Counter(
+        "llm_cost_usd_total", "Estimated LLM spend in USD", _LABELS
+    )
+
+_call_site: ContextVar[str] = ContextVar("llm_call_site", default="unknown")
+_session_id: ContextVar[Optional[str]] = ContextVar("llm_session_id", default=None)
+
+# Keep only the end of each response body; `usage` is at the end of both
+# JSON responses and (with include_usage) SSE streams
+_TAIL_BYTES = 8192
+_USAGE_PATTERNS = {
+    "prompt_tokens": re.compile(rb'"prompt_tokens"\s*:\s*(\d+)'),
+    "completion_tokens": re.compile(rb'"completion_tokens"\s*:\s*(\d+)'),
+}
+
+
+@contextmanager
+def llm_context(call_site: Optional[str] = None, session_id: Optional[str] = None):
+    """Label the LLM requests made inside the block (None keeps the outer value)"""
+    tokens = []
+    if call_site is not None:
+        tokens.append((_call_site, _call_site.set(call_site)))
+    if session_id is not None:
+        tokens.append((_session_id, _session_id.set(str(session_id))))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def llm_call_site(name: str):
+    """Decorator: label the LLM requests of a (sync or async) function with `name`"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with llm_context(call_site=name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with llm_context(call_site=name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prices = {**DEFAULT_PRICES, **{k: tuple(v) for k, v in (get_settings().llm_prices or {}).items()}}
+    price = prices.get(model)
+    if price is None:
+        # Dated snapshots, e.g. gpt-4o-mini-2024-07-18
+        price = next((p for name, p in prices.items() if model.startswith(name + "-")), (0.0, 0.0))
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+class LLMCallRecord:
+    """Measurements of one HTTP request, finished when its response is closed"""
+
+    def __init__(self, provider: str, model: Optional[str], retry: bool):
+        self.provider = provider
+        self.model = model or "unknown"
+        self.retry = retry
+        self.call_site = _call_site.get()
+        self.session_id = _session_id.get()
+        self.started = time.perf_counter()
+        self.first_chunk_at = None
+        self._tail = b""
+        self._finished = False
+
+    def on_chunk(self, chunk: bytes):
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.perf_counter()
+        self._tail = (self._tail + chunk)[-_TAIL_BYTES:]
+
+    def _usage(self) -> Dict[str, int]:
+        usage = {}
+        for key, pattern in _USAGE_PATTERNS.items():
+            matches = pattern.findall(self._tail)
+            usage[key] = int(matches[-1]) if matches else 0
+        return usage
+
+    def finish(self, status: str):
+        if self._finished:
+            return
+        self._finished = True
+        duration = time.perf_counter() - self.started
+        ttft = self.first_chunk_at - self.started if self.first_chunk_at is not None else None
+        usage = self._usage()
+        cost = estimate_cost(self.model, usage["prompt_tokens"], usage["completion_tokens"])
+
+        if PROMETHEUS_AVAILABLE:
+            labels = (self.call_site, self.provider, self.model)
+            LLM_REQUESTS.labels(*labels, status).inc()
+            if self.retry:
+                LLM_RETRIES.labels(*labels).inc()
+            LLM_DURATION.labels(*labels).observe(duration)
+            if ttft is not None:
+                LLM_TTFT.labels(*labels).observe(ttft)
+            LLM_TOKENS.labels(*labels, "prompt").inc(usage["prompt_tokens"])
+            LLM_TOKENS.labels(*labels, "completion").inc(usage["completion_tokens"])
+            LLM_COST.labels(*labels).inc(cost)
+
+        logger.info(json.dumps({
+            "event": "llm_call",
+            "call_site": self.call_site,
+            "session_id": self.session_id,
+            "provider": self.provider,
+            "model": self.model,
+            "status": status,
+            "retry": self.retry,
+            "duration_ms": round(duration * 1000, 1),
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "cost_usd": round(cost, 6)
+        }))
+
+
+def start_call(provider: str, body: Optional[Dict], headers) -> LLMCallRecord:
+    """Begin measuring a request (called by the transports)"""
+    model = body.get("model") if isinstance(body, dict) else None
+    retry = headers.get("x-stainless-retry-count", "0") not in ("", "0")
+    return LLMCallRecord(provider, model, retry)
+
+
+def metrics_payload() -> tuple:
+    """(body, content type) for the /metrics endpoint"""
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus_client is not installed\n", CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -4,17 +4,17 @@ Generates personalized study recommendations using OpenAI LLM
 for both resume-based and interview-based learning paths.
 """
 
-from openai import OpenAI
-import os
 import json
 from typing import Optional, List, Dict
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from services.llm_clients import get_async_openai_client
+from services.llm_scheduler import llm_priority, BATCH
+from services.llm_metrics import llm_call_site
 
 class LLMRecommendationService:
     """Generate LLM-based recommendations for adaptive learning"""
     
     @staticmethod
+    @llm_call_site("llm_recommendation_service.get_resume_recommendations")
     async def get_resume_recommendations(
         skills: List[str],
         experience_level: str = "fresher",
@@ -75,15 +75,16 @@ Respond in JSON format with this structure:
 
 Keep recommendations specific, actionable, and relevant to their skill level."""
 
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a placement preparation expert. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
+            with llm_priority(BATCH):
+                response = await get_async_openai_client().chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": "You are a placement preparation expert. Always respond with valid JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=1500
+                )
             
             content = response.choices[0].message.content.strip()
             # Parse JSON from response
@@ -114,6 +115,7 @@ Keep recommendations specific, actionable, and relevant to their skill level."""
             }
     
     @staticmethod
+    @llm_call_site("llm_recommendation_service.get_interview_recommendations")
     async def get_interview_recommendations(
         interview_feedback: Dict,
         interview_type: str = "technical",
@@ -178,15 +180,16 @@ Respond in JSON format:
 
 Be specific and constructive. Focus on actionable improvements."""
 
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are an expert interview coach. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
+            with llm_priority(BATCH):
+                response = await get_async_openai_client().chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": "You are an expert interview coach. Always respond with valid JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=1500
+                )
             
             content = response.choices[0].message.content.strip()
             # Parse JSON from response
@@ -218,6 +221,7 @@ Be specific and constructive. Focus on actionable improvements."""
             }
 
     @staticmethod
+    @llm_call_site("llm_recommendation_service.get_combined_recommendations")
     async def get_combined_recommendations(
         resume_skills: Optional[List[str]] = None,
         interview_history: Optional[List[Dict]] = None,
@@ -271,15 +275,16 @@ Respond in JSON format:
     "motivation": "Brief motivational message"
 }}"""
 
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a comprehensive placement advisor. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
+            with llm_priority(BATCH):
+                response = await get_async_openai_client().chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": "You are a comprehensive placement advisor. Always respond with valid JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=1500
+                )
             
             content = response.choices[0].message.content.strip()
             if content.startswith("```json"):
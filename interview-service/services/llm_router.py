@@ -0,0 +1,575 @@
+"""
+LLM Provider Router
+Routes each LLM call type to an ordered list of provider/model candidates
+
+    content = await routed_completion_async(
+        EVALUATION, validate=_parse_json_content,
+        model="gpt-4o-mini", messages=messages, temperature=0.2
+    )
+
+For every call type (question generation, reference answer, evaluation,
+batched evaluation, adaptive questions) the route lists "provider:model"
+candidates in order of preference (DEFAULT_ROUTES, overridable with
+LLM_ROUTES as JSON). Batched evaluation sends a strict json_schema
+response_format, which Groq does not accept, so its route only lists OpenAI
+models; when none is available the caller scores answers one by one. A call:
+- starts on the first candidate whose circuit breaker is closed
+- hedges: if no response arrived after the p95 latency of that call type on
+  that candidate (LLM_HEDGE_*), the same request is sent to the next one;
+  there is no hedging until that candidate has at least 20 latency
+  samples, so a cold start does not duplicate every slow request
+- fails over immediately to the next candidate when an attempt errors or
+  returns content that does not pass `validate`
+- returns the first successful response and cancels the others
+
+Circuit breakers are per provider: once LLM_BREAKER_MIN_REQUESTS outcomes in
+the last LLM_BREAKER_WINDOW_SECONDS have an error rate of at least
+LLM_BREAKER_ERROR_RATE, the provider is skipped for
+LLM_BREAKER_COOLDOWN_SECONDS, then a single probe request decides whether it
+closes again.
+
+Providers without an API key are left out of every route. Both providers
+speak the chat-completions API through the shared clients of
+services/llm_clients.py, so OPENAI_BASE_URL / GROQ_BASE_URL can point them at
+any compatible server (including local stubs, see test_llm_router.py).
+
+Sync callers get the same behaviour on a small thread pool, except that a
+losing attempt that is already running cannot be interrupted; its response
+is discarded when it arrives.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import get_settings
+from services.llm_cache import cache_key, get_llm_cache
+from services.llm_clients import (
+    OPENAI,
+    GROQ,
+    get_openai_client,
+    get_async_openai_client,
+    get_groq_client,
+    get_async_groq_client,
+)
+
+logger = logging.getLogger("backend.llm_router")
+
+# Call types
+QUESTION_GENERATION = "question_generation"
+REFERENCE_ANSWER = "reference_answer"
+EVALUATION = "evaluation"
+EVALUATION_BATCH = "evaluation_batch"
+ADAPTIVE_QUESTIONS = "adaptive_questions"
+
+DEFAULT_ROUTES = {
+    QUESTION_GENERATION: ["openai:gpt-4o-mini", "groq:llama-3.3-70b-versatile"],
+    REFERENCE_ANSWER: ["openai:gpt-4o-mini", "groq:llama-3.3-70b-versatile"],
+    EVALUATION: ["openai:gpt-4o-mini", "groq:llama-3.3-70b-versatile"],
+    # Structured outputs (json_schema): OpenAI models only
+    EVALUATION_BATCH: ["openai:gpt-4o-mini"],
+    ADAPTIVE_QUESTIONS: ["openai:gpt-4o-mini", "groq:llama-3.3-70b-versatile"],
+}
+
+_SYNC_CLIENTS = {OPENAI: get_openai_client, GROQ: get_groq_client}
+_ASYNC_CLIENTS = {OPENAI: get_async_openai_client, GROQ: get_async_groq_client}
+
+# Latency samples needed before hedging uses the measured p95
+_MIN_LATENCY_SAMPLES = 20
+
+
+def parse_route(entries: List[str]) -> List[Tuple[str, str]]:
+    """["openai:gpt-4o-mini", ...] -> [("openai", "gpt-4o-mini"), ...]"""
+    route = []
+    for entry in entries:
+        provider, _, model = entry.partition(":")
+        provider = provider.strip().lower()
+        if provider not in _SYNC_CLIENTS or not model.strip():
+            raise ValueError(f"Invalid LLM route entry: {entry!r}")
+        route.append((provider, model.strip()))
+    return route
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker for one provider (closed -> open -> half-open)"""
+
+    def __init__(self, provider: str, error_rate: float, min_requests: int,
+                 window_seconds: float, cooldown_seconds: float):
+        self.provider = provider
+        self.error_rate = error_rate
+        self.min_requests = max(1, min_requests)
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._outcomes = deque()
+        self._lock = threading.Lock()
+
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+
+    def _trim(self, now: float):
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            self._outcomes.popleft()
+
+    def available(self) -> bool:
+        """Closed, or open long enough that a probe request may go through"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self._probe_in_flight:
+                return False
+            return time.monotonic() - self.opened_at >= self.cooldown_seconds
+
+    def begin(self):
+        """Called when an attempt is sent; turns an expired open circuit into a probe"""
+        with self._lock:
+            if self.state != "closed" and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = "half_open"
+                self._probe_in_flight = True
+
+    def record(self, ok: bool):
+        now = time.monotonic()
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+                if ok:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                    logger.info(f"Circuit for {self.provider} closed")
+                else:
+                    self.state = "open"
+                    self.opened_at = now
+                return
+
+            self._outcomes.append((now, ok))
+            self._trim(now)
+            if self.state != "closed" or len(self._outcomes) < self.min_requests:
+                return
+            errors = sum(1 for _, success in self._outcomes if not success)
+            if errors / len(self._outcomes) >= self.error_rate:
+                self.state = "open"
+                self.opened_at = now
+                self.times_opened += 1
+                logger.warning(
+                    f"Circuit for {self.provider} opened: "
+                    f"{errors}/{len(self._outcomes)} errors in {self.window_seconds:.0f}s"
+                )
+
+    def release_probe(self):
+        """A half-open probe was cancelled before it produced an outcome"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._trim(time.monotonic())
+            errors = sum(1 for _, success in self._outcomes if not success)
+            return {
+                "state": self.state,
+                "window_requests": len(self._outcomes),
+                "window_errors": errors,
+                "times_opened": self.times_opened
+            }
+
+
+class LatencyTracker:
+    """Recent successful-call latencies per (call type, provider, model)"""
+
+    def __init__(self, max_samples: int = 200):
+        self.max_samples = max_samples
+        self._samples: Dict[Tuple[str, str, str], deque] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: Tuple[str, str, str], seconds: float):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+
+    def percentile(self, key: Tuple[str, str, str], q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < _MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            items = {key: sorted(samples) for key, samples in self._samples.items()}
+        return {
+            f"{call_type}:{provider}:{model}": {
+                "samples": len(samples),
+                "p50_ms": round(samples[len(samples) // 2] * 1000, 1),
+                "p95_ms": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000, 1)
+            }
+            for (call_type, provider, model), samples in items.items() if samples
+        }
+
+
+class LLMRouter:
+    """Hedged, failover-aware chat completions across providers"""
+
+    def __init__(self):
+        settings = get_settings()
+        routes = {**DEFAULT_ROUTES, **(settings.llm_routes or {})}
+        self.routes = {call_type: parse_route(entries) for call_type, entries in routes.items()}
+
+        self.hedge_enabled = settings.llm_hedge_enabled
+        self.hedge_min_delay = settings.llm_hedge_min_delay_ms / 1000
+        self.max_parallel = max(1, settings.llm_hedge_max_parallel)
+
+        self.breakers = {
+            provider: CircuitBreaker(
+                provider,
+                error_rate=settings.llm_breaker_error_rate,
+                min_requests=settings.llm_breaker_min_requests,
+                window_seconds=settings.llm_breaker_window_seconds,
+                cooldown_seconds=settings.llm_breaker_cooldown_seconds
+            )
+            for provider in _SYNC_CLIENTS
+        }
+        self.latency = LatencyTracker()
+        self._executor = None
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.hedges = 0
+        self.failovers = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    # ---- candidate selection ----
+
+    def _route(self, call_type: str) -> List[Tuple[str, str]]:
+        route = self.routes.get(call_type)
+        if not route:
+            raise ValueError(f"No LLM route configured for {call_type!r}")
+        return route
+
+    @staticmethod
+    def _configured(provider: str) -> bool:
+        try:
+            _SYNC_CLIENTS[provider]()
+            return True
+        except ValueError:
+            return False
+
+    def available(self, call_type: str) -> bool:
+        """True if at least one provider of the route has an API key"""
+        return any(self._configured(provider) for provider, _ in self._route(call_type))
+
+    def _candidates(self, call_type: str) -> List[Tuple[str, str]]:
+        configured = [(p, m) for p, m in self._route(call_type) if self._configured(p)]
+        if not configured:
+            raise ValueError(f"No LLM provider with an API key is configured for {call_type}")
+
+        # Skip providers with an open circuit, unless every circuit is open
+        allowed = [c for c in configured if self.breakers[c[0]].available()]
+        return allowed or configured
+
+    def first_candidate(self, call_type: str) -> Tuple[str, str]:
+        """(provider, model) to use for calls that cannot be hedged (streaming)"""
+        return self._candidates(call_type)[0]
+
+    def async_client(self, provider: str):
+        return _ASYNC_CLIENTS[provider]()
+
+    def _hedge_delay(self, call_type: str, candidate: Tuple[str, str]) -> Optional[float]:
+        """p95 latency to wait before hedging, None (don't hedge) until it is known"""
+        p95 = self.latency.percentile((call_type, *candidate), 0.95)
+        if p95 is None:
+            return None
+        return max(self.hedge_min_delay, p95)
+
+    def begin(self, candidate: Tuple[str, str]):
+        """Attempt about to be sent (also used by streaming callers)"""
+        self.breakers[candidate[0]].begin()
+
+    def record(self, call_type: str, candidate: Tuple[str, str], ok: bool, seconds: float = 0.0):
+        """Outcome of one attempt (also used by streaming callers)"""
+        self.breakers[candidate[0]].record(ok)
+        if ok:
+            self.latency.add((call_type, *candidate), seconds)
+
+    def release_probe(self, candidate: Tuple[str, str]):
+        """Attempt cancelled before it had an outcome (also used by streaming callers)"""
+        self.breakers[candidate[0]].release_probe()
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    # ---- async ----
+
+    async def _attempt_async(self, call_type: str, candidate: Tuple[str, str],
+                             request: Dict, validate: Optional[Callable]) -> str:
+        provider, model = candidate
+        self.begin(candidate)
+        started = time.perf_counter()
+        try:
+            response = await self.async_client(provider).chat.completions.create(**{**request, "model": model})
+            content = response.choices[0].message.content.strip()
+            if validate is not None:
+                validate(content)
+        except asyncio.CancelledError:
+            self.release_probe(candidate)
+            raise
+        except Exception:
+            self.record(call_type, candidate, ok=False)
+            raise
+        self.record(call_type, candidate, ok=True, seconds=time.perf_counter() - started)
+        return content
+
+    async def complete_async(self, call_type: str, request: Dict,
+                             validate: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Run a chat completion over the call type's route
+
+        Args:
+            request: chat.completions.create kwargs; "model" is replaced by each candidate's model
+            validate: Check on the content; raising counts as a failed attempt
+
+        Returns:
+            str: Stripped content of the first successful attempt
+        """
+        candidates = self._candidates(call_type)
+        self._count(calls=1)
+
+        pending: Dict[asyncio.Task, int] = {}
+        next_index = 0
+        last_error = None
+
+        def launch():
+            nonlocal next_index
+            task = asyncio.ensure_future(self._attempt_async(call_type, candidates[next_index], request, validate))
+            pending[task] = next_index
+            next_index += 1
+
+        launch()
+        try:
+            while pending:
+                can_hedge = (
+                    self.hedge_enabled
+                    and next_index < len(candidates)
+                    and len(pending) < self.max_parallel
+                )
+                timeout = self._hedge_delay(call_type, candidates[next_index - 1]) if can_hedge else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    self._count(hedges=1)
+                    launch()
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    try:
+                        content = task.result()
+                    except Exception as e:
+                        last_error = e
+                        provider, model = candidates[index]
+                        logger.warning(f"{call_type} via {provider}:{model} failed: {e}")
+                        continue
+                    if index > 0:
+                        self._count(hedge_wins=1)
+                    return content
+
+                if not pending and next_index < len(candidates):
+                    self._count(failovers=1)
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self._count(failures=1)
+        raise last_error
+
+    # ---- sync ----
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=get_settings().llm_max_concurrency_openai,
+                        thread_name_prefix="llm-router"
+                    )
+        return self._executor
+
+    def _attempt(self, call_type: str, candidate: Tuple[str, str],
+                 request: Dict, validate: Optional[Callable]) -> str:
+        provider, model = candidate
+        self.begin(candidate)
+        started = time.perf_counter()
+        try:
+            response = _SYNC_CLIENTS[provider]().chat.completions.create(**{**request, "model": model})
+            content = response.choices[0].message.content.strip()
+            if validate is not None:
+                validate(content)
+        except Exception:
+            self.record(call_type, candidate, ok=False)
+            raise
+        self.record(call_type, candidate, ok=True, seconds=time.perf_counter() - started)
+        return content
+
+    def complete(self, call_type: str, request: Dict,
+                 validate: Optional[Callable[[str], Any]] = None) -> str:
+        """Sync variant of complete_async (losing attempts are abandoned, not interrupted)"""
+        candidates = self._candidates(call_type)
+        self._count(calls=1)
+        executor = self._get_executor()
+
+        pending: Dict[concurrent.futures.Future, int] = {}
+        next_index = 0
+        last_error = None
+
+        def launch():
+            nonlocal next_index
+            # Copy the caller's context so its LLM priority applies in the worker thread
+            future = executor.submit(
+                contextvars.copy_context().run,
+                self._attempt, call_type, candidates[next_index], request, validate
+            )
+            pending[future] = next_index
+            next_index += 1
+
+        launch()
+        try:
+            while pending:
+                can_hedge = (
+                    self.hedge_enabled
+                    and next_index < len(candidates)
+                    and len(pending) < self.max_parallel
+                )
+                timeout = self._hedge_delay(call_type, candidates[next_index - 1]) if can_hedge else None
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+
+                if not done:
+                    self._count(hedges=1)
+                    launch()
+                    continue
+
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        content = future.result()
+                    except Exception as e:
+                        last_error = e
+                        provider, model = candidates[index]
+                        logger.warning(f"{call_type} via {provider}:{model} failed: {e}")
+                        continue
+                    if index > 0:
+                        self._count(hedge_wins=1)
+                    return content
+
+                if not pending and next_index < len(candidates):
+                    self._count(failovers=1)
+                    launch()
+        finally:
+            for future in pending:
+                future.cancel()
+
+        self._count(failures=1)
+        raise last_error
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "failovers": self.failovers,
+                "failures": self.failures
+            }
+        return {
+            **counters,
+            "routes": {
+                call_type: [f"{provider}:{model}" for provider, model in route]
+                for call_type, route in self.routes.items()
+            },
+            "breakers": {provider: breaker.stats() for provider, breaker in self.breakers.items()},
+            "latency": self.latency.stats()
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+_router = None
+
+
+def get_llm_router() -> LLMRouter:
+    """Get or create the LLM router singleton"""
+    global _router
+    if _router is None:
+        _router = LLMRouter()
+    return _router
+
+
+def get_llm_router_stats() -> Dict:
+    """Routing counters, circuit breaker states and latency percentiles"""
+    if _router is None:
+        return {}
+    return _router.stats()
+
+
+def shutdown_llm_router():
+    """Stop the sync hedging thread pool (called on shutdown)"""
+    global _router
+    if _router is not None:
+        _router.shutdown()
+        _router = None
+
+
+def routed_completion(call_type: str, cache: bool = True,
+                      validate: Optional[Callable[[str], Any]] = None, **request) -> str:
+    """
+    Routed chat completion through the LLM response cache
+
+    The cache key is computed from `request` as given (i.e. with the
+    caller's primary model), whichever provider ends up answering.
+    """
+    use_cache = cache and get_settings().llm_cache_enabled
+    if use_cache:
+        llm_cache = get_llm_cache()
+        key = cache_key(request)
+        content = llm_cache.get_sync(key)
+        if content is not None:
+            return content
+
+    content = get_llm_router().complete(call_type, request, validate=validate)
+
+    if use_cache:
+        llm_cache.set_sync(key, content, model=request.get("model"))
+    return content
+
+
+async def routed_completion_async(call_type: str, cache: bool = True,
+                                  validate: Optional[Callable[[str], Any]] = None, **request) -> str:
+    """Async variant of routed_completion"""
+    use_cache = cache and get_settings().llm_cache_enabled
+    if use_cache:
+        llm_cache = get_llm_cache()
+        key = cache_key(request)
+        content = await llm_cache.get(key)
+        if content is not None:
+            return content
+
+    content = await get_llm_router().complete_async(call_type, request, validate=validate)
+
+    if use_cache:
+        await llm_cache.set(key, content, model=request.get("model"))
+    return content
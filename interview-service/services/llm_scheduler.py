@@ -0,0 +1,320 @@
+"""
+LLM Request Scheduler
+Per-provider requests-per-minute / tokens-per-minute buckets with priority classes
+
+Every outbound OpenAI / Groq request goes through the provider's scheduler:
+the shared clients' transports (services/llm_clients.py) call acquire()
+before sending, so call sites do not need to do anything to be rate limited.
+They only declare bulk work as such:
+
+    with llm_priority(BATCH):
+        client.embeddings.create(...)
+
+INTERACTIVE requests (the default: session creation, scoring, ...) are always
+dispatched before waiting BATCH requests (question-bank sync embeddings, OCR
+Vision chunks, recommendations), and BATCH requests may not drain a bucket
+below LLM_SCHEDULER_INTERACTIVE_RESERVE of its capacity, so an interview is
+not pushed into 429 retries by a large sync.
+
+Token cost is estimated from the request body (prompt tokens via
+services/token_counter.py plus max_tokens), and the buckets are pulled down
+to the provider's x-ratelimit-remaining-* headers whenever a response
+reports less capacity than the local estimate.
+
+The priority is a context variable, so it follows the caller into async
+tasks and starlette's run_in_threadpool; plain executor threads start at
+INTERACTIVE unless the caller's context is copied in.
+
+acquire() blocks its thread while waiting for capacity: sync LLM calls from
+async handlers must go through run_in_threadpool (or use the async
+variants, which call acquire_async). A blocking acquire on an event loop
+thread raises EventLoopBlockedError (counted in `event_loop_acquires`):
+it could wait forever behind an async request queued ahead of it, which
+cannot be dispatched while the loop is blocked.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import httpx
+
+from services.token_counter import count_message_tokens, count_tokens
+
+logger = logging.getLogger("backend.llm_scheduler")
+
+# Priority classes (lower is served first)
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Rough cost of one image part in a Vision request
+IMAGE_TOKEN_ESTIMATE = 765
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+class EventLoopBlockedError(RuntimeError):
+    """Sync LLM request made on an event loop thread (use run_in_threadpool)"""
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """Run the enclosed LLM calls at `priority` (INTERACTIVE or BATCH)"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+def parse_request_body(request: httpx.Request) -> Optional[Dict]:
+    """JSON body of an outbound request, or None (e.g. multipart audio uploads)"""
+    if "json" not in request.headers.get("content-type", ""):
+        return None
+    try:
+        body = json.loads(request.content)
+    except (httpx.RequestNotRead, ValueError):
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def estimate_request_tokens(body: Optional[Dict]) -> int:
+    """Token cost of a chat-completion / embedding request body (0 if unknown)"""
+    if not body:
+        return 0
+
+    model = body.get("model") or "gpt-4o-mini"
+    tokens = 0
+
+    messages = body.get("messages")
+    if isinstance(messages, list):
+        tokens += count_message_tokens(messages, model)
+        tokens += IMAGE_TOKEN_ESTIMATE * sum(
+            1
+            for message in messages if isinstance(message.get("content"), list)
+            for part in message["content"] if isinstance(part, dict) and part.get("type") == "image_url"
+        )
+    elif "input" in body:
+        inputs = body["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        tokens += sum(count_tokens(text, model) for text in inputs if isinstance(text, str))
+
+    tokens += body.get("max_tokens") or body.get("max_completion_tokens") or 0
+    return tokens
+
+
+class TokenBucket:
+    """Continuously refilled bucket; a rate <= 0 means unlimited"""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float, reserve: float = 0.0, now: Optional[float] = None) -> float:
+        """Seconds until `amount` can be taken while leaving `reserve` (fraction of capacity)"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now or time.monotonic())
+        # A single request larger than the bucket only waits for a full bucket
+        needed = min(amount, self.capacity) + reserve * self.capacity
+        missing = needed - self.level
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def consume(self, amount: float):
+        if not self.unlimited:
+            self.level -= min(amount, self.capacity)
+
+    def clamp(self, remaining: float):
+        if not self.unlimited and remaining < self.level:
+            self.level = remaining
+
+
+class _PriorityStats:
+    def __init__(self):
+        self.requests = 0
+        self.tokens = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.recent_waits = deque(maxlen=500)
+
+    def add(self, tokens: int, waited: float):
+        self.requests += 1
+        self.tokens += tokens
+        self.recent_waits.append(waited)
+        if waited > 0.001:
+            self.waited += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def snapshot(self) -> Dict:
+        waits = sorted(self.recent_waits)
+        return {
+            "requests": self.requests,
+            "tokens": self.tokens,
+            "waited": self.waited,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+            "p95_wait_ms": round(waits[min(len(waits) - 1, int(0.95 * len(waits)))] * 1000, 1) if waits else 0.0
+        }
+
+
+class ProviderScheduler:
+    """Priority queue in front of one provider's RPM / TPM buckets"""
+
+    def __init__(self, provider: str, requests_per_minute: float, tokens_per_minute: float,
+                 interactive_reserve: float = 0.2):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.interactive_reserve = interactive_reserve
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+        self._stats = {priority: _PriorityStats() for priority in PRIORITY_NAMES}
+        self.rate_limited = 0
+        self.event_loop_acquires = 0
+
+    def _enqueue(self, priority: int) -> tuple:
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _dequeue(self, ticket: tuple):
+        with self._cond:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def _try_dispatch(self, ticket: tuple, tokens: int) -> Optional[float]:
+        """0 if the request may go now, otherwise how long to wait (None: not at the head)"""
+        with self._cond:
+            if self._waiting[0] != ticket:
+                return None
+            reserve = self.interactive_reserve if ticket[0] != INTERACTIVE else 0.0
+            now = time.monotonic()
+            wait = max(
+                self.requests.wait_time(1, reserve, now),
+                self.tokens.wait_time(tokens, reserve, now)
+            )
+            if wait > 0:
+                return wait
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            heapq.heappop(self._waiting)
+            self._cond.notify_all()
+            return 0.0
+
+    def _record(self, priority: int, tokens: int, started: float):
+        with self._cond:
+            self._stats[priority].add(tokens, time.perf_counter() - started)
+
+    def _check_event_loop(self):
+        """Refuse a blocking acquire on an event loop thread"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        with self._cond:
+            self.event_loop_acquires += 1
+        raise EventLoopBlockedError(
+            f"Sync {self.provider} request on the event loop; "
+            f"run it in run_in_threadpool or use the async client"
+        )
+
+    def acquire(self, tokens: int, priority: Optional[int] = None):
+        """Block until the request may be sent"""
+        self._check_event_loop()
+        priority = current_priority() if priority is None else priority
+        started = time.perf_counter()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                wait = self._try_dispatch(ticket, tokens)
+                if wait == 0:
+                    break
+                with self._cond:
+                    self._cond.wait(timeout=min(wait, 1.0) if wait else 0.05)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        self._record(priority, tokens, started)
+
+    async def acquire_async(self, tokens: int, priority: Optional[int] = None):
+        """Async acquire; polls so the event loop keeps running"""
+        priority = current_priority() if priority is None else priority
+        started = time.perf_counter()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                wait = self._try_dispatch(ticket, tokens)
+                if wait == 0:
+                    break
+                await asyncio.sleep(min(wait, 0.05) if wait else 0.005)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        self._record(priority, tokens, started)
+
+    def observe(self, response: httpx.Response):
+        """Align the buckets with the provider's own rate-limit headers"""
+        headers = response.headers
+        with self._cond:
+            if response.status_code == 429:
+                self.rate_limited += 1
+            try:
+                if "x-ratelimit-remaining-requests" in headers:
+                    self.requests.clamp(float(headers["x-ratelimit-remaining-requests"]))
+                if "x-ratelimit-remaining-tokens" in headers:
+                    self.tokens.clamp(float(headers["x-ratelimit-remaining-tokens"]))
+            except ValueError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._cond:
+            now = time.monotonic()
+            self.requests.wait_time(0, now=now)
+            self.tokens.wait_time(0, now=now)
+            return {
+                "requests_per_minute": self.requests.per_minute,
+                "tokens_per_minute": self.tokens.per_minute,
+                "available_requests": None if self.requests.unlimited else int(self.requests.level),
+                "available_tokens": None if self.tokens.unlimited else int(self.tokens.level),
+                "queued": {
+                    name: sum(1 for priority, _ in self._waiting if priority == level)
+                    for level, name in PRIORITY_NAMES.items()
+                },
+                "rate_limited": self.rate_limited,
+                "event_loop_acquires": self.event_loop_acquires,
+                "priorities": {
+                    PRIORITY_NAMES[priority]: stats.snapshot()
+                    for priority, stats in self._stats.items()
+                }
+            }
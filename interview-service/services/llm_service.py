@@ -1,8 +1,22 @@
 import json
 import logging
-from groq import Groq
-from config import get_settings, get_settingsgpt
-from openai import OpenAI
+import time
+from services.llm_clients import OPENAI, get_groq_client, get_openai_client, get_async_openai_client
+from services.llm_cache import cached_completion_async, cache_key, get_llm_cache
+from services.llm_router import (
+    QUESTION_GENERATION,
+    REFERENCE_ANSWER,
+    EVALUATION,
+    EVALUATION_BATCH,
+    ADAPTIVE_QUESTIONS,
+    get_llm_router,
+    routed_completion,
+    routed_completion_async,
+)
+from services.json_stream import JSONArrayStreamParser
+from config import get_settings
+from services.token_counter import count_tokens, count_message_tokens
+from services.llm_metrics import llm_call_site, llm_context
 
 
 # ---------------------------
@@ -10,19 +24,30 @@ from openai import OpenAI
 # ---------------------------
 
 def get_client():
-    """Lazy initialization of Groq client."""
-    settings = get_settings()
-    if not settings.groq_api_key:
-        raise ValueError("GROQ_API_KEY is required. Please set it in your .env file.")
-    return Groq(api_key=settings.groq_api_key)
+    """Shared Groq client (see services/llm_clients.py)."""
+    return get_groq_client()
 
 
 def get_clientgpt():
-    """Lazy initialization of OpenAI client."""
-    settingsgpt = get_settingsgpt()
-    if not settingsgpt.openai_api_key:
-        raise ValueError("OPENAI_API_KEY is required. Please set it in your .env file.")
-    return OpenAI(api_key=settingsgpt.openai_api_key)
+    """Shared OpenAI client (see services/llm_clients.py)."""
+    return get_openai_client()
+
+
+def get_async_clientgpt():
+    """Shared async OpenAI client (used by the evaluation engine)."""
+    return get_async_openai_client()
+
+
+def _parse_json_content(content: str):
+    """Parse JSON from a model response, tolerating ``` code fences."""
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0]
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0]
+        return json.loads(content)
 
 
 # ---------------------------
@@ -39,32 +64,27 @@ def calculate_question_count(duration_seconds: int, seconds_per_question: int =
     return max(1, duration_seconds // seconds_per_question)
 
 
-def generate_questions(job_description: str, resume_text: str, duration_seconds: int, interview_type: str = "technical") -> list:
-    logger = logging.getLogger("backend.llm_service")
+def _stub_questions(duration_seconds: int, interview_type: str = "technical") -> list:
+    """Single default question used when no OpenAI key is configured"""
+    # Fallback default based on interview type
+    if interview_type == "hr":
+        default_question = "Tell me about yourself and why you're interested in this role."
+    else:
+        default_question = "Describe a project where you demonstrated problem-solving skills."
+    
+    return [
+        {
+            "id": "q1",
+            "text": default_question,
+            "estimated_seconds": min(180, max(30, int(duration_seconds / 3)))
+        }
+    ]
 
-    # 1. Decide number of questions based on duration
-    question_count = calculate_question_count(duration_seconds)
 
-    # 2. Try initializing open ai client
-    try:
-        client = get_clientgpt()
-    except ValueError as e:
-        logger.warning(f"{e} Falling back to stub questions.")
-        # Fallback default based on interview type
-        if interview_type == "hr":
-            default_question = "Tell me about yourself and why you're interested in this role."
-        else:
-            default_question = "Describe a project where you demonstrated problem-solving skills."
-        
-        return [
-            {
-                "id": "q1",
-                "text": default_question,
-                "estimated_seconds": min(180, max(30, int(duration_seconds / 3)))
-            }
-        ]
+def _question_generation_messages(job_description: str, resume_text: str, duration_seconds: int, interview_type: str = "technical") -> list:
+    question_count = calculate_question_count(duration_seconds)
 
-    # 3. System Prompt enforcing strict JSON + fixed number of questions + interview type
+    # System Prompt enforcing strict JSON + fixed number of questions + interview type
     interview_type_instructions = ""
     if interview_type == "technical":
         interview_type_instructions = """
@@ -100,7 +120,7 @@ RULES:
 - Do NOT include explanations. Output ONLY JSON.
 """
 
-    # 4. User prompt containing JD, resume, total time, and interview type
+    # User prompt containing JD, resume, total time, and interview type
     user_prompt = f"""
 Job Description:
 {job_description}
@@ -114,23 +134,39 @@ Interview Type: {interview_type.upper()}
 Generate exactly {question_count} structured {interview_type} interview questions that match the interview type requirements.
 """
 
-    # 5. Call Groq LLM
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+@llm_call_site("llm_service.generate_questions")
+def generate_questions(job_description: str, resume_text: str, duration_seconds: int, interview_type: str = "technical", cache: bool = True) -> list:
+    logger = logging.getLogger("backend.llm_service")
+
+    # 1. Check that some provider of the route has an API key
+    if not get_llm_router().available(QUESTION_GENERATION):
+        logger.warning("No LLM API key configured. Falling back to stub questions.")
+        return _stub_questions(duration_seconds, interview_type)
+
+    # 2. System + user prompt (JD, resume, total time, interview type)
+    messages = _question_generation_messages(job_description, resume_text, duration_seconds, interview_type)
+
+    # 3. Call Groq LLM
     try:
-        response = client.chat.completions.create(
+        content = routed_completion(
+            QUESTION_GENERATION,
+            cache=cache,
+            validate=_parse_json_content,
             model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=messages,
             temperature=0.7,
             max_tokens=1500,
         )
     except Exception as e:
         raise ValueError(f"Error calling Groq API: {str(e)}") from e
 
-    content = response.choices[0].message.content.strip()
-
-    # 6. Parse JSON from Groq response
+    # 4. Parse JSON from Groq response
     try:
         result = json.loads(content)
         return result.get("questions", [])
@@ -146,13 +182,91 @@ Generate exactly {question_count} structured {interview_type} interview question
         return result.get("questions", [])
 
 
+async def generate_questions_stream(job_description: str, resume_text: str, duration_seconds: int, interview_type: str = "technical", cache: bool = True):
+    """
+    Streaming variant of generate_questions
+
+    Async generator yielding each question dict as soon as its JSON object
+    has been streamed (see services/json_stream.py). The full response is
+    stored in / served from the LLM cache like generate_questions.
+    """
+    logger = logging.getLogger("backend.llm_service")
+
+    router = get_llm_router()
+    if not router.available(QUESTION_GENERATION):
+        logger.warning("No LLM API key configured. Falling back to stub questions.")
+        for question in _stub_questions(duration_seconds, interview_type):
+            yield question
+        return
+
+    request = {
+        "model": "gpt-4o-mini",
+        "messages": _question_generation_messages(job_description, resume_text, duration_seconds, interview_type),
+        "temperature": 0.7,
+        "max_tokens": 1500,
+    }
+
+    use_cache = cache and get_settings().llm_cache_enabled
+    if use_cache:
+        llm_cache = get_llm_cache()
+        key = cache_key(request)
+        content = await llm_cache.get(key)
+        if content is not None:
+            for question in _parse_json_content(content).get("questions", []):
+                yield question
+            return
+
+    parser = JSONArrayStreamParser("questions")
+    parts = []
+
+    # A stream cannot be hedged: use the first healthy provider of the route
+    candidate = router.first_candidate(QUESTION_GENERATION)
+    provider, model = candidate
+    router.begin(candidate)
+    started = time.perf_counter()
+    recorded = False
+    try:
+        # Final chunk carries token usage (read by services/llm_metrics.py)
+        usage_option = {"stream_options": {"include_usage": True}} if provider == OPENAI else {}
+        with llm_context(call_site="llm_service.generate_questions_stream"):
+            stream = await router.async_client(provider).chat.completions.create(
+                stream=True, **usage_option, **{**request, "model": model}
+            )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            for question in parser.feed(delta):
+                yield question
+        router.record(QUESTION_GENERATION, candidate, ok=True, seconds=time.perf_counter() - started)
+        recorded = True
+    except Exception as e:
+        router.record(QUESTION_GENERATION, candidate, ok=False)
+        recorded = True
+        raise ValueError(f"Error calling {provider} API: {str(e)}") from e
+    finally:
+        # Client disconnected (GeneratorExit / CancelledError): no outcome,
+        # but a half-open probe must not stay in flight
+        if not recorded:
+            router.release_probe(candidate)
+
+    content = "".join(parts).strip()
+    if use_cache:
+        try:
+            _parse_json_content(content)
+            await llm_cache.set(key, content, model=request["model"])
+        except ValueError:
+            logger.warning("Streamed question set is not valid JSON; not cached")
+
+
 # ---------------------------
 # GENERATE IDEAL REFERENCE ANSWERS
 # ---------------------------
 
-def generate_reference_answer(question: str, jd: str, resume: str, interview_type: str = "technical"):
-    client = get_clientgpt()
-    
+def _reference_answer_messages(question: str, jd: str, resume: str, interview_type: str = "technical") -> list:
     # Adapt system prompt based on interview type
     if interview_type == "technical":
         system_prompt = """
@@ -196,26 +310,44 @@ Question:
 {question}
 """
 
-    response = client.chat.completions.create(
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+@llm_call_site("llm_service.generate_reference_answer")
+def generate_reference_answer(question: str, jd: str, resume: str, interview_type: str = "technical", cache: bool = True):
+    return routed_completion(
+        REFERENCE_ANSWER,
+        cache=cache,
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
+        messages=_reference_answer_messages(question, jd, resume, interview_type),
         temperature=0.5,
         max_tokens=500,
     )
-    
-    return response.choices[0].message.content.strip()
+
+
+@llm_call_site("llm_service.generate_reference_answer")
+async def generate_reference_answer_async(question: str, jd: str, resume: str, interview_type: str = "technical", client=None, cache: bool = True):
+    """Async variant of generate_reference_answer for concurrent fan-out (client bypasses the router)."""
+    request = dict(
+        model="gpt-4o-mini",
+        messages=_reference_answer_messages(question, jd, resume, interview_type),
+        temperature=0.5,
+        max_tokens=500,
+    )
+    if client is not None:
+        return await cached_completion_async(client, cache=cache, **request)
+    return await routed_completion_async(REFERENCE_ANSWER, cache=cache, **request)
 
 
 # ---------------------------
 # ANSWER EVALUATION
 # ---------------------------
 
-def evaluate_answer(question: str, transcript: str, reference_answer: str, interview_type: str = "technical") -> dict:
-    client = get_clientgpt()
-
+def _evaluation_rubric(interview_type: str = "technical") -> tuple:
+    """(evaluator_role, evaluation_criteria) for the interview type"""
     # Adapt evaluation criteria based on interview type
     if interview_type == "technical":
         evaluation_criteria = """
@@ -236,6 +368,12 @@ def evaluate_answer(question: str, transcript: str, reference_answer: str, inter
 """
         evaluator_role = "expert HR interviewer"
 
+    return evaluator_role, evaluation_criteria
+
+
+def _evaluation_messages(question: str, transcript: str, reference_answer: str, interview_type: str = "technical") -> list:
+    evaluator_role, evaluation_criteria = _evaluation_rubric(interview_type)
+
     system_prompt = f"""
 You are an {evaluator_role}. Your job is to evaluate a candidate's response using a structured, consistent rubric.
 
@@ -288,34 +426,268 @@ Ideal Reference Answer:
 Score objectively. Penalize vague or incorrect answers.
 """
 
-    response = client.chat.completions.create(
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+@llm_call_site("llm_service.evaluate_answer")
+def evaluate_answer(question: str, transcript: str, reference_answer: str, interview_type: str = "technical", cache: bool = True) -> dict:
+    content = routed_completion(
+        EVALUATION,
+        cache=cache,
+        validate=_parse_json_content,
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
+        messages=_evaluation_messages(question, transcript, reference_answer, interview_type),
         temperature=0.2,
         max_tokens=1000,
     )
 
-    content = response.choices[0].message.content.strip()
-
     # Parse JSON safely
-    try:
-        return json.loads(content)
+    return _parse_json_content(content)
 
-    except json.JSONDecodeError:
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-        return json.loads(content)
+
+@llm_call_site("llm_service.evaluate_answer")
+async def evaluate_answer_async(question: str, transcript: str, reference_answer: str, interview_type: str = "technical", client=None, cache: bool = True) -> dict:
+    """Async variant of evaluate_answer for concurrent fan-out (client bypasses the router)."""
+    request = dict(
+        model="gpt-4o-mini",
+        messages=_evaluation_messages(question, transcript, reference_answer, interview_type),
+        temperature=0.2,
+        max_tokens=1000,
+    )
+    if client is not None:
+        content = await cached_completion_async(client, cache=cache, validate=_parse_json_content, **request)
+    else:
+        content = await routed_completion_async(EVALUATION, cache=cache, validate=_parse_json_content, **request)
+
+    return _parse_json_content(content)
+
+
+# ---------------------------
+# BATCHED ANSWER EVALUATION
+# ---------------------------
+
+EVALUATION_CATEGORIES = ["relevance", "accuracy", "depth", "clarity", "fit"]
+
+# Structured-output schema for one batched request
+EVALUATION_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "evaluations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "question_id": {"type": "string"},
+                    "scores": {
+                        "type": "object",
+                        "properties": {c: {"type": "integer"} for c in EVALUATION_CATEGORIES},
+                        "required": EVALUATION_CATEGORIES,
+                        "additionalProperties": False
+                    },
+                    "total_score": {"type": "number"},
+                    "feedback": {"type": "array", "items": {"type": "string"}},
+                    "comparison_summary": {"type": "string"}
+                },
+                "required": ["question_id", "scores", "total_score", "feedback", "comparison_summary"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["evaluations"],
+    "additionalProperties": False
+}
+
+
+def validate_evaluation(evaluation) -> dict:
+    """
+    Check one evaluation against the rubric's output format
+
+    Raises:
+        ValueError: if a field is missing or out of range
+    """
+    if not isinstance(evaluation, dict):
+        raise ValueError("evaluation is not an object")
+
+    scores = evaluation.get("scores")
+    if not isinstance(scores, dict):
+        raise ValueError("scores missing")
+    for category in EVALUATION_CATEGORIES:
+        value = scores.get(category)
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or not 1 <= value <= 10:
+            raise ValueError(f"invalid score for {category}: {value!r}")
+
+    total_score = evaluation.get("total_score")
+    if not isinstance(total_score, (int, float)) or isinstance(total_score, bool) or not 0 <= total_score <= 10:
+        raise ValueError(f"invalid total_score: {total_score!r}")
+
+    feedback = evaluation.get("feedback")
+    if not isinstance(feedback, list) or not all(isinstance(f, str) for f in feedback):
+        raise ValueError("feedback must be a list of strings")
+
+    return evaluation
+
+
+def _batch_item_block(item: dict) -> str:
+    return f"""
+### Answer {item["question_id"]}
+Question: {item["question"]}
+
+Candidate Answer:
+{item["transcript"]}
+
+Ideal Reference Answer:
+{item["reference_answer"]}
+"""
+
+
+def _batch_evaluation_messages(items: list, interview_type: str = "technical") -> list:
+    evaluator_role, evaluation_criteria = _evaluation_rubric(interview_type)
+
+    system_prompt = f"""
+You are an {evaluator_role}. Your job is to evaluate several candidate responses from one interview using a structured, consistent rubric.
+
+Follow these rules STRICTLY:
+
+1. Evaluate each answer independently. Do not let one answer influence another.
+2. Assign each category a score from 1 to 10 (integers only).
+3. Base scores ONLY on the candidate's actual text. Do NOT infer missing details.
+4. Do NOT give perfect scores unless the answer fully demonstrates excellence.
+5. Return exactly one evaluation per answer, with its question_id copied verbatim.
+
+Evaluation Criteria ({interview_type.upper()} Interview):
+
+{evaluation_criteria}
+
+Output Format (strict):
+
+{{
+  "evaluations": [
+    {{
+      "question_id": "id from the answer heading",
+      "scores": {{"relevance": int, "accuracy": int, "depth": int, "clarity": int, "fit": int}},
+      "total_score": float,
+      "feedback": ["Short, specific point of improvement", "Short, specific strength", "Another short, specific note"],
+      "comparison_summary": "1–2 sentence comparison with an ideal expert-level answer."
+    }}
+  ]
+}}
+
+Compute total_score as the average of the five category scores, then scale it to a value between 1 and 10 (rounded to one decimal place).
+
+Return ONLY this JSON. No other text.
+"""
+
+    user_prompt = f"Evaluate the following {len(items)} answers.\n" + "".join(
+        _batch_item_block(item) for item in items
+    ) + "\nScore objectively. Penalize vague or incorrect answers.\n"
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def plan_evaluation_batches(items: list, interview_type: str = "technical",
+                            max_items: int = 8, max_tokens: int = 12000) -> list:
+    """
+    Greedily group evaluation items into batches within a prompt token budget
+
+    Args:
+        items: [{"question_id", "question", "transcript", "reference_answer"}]
+        max_items: Max answers per request
+        max_tokens: Max prompt tokens per request
+
+    Returns:
+        list: Batches (lists of items); an item that alone exceeds the
+              budget gets a batch of its own
+    """
+    base_tokens = count_message_tokens(_batch_evaluation_messages([], interview_type))
+
+    batches = []
+    current, current_tokens = [], base_tokens
+    for item in items:
+        item_tokens = count_tokens(_batch_item_block(item))
+        if current and (len(current) >= max_items or current_tokens + item_tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], base_tokens
+        current.append(item)
+        current_tokens += item_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def per_answer_prompt_tokens(item: dict, interview_type: str = "technical") -> int:
+    """Prompt tokens evaluate_answer would send for this item"""
+    return count_message_tokens(_evaluation_messages(
+        item["question"], item["transcript"], item["reference_answer"], interview_type
+    ))
+
+
+def batch_prompt_tokens(items: list, interview_type: str = "technical") -> int:
+    """Prompt tokens of one batched evaluation request"""
+    return count_message_tokens(_batch_evaluation_messages(items, interview_type))
+
+
+@llm_call_site("llm_service.evaluate_answers_batch")
+async def evaluate_answers_batch_async(items: list, interview_type: str = "technical",
+                                       client=None, cache: bool = True) -> dict:
+    """
+    Score several answers of a session in one structured-output request
+    (EVALUATION_BATCH route: OpenAI only, Groq rejects json_schema)
+
+    Args:
+        items: [{"question_id", "question", "transcript", "reference_answer"}]
+
+    Raises:
+        ValueError: if the response is not parseable JSON of the expected shape
+
+    Returns:
+        dict: question_id -> evaluation, only for evaluations that pass
+              validate_evaluation (callers fall back for the rest)
+    """
+    request = dict(
+        model="gpt-4o-mini",
+        messages=_batch_evaluation_messages(items, interview_type),
+        temperature=0.2,
+        max_tokens=min(4000, 400 * len(items)),
+        response_format={
+            "type": "json_schema",
+            "json_schema": {"name": "answer_evaluations", "schema": EVALUATION_BATCH_SCHEMA, "strict": True}
+        },
+    )
+    if client is not None:
+        content = await cached_completion_async(client, cache=cache, validate=_parse_json_content, **request)
+    else:
+        content = await routed_completion_async(EVALUATION_BATCH, cache=cache, validate=_parse_json_content, **request)
+
+    result = _parse_json_content(content)
+    evaluations = result.get("evaluations") if isinstance(result, dict) else None
+    if not isinstance(evaluations, list):
+        raise ValueError("Batched evaluation response has no evaluations list")
+
+    expected = {item["question_id"] for item in items}
+    valid = {}
+    for evaluation in evaluations:
+        qid = evaluation.get("question_id") if isinstance(evaluation, dict) else None
+        if qid not in expected or qid in valid:
+            continue
+        try:
+            valid[qid] = validate_evaluation(evaluation)
+        except ValueError as e:
+            logging.getLogger("backend.llm_service").warning(f"Invalid batched evaluation for {qid}: {e}")
+
+    return valid
 
 
 # ---------------------------
 # ADAPTIVE LEARNING - GENERATE TARGETED QUESTIONS
 # ---------------------------
 
+@llm_call_site("llm_service.generate_adaptive_questions")
 def generate_adaptive_questions(weak_areas: list, job_description: str, resume_text: str, 
                                duration_seconds: int, interview_type: str, 
                                previous_questions: list, practice_num: int = 1) -> list:
@@ -329,7 +701,6 @@ def generate_adaptive_questions(weak_areas: list, job_description: str, resume_t
     
     practice_num: 1 for first set of practice questions, 2 for second set (different variations)
     """
-    client = get_clientgpt()
     
     # Extract weak topic descriptions
     weak_topics = [wa.get("topic", "") for wa in weak_areas[:3]]
@@ -392,7 +763,9 @@ CONSTRAINTS:
 """
 
     try:
-        response = client.chat.completions.create(
+        content = routed_completion(
+            ADAPTIVE_QUESTIONS,
+            cache=False,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -404,8 +777,6 @@ CONSTRAINTS:
     except Exception as e:
         raise ValueError(f"Error calling LLM for adaptive questions: {str(e)}") from e
 
-    content = response.choices[0].message.content.strip()
-
     try:
         result = json.loads(content)
         return result.get("questions", [])
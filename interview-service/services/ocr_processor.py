@@ -3,11 +3,14 @@ import json
 import base64
 import io
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Iterator
 from PIL import Image
 import fitz  # PyMuPDF - converts PDF to images without Poppler
-from openai import OpenAI
-from config import get_settingsgpt
+from config import get_ocr_config
+from services.llm_clients import get_openai_client
+from services.llm_scheduler import llm_priority, BATCH
+from services.llm_metrics import llm_call_site
 
 logger = logging.getLogger(__name__)
 
@@ -15,11 +18,13 @@ class OCRProcessor:
     def __init__(self):
         """Initialize OCR processor with GPT-4o-mini Vision API"""
         try:
-            settings = get_settingsgpt()
-            if not settings.openai_api_key:
-                raise ValueError("OPENAI_API_KEY is required. Please set it in your .env file.")
-            self.client = OpenAI(api_key=settings.openai_api_key)
+            self.client = get_openai_client()
             self.debug_mode = False
+
+            ocr_config = get_ocr_config()
+            self.pages_per_chunk = ocr_config["PAGES_PER_CHUNK"]
+            self.max_in_flight = ocr_config["MAX_IN_FLIGHT_CHUNKS"]
+            self.encode_workers = ocr_config["ENCODE_WORKERS"]
             logger.info("OCR Processor initialized with GPT-4o-mini Vision")
         except Exception as e:
             logger.error(f"Failed to initialize OCR processor: {str(e)}")
@@ -49,87 +54,113 @@ class OCRProcessor:
     # -------------------------------------------------------------------
     #  PDF TO IMAGES USING PYMUPDF (NO POPPLER REQUIRED)
     # -------------------------------------------------------------------
-    def _pdf_to_images_pymupdf(self, file_bytes: bytes) -> List[Image.Image]:
-        """Convert PDF bytes to PIL Images using PyMuPDF (no Poppler required)"""
-        images = []
+    def _iter_pdf_pages_pymupdf(self, file_bytes: bytes) -> Iterator[Image.Image]:
+        """
+        Lazily render PDF pages to PIL Images using PyMuPDF (no Poppler required)
+
+        Pages are rendered one at a time as the caller iterates, so only the
+        pages currently being encoded/sent are held in memory.
+        """
+        pdf_document = fitz.open(stream=file_bytes, filetype="pdf")
         try:
-            # Open PDF from bytes
-            pdf_document = fitz.open(stream=file_bytes, filetype="pdf")
-            
-            # Convert each page to an image
-            for page_num in range(len(pdf_document)):
-                page = pdf_document[page_num]
-                # Render page to a pixmap (image) at 200 DPI
-                mat = fitz.Matrix(200/72, 200/72)  # 200 DPI
+            # Render page to a pixmap (image) at 200 DPI
+            mat = fitz.Matrix(200/72, 200/72)  # 200 DPI
+            for page in pdf_document:
                 pix = page.get_pixmap(matrix=mat)
-                
+
                 # Convert pixmap to PIL Image
                 img_data = pix.tobytes("ppm")
-                img = Image.open(io.BytesIO(img_data))
-                images.append(img)
-            
+                yield Image.open(io.BytesIO(img_data))
+        finally:
             pdf_document.close()
-            return images
-        except Exception as e:
-            logger.error(f"Error converting PDF to images with PyMuPDF: {str(e)}")
-            raise
 
     # -------------------------------------------------------------------
     #  GPT-4O-MINI VISION EXTRACTION FROM IMAGES
     # -------------------------------------------------------------------
     def _extract_questions_from_pdf_pages(self, file_bytes: bytes) -> List[Dict[str, Any]]:
-        """Extract MCQ questions from PDF by converting to images first"""
-        
-        # Convert PDF pages to images using PyMuPDF
-        try:
-            images = self._pdf_to_images_pymupdf(file_bytes)
-            logger.info(f"Converted PDF to {len(images)} page(s) using PyMuPDF")
-        except Exception as e:
-            logger.error(f"Failed to convert PDF to images: {str(e)}")
-            return []
-        
-        if not images:
+        """
+        Extract MCQ questions from PDF by converting to images first
+
+        Pipeline: pages are rendered lazily, JPEG-encoded on a thread pool
+        and grouped into chunks of PAGES_PER_CHUNK pages. Up to
+        MAX_IN_FLIGHT_CHUNKS chunk requests run concurrently; rendering
+        pauses while all slots are busy. Results are merged in page order.
+        """
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        in_flight: Dict[Future, int] = {}
+        page_count = 0
+
+        def collect(done):
+            for future in done:
+                chunk_index = in_flight.pop(future)
+                results[chunk_index] = future.result()
+
+        with ThreadPoolExecutor(max_workers=self.encode_workers, thread_name_prefix="ocr-encode") as encode_pool, \
+                ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="ocr-chunk") as request_pool:
+
+            def dispatch(encoded_pages: List[Future]):
+                # Wait for a free slot before rendering further pages
+                if len(in_flight) >= self.max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                chunk_index = len(results) + len(in_flight)
+                logger.info(f"Dispatching chunk {chunk_index + 1} ({len(encoded_pages)} page(s))")
+                future = request_pool.submit(self._extract_questions_from_encoded_pages, encoded_pages, chunk_index)
+                in_flight[future] = chunk_index
+
+            chunk: List[Future] = []
+            try:
+                for page in self._iter_pdf_pages_pymupdf(file_bytes):
+                    page_count += 1
+                    chunk.append(encode_pool.submit(self._image_to_base64, page))
+                    if len(chunk) == self.pages_per_chunk:
+                        dispatch(chunk)
+                        chunk = []
+            except Exception as e:
+                logger.error(f"Failed to convert PDF to images: {str(e)}")
+                if not page_count:
+                    return []
+
+            if chunk:
+                dispatch(chunk)
+
+            collect(list(in_flight))
+
+        if not page_count:
             logger.warning("No images extracted from PDF")
             return []
-        
-        # Process images in chunks (2 pages per chunk)
+
+        logger.info(f"Processed {page_count} page(s) in {len(results)} chunk(s) using PyMuPDF")
+
         all_questions = []
-        chunks = []
-        pages_per_chunk = 2
-        for i in range(0, len(images), pages_per_chunk):
-            chunks.append(images[i:i + pages_per_chunk])
-        
-        logger.info(f"Split into {len(chunks)} chunk(s) for processing")
-        
-        # Process each chunk
-        for idx, chunk in enumerate(chunks):
-            logger.info(f"Processing chunk {idx + 1}/{len(chunks)} ({len(chunk)} page(s))")
-            chunk_questions = self._extract_questions_from_images(chunk, chunk_index=idx)
-            all_questions.extend(chunk_questions)
-        
+        for chunk_index in sorted(results):
+            all_questions.extend(results[chunk_index])
+
         return all_questions
 
-    def _extract_questions_from_images(self, images: List[Image.Image], chunk_index: int = 0) -> List[Dict[str, Any]]:
-        """Extract MCQ questions from images using GPT-4o-mini Vision"""
-        
-        # Convert images to base64
-        image_contents = []
-        for img in images:
-            img_base64 = self._image_to_base64(img)
-            image_contents.append({
-                "type": "image_url",
-                "image_url": {
-                    "url": f"data:image/jpeg;base64,{img_base64}"
-                }
-            })
+    def _extract_questions_from_encoded_pages(self, encoded_pages: List[Future], chunk_index: int) -> List[Dict[str, Any]]:
+        """Wait for a chunk's JPEG encodes, then run Vision extraction on it"""
+        try:
+            images_base64 = [future.result() for future in encoded_pages]
+        except Exception as e:
+            logger.error(f"Chunk {chunk_index + 1}: failed to encode page(s): {str(e)}")
+            return []
+        return self._extract_questions_from_base64(images_base64, chunk_index=chunk_index)
 
     def _extract_questions_from_images(self, images: List[Image.Image], chunk_index: int = 0) -> List[Dict[str, Any]]:
         """Extract MCQ questions from images using GPT-4o-mini Vision"""
+        return self._extract_questions_from_base64(
+            [self._image_to_base64(img) for img in images],
+            chunk_index=chunk_index
+        )
+
+    @llm_call_site("ocr_processor.extract_questions")
+    def _extract_questions_from_base64(self, images_base64: List[str], chunk_index: int = 0) -> List[Dict[str, Any]]:
+        """Extract MCQ questions from base64 JPEG images using GPT-4o-mini Vision"""
         
-        # Convert images to base64
         image_contents = []
-        for img in images:
-            img_base64 = self._image_to_base64(img)
+        for img_base64 in images_base64:
             image_contents.append({
                 "type": "image_url",
                 "image_url": {
@@ -184,7 +215,7 @@ CRITICAL:
 - Extract ALL questions, don't skip any
 - Make explanations concise but comprehensive (2-3 sentences minimum if available)"""
 
-        user_prompt = f"""Analyze these {len(images)} page(s) of the exam paper and extract all MCQ questions.
+        user_prompt = f"""Analyze these {len(images_base64)} page(s) of the exam paper and extract all MCQ questions.
 
 Return the questions in the exact JSON format specified. Extract every question you can find."""
 
@@ -200,14 +231,15 @@ Return the questions in the exact JSON format specified. Extract every question
                 }
             ]
 
-            # Call GPT-4o-mini Vision API
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                temperature=0.1,  # Low temperature for accuracy
-                max_tokens=4000,
-                response_format={"type": "json_object"}  # Force JSON output
-            )
+            # Call GPT-4o-mini Vision API (bulk work: yields to interactive calls)
+            with llm_priority(BATCH):
+                response = self.client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=messages,
+                    temperature=0.1,  # Low temperature for accuracy
+                    max_tokens=4000,
+                    response_format={"type": "json_object"}  # Force JSON output
+                )
 
             content = response.choices[0].message.content.strip()
             
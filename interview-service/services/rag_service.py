@@ -13,8 +13,9 @@ import logging
 from typing import List, Dict, Any, Optional
 import chromadb
 from chromadb.config import Settings
-from openai import OpenAI
-from config import get_settingsgpt
+from services.llm_clients import get_openai_client
+from services.llm_scheduler import llm_priority, BATCH
+from services.llm_metrics import llm_call_site
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +29,7 @@ class RAGService:
     def __init__(self):
         """Initialize RAG service with ChromaDB and OpenAI embeddings"""
         try:
-            settings = get_settingsgpt()
-            self.openai_client = OpenAI(api_key=settings.openai_api_key)
+            self.openai_client = get_openai_client()
             
             # Initialize ChromaDB with persistent storage
             persist_dir = os.path.join(os.path.dirname(__file__), "..", "chroma_db")
@@ -58,6 +58,7 @@ class RAGService:
             logger.error(f"Failed to initialize RAG service: {e}")
             raise
 
+    @llm_call_site("rag_service.embedding")
     def _get_embedding(self, text: str) -> List[float]:
         """Get embedding vector for text using OpenAI"""
         try:
@@ -70,13 +71,15 @@ class RAGService:
             logger.error(f"Error getting embedding: {e}")
             raise
 
+    @llm_call_site("rag_service.embedding_batch")
     def _get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings for multiple texts in batch"""
+        """Get embeddings for multiple texts in batch (batch priority, see services/llm_scheduler.py)"""
         try:
-            response = self.openai_client.embeddings.create(
-                model="text-embedding-3-small",
-                input=texts
-            )
+            with llm_priority(BATCH):
+                response = self.openai_client.embeddings.create(
+                    model="text-embedding-3-small",
+                    input=texts
+                )
             return [item.embedding for item in response.data]
         except Exception as e:
             logger.error(f"Error getting batch embeddings: {e}")
@@ -347,6 +350,7 @@ class RAGService:
     # Explanation Generation
     # ==========================================
 
+    @llm_call_site("rag_service.generate_explanation")
     def generate_explanation(
         self,
         question_text: str,
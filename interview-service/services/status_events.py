@@ -0,0 +1,219 @@
+"""
+Answer Status Events
+Push per-answer transcription / scoring status changes to subscribers
+
+The upload route, the transcription pipeline (services/background_tasks.py)
+and analyze publish an event whenever an answer changes state:
+
+    queued -> processing -> completed -> scored
+                  |
+                  +-> queued (retry) / failed / no_speech
+
+Answers uploaded in segments (POST /upload-answer/.../segments/{index})
+start as "recording" and publish a "partial" event, with the segment's
+transcript, each time a segment is transcribed; the stitched transcript
+arrives as "completed" once the answer is finished.
+
+GET /api/transcription-events/{session_id} streams them as server-sent
+events, so clients no longer poll /transcription-status (one session read
+per poll) to find out when an answer is ready.
+
+Backends (STATUS_EVENTS_BACKEND):
+- "memory": in-process fan-out; enough with a single API process
+- "mongo": events are inserted into the `answer_status_events` collection
+  (expired by a TTL index) and every process tails it with a change stream,
+  so a subscriber connected to one worker sees events published by another.
+  Change streams need a replica set; without one the bus falls back to
+  in-process delivery.
+
+Publishing never fails the caller: status events are a notification, the
+session document stays the source of truth.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from pymongo.errors import OperationFailure
+
+from config import get_settings
+from database import get_async_mongodb_client
+
+logger = logging.getLogger("backend.status_events")
+
+EVENTS_COLLECTION = "answer_status_events"
+
+# Answer statuses carried by events
+QUEUED = "queued"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+NO_SPEECH = "no_speech"  # Silent recording, not sent for transcription
+SCORED = "scored"
+RECORDING = "recording"  # Segmented answer still being uploaded
+PARTIAL = "partial"  # One segment of a segmented answer transcribed
+
+
+class StatusEventBus:
+    """Per-session fan-out of answer status events to asyncio queues"""
+
+    def __init__(self, backend: str = "memory", queue_size: int = 256, ttl_seconds: int = 3600):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.ttl_seconds = ttl_seconds
+
+        self._subscribers: Dict[str, Dict[asyncio.Queue, asyncio.AbstractEventLoop]] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+        self._watching = False
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        """Queue receiving the session's events until unsubscribe()"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(session_id, {})[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is not None:
+            subscribers.pop(queue, None)
+            if not subscribers:
+                del self._subscribers[session_id]
+
+    def _put(self, queue: asyncio.Queue, event: Dict):
+        if queue.full():
+            # A stalled client loses its oldest events, never the newest state
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(event)
+        self.delivered += 1
+
+    def _dispatch(self, event: Dict):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        for queue, loop in list(self._subscribers.get(event.get("session_id"), {}).items()):
+            if loop is running:
+                self._put(queue, event)
+            else:
+                # Published from another thread / loop (e.g. the sync transcription wrapper)
+                loop.call_soon_threadsafe(self._put, queue, event)
+
+    async def publish(self, session_id: str, question_id: str, status: str, **fields):
+        """Announce that an answer reached `status` (extra fields are passed through)"""
+        event = {
+            "session_id": session_id,
+            "question_id": question_id,
+            "status": status,
+            **fields,
+            "at": datetime.utcnow().isoformat()
+        }
+        self.published += 1
+
+        if self._watching:
+            try:
+                # Delivered to every process (this one included) by the change stream
+                await get_async_mongodb_client()[EVENTS_COLLECTION].insert_one(
+                    {**event, "created_at": datetime.utcnow()}
+                )
+                return
+            except Exception as e:
+                logger.error(f"Failed to store status event, delivering locally: {e}")
+
+        self._dispatch(event)
+
+    async def _watch(self):
+        collection = get_async_mongodb_client()[EVENTS_COLLECTION]
+        resume_token = None
+
+        while True:
+            try:
+                async with collection.watch(
+                    [{"$match": {"operationType": "insert"}}],
+                    resume_after=resume_token
+                ) as stream:
+                    self._watching = True
+                    logger.info("Status events: tailing change stream")
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        event = change["fullDocument"]
+                        event.pop("_id", None)
+                        event.pop("created_at", None)
+                        self._dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                # Standalone server: change streams are unavailable
+                logger.warning(f"Status events: change streams unavailable, using in-process delivery: {e}")
+                self._watching = False
+                return
+            except Exception as e:
+                logger.error(f"Status events change stream error, reconnecting: {e}")
+                self._watching = False
+                await asyncio.sleep(1.0)
+
+    async def start(self):
+        """Start tailing the events collection (mongo backend only)"""
+        if self.backend != "mongo" or self._watch_task is not None:
+            return
+        collection = get_async_mongodb_client()[EVENTS_COLLECTION]
+        await collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+        self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        self._watching = False
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "change_stream": self._watching,
+            "sessions": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+
+# Singleton instance
+_status_event_bus = None
+
+
+def get_status_event_bus() -> StatusEventBus:
+    """Get or create the process-wide status event bus"""
+    global _status_event_bus
+    if _status_event_bus is None:
+        settings = get_settings()
+        _status_event_bus = StatusEventBus(
+            backend=settings.status_events_backend,
+            queue_size=settings.status_events_queue_size,
+            ttl_seconds=settings.status_events_ttl_seconds
+        )
+    return _status_event_bus
+
+
+async def publish_answer_status(session_id: str, question_id: str, status: str, **fields):
+    """Publish an answer status change; errors are logged, never raised"""
+    try:
+        await get_status_event_bus().publish(session_id, question_id, status, **fields)
+    except Exception as e:
+        logger.error(f"Failed to publish status event: session={session_id}, question={question_id}: {e}")
+
+
+async def start_status_events():
+    await get_status_event_bus().start()
+
+
+async def stop_status_events():
+    if _status_event_bus is not None:
+        await _status_event_bus.stop()
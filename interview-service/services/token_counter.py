@@ -0,0 +1,54 @@
+"""
+Token Counter
+Prompt token estimates for budgeting LLM requests
+
+Uses tiktoken when its encoding is available; otherwise (e.g. the BPE file
+cannot be downloaded) falls back to ~4 characters per token, which is
+close enough for budgeting.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("backend.token_counter")
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encodings: Dict[str, Optional[object]] = {}
+
+
+def _get_encoding(model: str):
+    if model not in _encodings:
+        try:
+            import tiktoken
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"tiktoken unavailable for {model}, using character estimate: {e}")
+            encoding = None
+        _encodings[model] = encoding
+    return _encodings[model]
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Number of tokens in `text` for `model`"""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages: List[Dict], model: str = "gpt-4o-mini") -> int:
+    """Approximate prompt tokens of a chat-completion message list"""
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        total += MESSAGE_OVERHEAD_TOKENS + count_tokens(content or "", model)
+    return total
@@ -0,0 +1,180 @@
+"""
+Transcript Deduplication
+Transcribe byte-identical answer recordings only once
+
+Uploads are hashed (SHA-256) while they stream into GridFS; the hash is kept
+on the GridFS file (`sha256`) and on the answer (`audio_sha256`). Then:
+- a re-upload of the same answer (client retry on a flaky network) is
+  answered from the existing answer, queued, processing or transcribed, and
+  the new file is dropped (routes/upload.py)
+- results are kept by hash in the `audio_transcripts` collection (expired
+  by a TTL index on `expires_at`): identical audio uploaded for another
+  answer gets the finished transcript attached without queueing a job, and
+  a job whose audio is being transcribed for another answer right now waits
+  for that result (JobQueue.defer) instead of calling the API again
+
+A transcription claims its hash for TRANSCRIPTION_LEASE_SECONDS, so a crashed
+worker does not block identical audio for long. Dedup errors never fail an
+upload or a transcription; the audio is then simply transcribed.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config import get_settings
+from database import get_db
+
+logger = logging.getLogger("backend.transcript_dedup")
+
+DEDUP_COLLECTION = "audio_transcripts"
+
+# Entry states (same names as the answer statuses they end up as)
+PROCESSING = "processing"
+FINISHED = ("completed", "no_speech")
+
+
+class TranscriptDedup:
+    """Hash -> transcript index shared by all workers through MongoDB"""
+
+    def __init__(self, ttl_seconds: float = 604800.0, lease_seconds: float = 300.0):
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+
+        self.duplicate_uploads = 0
+        self.transcripts_reused = 0
+        self.deferred = 0
+        self.stores = 0
+        self.errors = 0
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _record_error(self, error: Exception):
+        self._count("errors")
+        logger.warning(f"Transcript dedup error: {error}")
+
+    def record_duplicate_upload(self):
+        self._count("duplicate_uploads")
+
+    def record_reuse(self):
+        self._count("transcripts_reused")
+
+    def record_deferred(self):
+        self._count("deferred")
+
+    async def lookup(self, sha256: str) -> Optional[Dict]:
+        """Finished result for this audio: {"status", "transcript"}, or None"""
+        try:
+            async with get_db() as db:
+                return await db[DEDUP_COLLECTION].find_one(
+                    {"_id": sha256, "status": {"$in": list(FINISHED)}, "expires_at": {"$gt": datetime.utcnow()}},
+                    {"_id": 0, "status": 1, "transcript": 1}
+                )
+        except Exception as e:
+            self._record_error(e)
+            return None
+
+    async def claim(self, sha256: str, owner: str) -> Optional[Dict]:
+        """
+        Claim the transcription of this audio for `owner` (the uploaded file ID)
+
+        Returns:
+            None if the caller should transcribe (claimed, or dedup unavailable);
+            otherwise the existing entry: a finished result ("status" completed /
+            no_speech, "transcript") or another owner's claim ("status" processing)
+        """
+        now = datetime.utcnow()
+        try:
+            async with get_db() as db:
+                # Insert a new claim, or take over our own / an expired one
+                await db[DEDUP_COLLECTION].find_one_and_update(
+                    {"_id": sha256, "status": PROCESSING, "$or": [
+                        {"owner": owner},
+                        {"lease_expires_at": {"$lte": now}}
+                    ]},
+                    {"$set": {
+                        "status": PROCESSING,
+                        "owner": owner,
+                        "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                        "expires_at": now + timedelta(seconds=self.ttl_seconds)
+                    }},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+            return None
+        except DuplicateKeyError:
+            pass
+        except Exception as e:
+            self._record_error(e)
+            return None
+
+        try:
+            async with get_db() as db:
+                return await db[DEDUP_COLLECTION].find_one({"_id": sha256})
+        except Exception as e:
+            self._record_error(e)
+            return None
+
+    async def store(self, sha256: str, status: str, transcript: str):
+        """Record the finished result of a claimed transcription"""
+        now = datetime.utcnow()
+        try:
+            async with get_db() as db:
+                await db[DEDUP_COLLECTION].update_one(
+                    {"_id": sha256},
+                    {
+                        "$set": {
+                            "status": status,
+                            "transcript": transcript,
+                            "expires_at": now + timedelta(seconds=self.ttl_seconds)
+                        },
+                        "$unset": {"owner": "", "lease_expires_at": ""}
+                    },
+                    upsert=True
+                )
+            self._count("stores")
+        except Exception as e:
+            self._record_error(e)
+
+    async def release(self, sha256: str, owner: str):
+        """Give up a claim after a failed attempt, so a waiting job can transcribe"""
+        try:
+            async with get_db() as db:
+                await db[DEDUP_COLLECTION].delete_one({"_id": sha256, "status": PROCESSING, "owner": owner})
+        except Exception as e:
+            self._record_error(e)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": get_settings().transcript_dedup_enabled,
+                "duplicate_uploads": self.duplicate_uploads,
+                "transcripts_reused": self.transcripts_reused,
+                "transcriptions_saved": self.duplicate_uploads + self.transcripts_reused,
+                "deferred": self.deferred,
+                "stores": self.stores,
+                "errors": self.errors
+            }
+
+
+# Singleton instance
+_transcript_dedup = None
+
+
+def get_transcript_dedup() -> TranscriptDedup:
+    """Get or create the transcript dedup singleton"""
+    global _transcript_dedup
+    if _transcript_dedup is None:
+        settings = get_settings()
+        _transcript_dedup = TranscriptDedup(
+            ttl_seconds=settings.transcript_dedup_ttl_seconds,
+            lease_seconds=settings.transcription_lease_seconds
+        )
+    return _transcript_dedup
@@ -1,19 +1,15 @@
 import os
-from openai import OpenAI
 from typing import Union, BinaryIO
 from fastapi import UploadFile
-from config import get_settingsgpt
+from config import get_settings
+from services.llm_clients import get_openai_client
+from services.llm_metrics import llm_call_site
 
 def get_clientgpt():
-    """Lazy initialization of OpenAI client."""
-    settingsgpt = get_settingsgpt()
-    if not settingsgpt.openai_api_key:
-        raise ValueError("OPENAI_API_KEY is required. Please set it in your .env file.")
-    return OpenAI(api_key=settingsgpt.openai_api_key)
-
-# Initialize OpenAI client (reads OPENAI_API_KEY automatically)
-client = get_clientgpt()
+    """Shared OpenAI client (see services/llm_clients.py)."""
+    return get_openai_client()
 
+@llm_call_site("transcription_service.transcribe_audio")
 def transcribe_audio(audio_source: Union[str, BinaryIO, UploadFile]) -> str:
     """
     Transcribe an audio file using OpenAI's Whisper API.
@@ -41,6 +37,9 @@ def transcribe_audio(audio_source: Union[str, BinaryIO, UploadFile]) -> str:
         audio_file = audio_source
         close_when_done = False
 
+    # Resolved on first use so the stub backend works without a key
+    client = get_clientgpt()
+
     try:
         # Perform transcription
         response = client.audio.transcriptions.create(
@@ -59,3 +58,24 @@ def transcribe_audio(audio_source: Union[str, BinaryIO, UploadFile]) -> str:
                 audio_file.close()
             except Exception:
                 pass
+
+
+def stub_transcribe_audio(audio_source: Union[str, BinaryIO, UploadFile]) -> str:
+    """
+    Local stand-in for transcribe_audio (TRANSCRIPTION_BACKEND=stub)
+    Returns a deterministic transcript without calling any external API.
+    """
+    if isinstance(audio_source, str):
+        size = os.path.getsize(audio_source)
+    elif isinstance(audio_source, UploadFile):
+        size = len(audio_source.file.read())
+    else:
+        size = len(audio_source.read())
+    return f"stub transcript ({size} bytes)"
+
+
+def get_transcriber():
+    """Return the transcription function selected by TRANSCRIPTION_BACKEND"""
+    if get_settings().transcription_backend == "stub":
+        return stub_transcribe_audio
+    return transcribe_audio
@@ -0,0 +1,144 @@
+"""
+Transcription Worker Pool
+Runs queued transcription jobs off the request loop
+
+Each worker is an asyncio task that claims jobs from the durable queue; the
+blocking transcription call itself runs in a thread pool of the same size,
+so the event loop only ever awaits I/O. While a job runs, its lease is
+renewed every third of TRANSCRIPTION_LEASE_SECONDS.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from config import get_settings
+from services.background_tasks import run_transcription_job
+from services.job_queue import JobQueue, get_transcription_queue
+from services.transcription_service import get_transcriber
+
+logger = logging.getLogger("backend.transcription_worker")
+
+
+class TranscriptionWorkerPool:
+    """Fixed-size pool of queue consumers"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int = 4,
+        transcriber: Optional[Callable] = None,
+        poll_interval: float = 1.0
+    ):
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.transcriber = transcriber or get_transcriber()
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix="transcription"
+        )
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    def _worker_id(self, index: int) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+    async def _run_worker(self, index: int):
+        worker_id = self._worker_id(index)
+        logger.info(f"Transcription worker started: {worker_id}")
+
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.claim(worker_id)
+            except Exception as e:
+                logger.error(f"Failed to claim transcription job: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heartbeat = asyncio.create_task(self._renew_lease(job))
+            try:
+                await run_transcription_job(
+                    self.queue,
+                    job,
+                    transcriber=self.transcriber,
+                    executor=self.executor
+                )
+            except Exception as e:
+                # Lease expiry will hand the job to another worker
+                logger.error(f"Transcription worker error on job {job['_id']}: {e}", exc_info=True)
+            finally:
+                heartbeat.cancel()
+
+        logger.info(f"Transcription worker stopped: {worker_id}")
+
+    async def _renew_lease(self, job: Dict):
+        """Keep the job's lease from expiring while it runs"""
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            try:
+                if not await self.queue.renew(job):
+                    logger.warning(f"Lost the lease of transcription job {job['_id']}")
+                    return
+            except Exception as e:
+                logger.error(f"Failed to renew lease of transcription job {job['_id']}: {e}")
+
+    def start(self):
+        """Spawn the worker tasks on the running event loop"""
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._run_worker(index))
+            for index in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        """
+        Stop claiming new jobs and wait for in-flight ones
+
+        A job interrupted by a hard kill is not lost: its lease expires and
+        another worker (or this one after restart) claims it again.
+        """
+        self._stopping.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        self.executor.shutdown(wait=False)
+
+
+# Singleton instance
+_worker_pool = None
+
+
+async def start_transcription_workers() -> TranscriptionWorkerPool:
+    """Create the queue indexes and start the worker pool sized from settings"""
+    global _worker_pool
+    if _worker_pool is None:
+        settings = get_settings()
+        queue = get_transcription_queue()
+        await queue.ensure_indexes()
+
+        _worker_pool = TranscriptionWorkerPool(
+            queue,
+            concurrency=settings.transcription_workers,
+            poll_interval=settings.transcription_poll_interval_seconds
+        )
+        _worker_pool.start()
+        logger.info(f"Started {_worker_pool.concurrency} transcription worker(s)")
+    return _worker_pool
+
+
+async def stop_transcription_workers():
+    """Stop the worker pool (called on shutdown)"""
+    global _worker_pool
+    if _worker_pool is not None:
+        await _worker_pool.stop()
+        _worker_pool = None
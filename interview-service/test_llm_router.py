@@ -0,0 +1,220 @@
+"""
+Test Script for the LLM provider router
+Runs two local stub servers that mimic the chat-completions API, one
+standing in for OpenAI and one for Groq (no real LLM calls), and checks
+failover, hedging and circuit breaking.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class StubProvider:
+    """Chat-completions stub whose latency and failure mode can be changed per test"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.delay = 0.0
+        self.fail = False
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests += 1
+                time.sleep(stub.delay)
+
+                if stub.fail:
+                    payload = json.dumps({"error": {"message": f"{stub.name} is down"}}).encode()
+                    self.send_response(500)
+                    # Tell the SDK not to retry, so the router fails over immediately
+                    self.send_header("x-should-retry", "false")
+                else:
+                    payload = json.dumps({
+                        "id": "stub",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": f"answer from {stub.name}"}
+                        }]
+                    }).encode()
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client cancelled a losing hedge
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def reset(self):
+        self.delay = 0.0
+        self.fail = False
+        self.requests = 0
+
+
+openai_stub = StubProvider("openai")
+groq_stub = StubProvider("groq")
+
+os.environ["OPENAI_API_KEY"] = "stub-key"
+os.environ["GROQ_API_KEY"] = "stub-key"
+os.environ["OPENAI_BASE_URL"] = openai_stub.base_url
+os.environ["GROQ_BASE_URL"] = groq_stub.base_url
+
+from services.llm_router import LLMRouter, EVALUATION  # noqa: E402
+
+REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "ping"}]}
+
+
+def make_router(hedge_delay: float = None) -> LLMRouter:
+    router = LLMRouter()
+    if hedge_delay is not None:
+        # Enough latency samples for the primary to be hedged after hedge_delay
+        for _ in range(20):
+            router.latency.add((EVALUATION, "openai", "gpt-4o-mini"), hedge_delay)
+    for breaker in router.breakers.values():
+        breaker.min_requests = 3
+        breaker.cooldown_seconds = 1.0
+    openai_stub.reset()
+    groq_stub.reset()
+    return router
+
+
+async def test_failover() -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 1: Errors on the primary fail over to the next provider")
+    print(f"{'='*60}")
+
+    router = make_router()
+    openai_stub.fail = True
+
+    started = time.perf_counter()
+    content = await router.complete_async(EVALUATION, REQUEST)
+    elapsed = time.perf_counter() - started
+    print(f"  Response: {content!r} in {elapsed:.2f}s, failovers={router.failovers}")
+
+    passed = content == "answer from groq" and router.failovers == 1 and elapsed < 2
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: served by groq")
+    return passed
+
+
+async def test_hedging() -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 2: A slow primary is hedged and the first response wins")
+    print(f"{'='*60}")
+
+    router = make_router(hedge_delay=0.2)
+    openai_stub.delay = 3.0
+
+    started = time.perf_counter()
+    content = await router.complete_async(EVALUATION, REQUEST)
+    elapsed = time.perf_counter() - started
+    print(f"  Response: {content!r} in {elapsed:.2f}s, hedges={router.hedges}, hedge_wins={router.hedge_wins}")
+
+    passed = content == "answer from groq" and router.hedges == 1 and elapsed < 1.5
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: hedge answered before the primary")
+    return passed
+
+
+async def test_circuit_breaker() -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 3: A failing provider is skipped once its circuit opens, then probed")
+    print(f"{'='*60}")
+
+    router = make_router()
+    openai_stub.fail = True
+
+    for _ in range(5):
+        await router.complete_async(EVALUATION, REQUEST)
+    state = router.breakers["openai"].state
+    print(f"  After 5 calls: openai requests={openai_stub.requests}, circuit={state}")
+    opened = state == "open" and openai_stub.requests == 3
+
+    openai_stub.fail = False
+    await asyncio.sleep(1.1)
+    content = await router.complete_async(EVALUATION, REQUEST)
+    state = router.breakers["openai"].state
+    print(f"  After cooldown: response={content!r}, circuit={state}")
+
+    passed = opened and content == "answer from openai" and state == "closed"
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: circuit opened and closed again")
+    return passed
+
+
+def test_sync_hedging() -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 4: Sync callers are hedged too")
+    print(f"{'='*60}")
+
+    router = make_router(hedge_delay=0.2)
+    openai_stub.delay = 2.0
+
+    started = time.perf_counter()
+    content = router.complete(EVALUATION, REQUEST)
+    elapsed = time.perf_counter() - started
+    router.shutdown()
+    print(f"  Response: {content!r} in {elapsed:.2f}s")
+
+    passed = content == "answer from groq" and elapsed < 1.5
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: hedge answered before the primary")
+    return passed
+
+
+async def test_no_hedging_without_samples() -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 5: A slow primary is not hedged before its latency is known")
+    print(f"{'='*60}")
+
+    router = make_router()
+    openai_stub.delay = 0.5
+
+    content = await router.complete_async(EVALUATION, REQUEST)
+    print(f"  Response: {content!r}, hedges={router.hedges}, groq requests={groq_stub.requests}")
+
+    passed = content == "answer from openai" and router.hedges == 0 and groq_stub.requests == 0
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: no duplicate request on a cold start")
+    return passed
+
+
+async def run_all_tests():
+    print("\n" + "="*60)
+    print("LLM ROUTER TEST SUITE")
+    print("="*60)
+
+    results = [
+        ("Failover", await test_failover()),
+        ("Hedging", await test_hedging()),
+        ("Circuit breaker", await test_circuit_breaker()),
+        ("Sync hedging", await asyncio.to_thread(test_sync_hedging)),
+        ("No cold-start hedging", await test_no_hedging_without_samples()),
+    ]
+
+    print(f"\n{'='*60}")
+    print("TEST SUMMARY")
+    print(f"{'='*60}\n")
+    for test_name, result in results:
+        print(f"  {'✅ PASS' if result else '❌ FAIL'}: {test_name}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_all_tests())
@@ -0,0 +1,493 @@
+"""
+Test Script for the durable transcription queue
+Runs the worker pool against a local MongoDB with stub transcribers
+(no OpenAI calls). Uses MONGODB_URI / MONGODB_DB_NAME from .env.
+"""
+
+import asyncio
+import hashlib
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from database import get_db, init_async_db
+from services.background_tasks import expire_stale_recording, finalize_segmented_answer
+from services.gridfs_service import get_gridfs_service
+from services.job_queue import JobQueue, COMPLETED, DEAD
+from services.transcription_service import stub_transcribe_audio
+from services.transcription_worker import TranscriptionWorkerPool
+
+
+def failing_transcriber(audio_stream):
+    raise RuntimeError("stub transcriber failure")
+
+
+async def create_answer(session_id: str, question_id: str) -> str:
+    """Store dummy audio and an answer record the way upload_answer does"""
+    file_id = await get_gridfs_service().store_audio(
+        audio_data=b"\x1a\x45\xdf\xa3" + b"\x00" * 100,
+        session_id=session_id,
+        question_id=question_id,
+        user_id="test-user",
+        filename="test_answer.webm"
+    )
+    async with get_db() as db:
+        await db.interview_sessions.update_one(
+            {"id": session_id},
+            {"$set": {f"answers.{question_id}": {
+                "question_id": question_id,
+                "gridfs_file_id": file_id,
+                "transcript": None,
+                "transcription_status": "queued",
+                "score": None
+            }}},
+            upsert=True
+        )
+    return file_id
+
+
+def slow_transcriber(audio_stream):
+    time.sleep(0.5)
+    return stub_transcribe_audio(audio_stream)
+
+
+async def wait_for_jobs(queue: JobQueue, job_ids: list, states: set, timeout: float = 20.0) -> dict:
+    from bson import ObjectId
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        jobs = await queue.collection.find(
+            {"_id": {"$in": [ObjectId(j) for j in job_ids]}}
+        ).to_list(length=None)
+        if jobs and all(j["status"] in states for j in jobs):
+            return {str(j["_id"]): j for j in jobs}
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"Jobs did not reach {states} within {timeout}s")
+
+
+async def test_stub_transcription(queue: JobQueue) -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 1: Worker pool transcribes queued jobs (stub transcriber)")
+    print(f"{'='*60}")
+
+    session_id = f"queue-test-{uuid.uuid4()}"
+    job_ids = []
+    for idx in range(5):
+        question_id = f"q{idx + 1}"
+        file_id = await create_answer(session_id, question_id)
+        job_ids.append(await queue.enqueue({
+            "file_id": file_id,
+            "session_id": session_id,
+            "question_id": question_id,
+            "user_id": "test-user"
+        }))
+
+    pool = TranscriptionWorkerPool(queue, concurrency=3, transcriber=stub_transcribe_audio, poll_interval=0.1)
+    pool.start()
+    try:
+        await wait_for_jobs(queue, job_ids, {COMPLETED})
+    finally:
+        await pool.stop()
+
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one({"id": session_id})
+    statuses = [a["transcription_status"] for a in session["answers"].values()]
+    print(f"  Answer statuses: {statuses}")
+
+    passed = all(s == "completed" for s in statuses)
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: all answers transcribed")
+    return passed
+
+
+async def test_retry_and_dead_letter(queue: JobQueue) -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 2: Failing jobs are retried with backoff, then dead-lettered")
+    print(f"{'='*60}")
+
+    session_id = f"queue-test-{uuid.uuid4()}"
+    file_id = await create_answer(session_id, "q1")
+    job_id = await queue.enqueue({
+        "file_id": file_id,
+        "session_id": session_id,
+        "question_id": "q1",
+        "user_id": "test-user"
+    })
+
+    pool = TranscriptionWorkerPool(queue, concurrency=1, transcriber=failing_transcriber, poll_interval=0.1)
+    pool.start()
+    try:
+        jobs = await wait_for_jobs(queue, [job_id], {DEAD})
+    finally:
+        await pool.stop()
+
+    job = jobs[job_id]
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one({"id": session_id})
+    answer = session["answers"]["q1"]
+    print(f"  Attempts: {job['attempts']}/{job['max_attempts']}, last_error: {job['last_error']}")
+    print(f"  Answer status: {answer['transcription_status']}")
+
+    passed = job["attempts"] == queue.max_attempts and answer["transcription_status"] == "failed"
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: job dead-lettered after retries")
+    return passed
+
+
+async def test_expired_lease_is_reclaimed(queue: JobQueue) -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 3: A job whose worker died is claimed again after its lease")
+    print(f"{'='*60}")
+
+    job_id = await queue.enqueue({"file_id": "x", "session_id": "x", "question_id": "x"})
+    first = await queue.claim("crashed-worker")
+    await asyncio.sleep(queue.lease_seconds + 0.5)
+    second = await queue.claim("new-worker")
+
+    passed = (
+        first is not None and second is not None
+        and str(second["_id"]) == job_id and second["attempts"] == 2
+    )
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: job reclaimed by new-worker")
+    return passed
+
+
+async def test_segmented_answer(queue: JobQueue) -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 4: Segments are transcribed while recording and stitched in order")
+    print(f"{'='*60}")
+
+    session_id = f"queue-test-{uuid.uuid4()}"
+    segment_count = 4
+    pool = TranscriptionWorkerPool(queue, concurrency=2, transcriber=slow_transcriber, poll_interval=0.1)
+    pool.start()
+    try:
+        # Upload the segments the way upload_answer_segment does, 1 s apart
+        for index in range(segment_count):
+            file_id = await get_gridfs_service().store_audio(
+                audio_data=b"\x1a\x45\xdf\xa3" + b"\x00" * (100 + index),
+                session_id=session_id,
+                question_id="q1",
+                user_id="test-user",
+                filename=f"segment_{index}.webm"
+            )
+            segment = {"gridfs_file_id": file_id, "transcript": None, "transcription_status": "queued"}
+            async with get_db() as db:
+                if index == 0:
+                    update = {"answers.q1": {
+                        "id": "answer-1",
+                        "question_id": "q1",
+                        "transcript": None,
+                        "transcription_status": "recording",
+                        "segments": {"0": segment},
+                        "segment_count": None
+                    }}
+                else:
+                    update = {f"answers.q1.segments.{index}": segment}
+                await db.interview_sessions.update_one({"id": session_id}, {"$set": update}, upsert=True)
+            await queue.enqueue({
+                "file_id": file_id,
+                "session_id": session_id,
+                "question_id": "q1",
+                "answer_id": "answer-1",
+                "user_id": "test-user",
+                "segment": index
+            })
+            if index < segment_count - 1:
+                await asyncio.sleep(1.0)
+
+        # "Stop": complete the answer the way complete_answer does
+        started = time.time()
+        async with get_db() as db:
+            await db.interview_sessions.update_one(
+                {"id": session_id},
+                {"$set": {"answers.q1.segment_count": segment_count, "answers.q1.transcription_status": "processing"}}
+            )
+        await finalize_segmented_answer(session_id, "q1")
+
+        deadline = started + 20
+        while time.time() < deadline:
+            async with get_db() as db:
+                session = await db.interview_sessions.find_one({"id": session_id})
+            answer = session["answers"]["q1"]
+            if answer["transcription_status"] != "processing":
+                break
+            await asyncio.sleep(0.05)
+        elapsed = time.time() - started
+    finally:
+        await pool.stop()
+
+    expected = " ".join(f"stub transcript ({104 + index} bytes)" for index in range(segment_count))
+    print(f"  Answer status: {answer['transcription_status']}")
+    print(f"  Transcript: {answer['transcript']}")
+    print(f"  Time to transcript after stop: {elapsed:.2f}s (one segment takes 0.5s)")
+
+    passed = answer["transcription_status"] == "completed" and answer["transcript"] == expected and elapsed < 2.0
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: transcript stitched in segment order")
+    return passed
+
+
+async def test_identical_audio_transcribed_once(queue: JobQueue) -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 5: Identical audio for two answers is transcribed once")
+    print(f"{'='*60}")
+
+    calls = []
+
+    def counting_transcriber(audio_stream):
+        calls.append(audio_stream.name)
+        return slow_transcriber(audio_stream)
+
+    session_id = f"queue-test-{uuid.uuid4()}"
+    audio = b"\x1a\x45\xdf\xa3" + uuid.uuid4().bytes * 8
+    job_ids = []
+    for question_id in ("q1", "q2"):
+        file_id = await get_gridfs_service().store_audio(
+            audio_data=audio,
+            session_id=session_id,
+            question_id=question_id,
+            user_id="test-user",
+            filename="test_answer.webm"
+        )
+        async with get_db() as db:
+            await db.interview_sessions.update_one(
+                {"id": session_id},
+                {"$set": {f"answers.{question_id}": {
+                    "question_id": question_id,
+                    "gridfs_file_id": file_id,
+                    "transcript": None,
+                    "transcription_status": "queued"
+                }}},
+                upsert=True
+            )
+        job_ids.append(await queue.enqueue({
+            "file_id": file_id,
+            "session_id": session_id,
+            "question_id": question_id,
+            "user_id": "test-user",
+            "sha256": hashlib.sha256(audio).hexdigest()
+        }))
+
+    pool = TranscriptionWorkerPool(queue, concurrency=2, transcriber=counting_transcriber, poll_interval=0.1)
+    pool.start()
+    try:
+        await wait_for_jobs(queue, job_ids, {COMPLETED})
+    finally:
+        await pool.stop()
+
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one({"id": session_id})
+    transcripts = {q: a["transcript"] for q, a in session["answers"].items()}
+    print(f"  Transcriber calls: {len(calls)}")
+    print(f"  Transcripts: {transcripts}")
+
+    passed = len(calls) == 1 and transcripts["q1"] == transcripts["q2"]
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: second answer reused the first transcript")
+    return passed
+
+
+async def test_replaced_answer_is_left_alone(queue: JobQueue) -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 6: A segment job of a restarted answer stores nothing")
+    print(f"{'='*60}")
+
+    session_id = f"queue-test-{uuid.uuid4()}"
+    file_id = await get_gridfs_service().store_audio(
+        audio_data=b"\x1a\x45\xdf\xa3" + b"\x00" * 100,
+        session_id=session_id,
+        question_id="q1",
+        user_id="test-user",
+        filename="segment_0.webm"
+    )
+    job_id = await queue.enqueue({
+        "file_id": file_id,
+        "session_id": session_id,
+        "question_id": "q1",
+        "answer_id": "old-answer",
+        "user_id": "test-user",
+        "segment": 0
+    })
+    # The candidate restarted the recording before the job ran
+    async with get_db() as db:
+        await db.interview_sessions.update_one(
+            {"id": session_id},
+            {"$set": {"answers.q1": {
+                "id": "new-answer",
+                "question_id": "q1",
+                "transcript": None,
+                "transcription_status": "recording",
+                "segments": {},
+                "segment_count": None
+            }}},
+            upsert=True
+        )
+
+    pool = TranscriptionWorkerPool(queue, concurrency=1, transcriber=stub_transcribe_audio, poll_interval=0.1)
+    pool.start()
+    try:
+        await wait_for_jobs(queue, [job_id], {COMPLETED})
+    finally:
+        await pool.stop()
+
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one({"id": session_id})
+    answer = session["answers"]["q1"]
+    audio_left = await get_gridfs_service().get_audio_file(file_id)
+    print(f"  Answer: id={answer['id']}, status={answer['transcription_status']}, segments={answer['segments']}")
+    print(f"  Stale audio deleted: {audio_left is None}")
+
+    passed = answer["segments"] == {} and answer["transcription_status"] == "recording" and audio_left is None
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: new recording untouched")
+    return passed
+
+
+async def test_lost_worker_on_last_attempt_is_dead_lettered(queue: JobQueue) -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 7: A job that keeps losing its worker is dead-lettered")
+    print(f"{'='*60}")
+
+    session_id = f"queue-test-{uuid.uuid4()}"
+    file_id = await create_answer(session_id, "q1")
+    job_id = await queue.enqueue({
+        "file_id": file_id,
+        "session_id": session_id,
+        "question_id": "q1",
+        "user_id": "test-user"
+    })
+    # Every attempt "crashes" its worker (e.g. out of memory): the lease expires
+    for attempt in range(queue.max_attempts):
+        await queue.claim(f"crashed-worker-{attempt}")
+        await asyncio.sleep(queue.lease_seconds + 0.2)
+
+    pool = TranscriptionWorkerPool(queue, concurrency=1, transcriber=stub_transcribe_audio, poll_interval=0.1)
+    pool.start()
+    try:
+        jobs = await wait_for_jobs(queue, [job_id], {DEAD})
+    finally:
+        await pool.stop()
+
+    job = jobs[job_id]
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one({"id": session_id})
+    answer = session["answers"]["q1"]
+    print(f"  Attempts: {job['attempts']}/{job['max_attempts']}, last_error: {job['last_error']}")
+    print(f"  Answer status: {answer['transcription_status']}")
+
+    passed = job["attempts"] == queue.max_attempts and answer["transcription_status"] == "failed"
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: job dead-lettered instead of claimed again")
+    return passed
+
+
+async def test_long_job_keeps_its_lease(queue: JobQueue) -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 8: A job running longer than its lease is not claimed twice")
+    print(f"{'='*60}")
+
+    calls = []
+
+    def long_transcriber(audio_stream):
+        calls.append(audio_stream.name)
+        time.sleep(queue.lease_seconds * 3)
+        return stub_transcribe_audio(audio_stream)
+
+    session_id = f"queue-test-{uuid.uuid4()}"
+    file_id = await create_answer(session_id, "q1")
+    job_id = await queue.enqueue({
+        "file_id": file_id,
+        "session_id": session_id,
+        "question_id": "q1",
+        "user_id": "test-user"
+    })
+
+    pool = TranscriptionWorkerPool(queue, concurrency=2, transcriber=long_transcriber, poll_interval=0.1)
+    pool.start()
+    try:
+        jobs = await wait_for_jobs(queue, [job_id], {COMPLETED})
+    finally:
+        await pool.stop()
+
+    print(f"  Transcriber calls: {len(calls)}, attempts: {jobs[job_id]['attempts']}")
+
+    passed = len(calls) == 1 and jobs[job_id]["attempts"] == 1
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: lease renewed while the job ran")
+    return passed
+
+
+async def test_abandoned_recording_is_finished(queue: JobQueue) -> bool:
+    print(f"\n{'='*60}")
+    print("TEST 9: An answer never completed is finished with the segments received")
+    print(f"{'='*60}")
+
+    session_id = f"queue-test-{uuid.uuid4()}"
+    long_ago = datetime.utcnow() - timedelta(hours=1)
+    async with get_db() as db:
+        # Segments 0 and 2 arrived and were transcribed, segment 1 never did
+        await db.interview_sessions.update_one(
+            {"id": session_id},
+            {"$set": {"answers.q1": {
+                "id": "answer-1",
+                "question_id": "q1",
+                "transcript": None,
+                "transcription_status": "recording",
+                "segments": {
+                    "0": {"transcript": "first part", "transcription_status": "completed"},
+                    "2": {"transcript": "last part", "transcription_status": "completed"}
+                },
+                "segment_count": None,
+                "recording_started_at": long_ago,
+                "last_segment_at": long_ago
+            }}},
+            upsert=True
+        )
+        session = await db.interview_sessions.find_one({"id": session_id})
+
+    expired = await expire_stale_recording(session_id, "q1", session["answers"]["q1"])
+    expired_again = await expire_stale_recording(session_id, "q1", session["answers"]["q1"])
+    async with get_db() as db:
+        session = await db.interview_sessions.find_one({"id": session_id})
+    answer = session["answers"]["q1"]
+
+    print(f"  Expired: {expired}, expired again: {expired_again}")
+    print(f"  Answer status: {answer['transcription_status']}, transcript: {answer['transcript']!r}, "
+          f"failed segments: {answer.get('failed_segments')}")
+
+    passed = (
+        expired and not expired_again
+        and answer["transcription_status"] == "completed"
+        and answer["transcript"] == "first part last part"
+        and answer.get("failed_segments") == [1]
+    )
+    print(f"  {'✅ PASS' if passed else '❌ FAIL'}: abandoned answer stitched from its segments")
+    return passed
+
+
+async def run_all_tests():
+    print("\n" + "="*60)
+    print("TRANSCRIPTION QUEUE TEST SUITE")
+    print("="*60)
+
+    await init_async_db()
+    collection = f"transcription_jobs_test_{uuid.uuid4().hex[:8]}"
+    queue = JobQueue(collection, max_attempts=3, lease_seconds=1, retry_backoff_seconds=0.2)
+    await queue.ensure_indexes()
+
+    results = []
+    try:
+        results.append(("Stub transcription", await test_stub_transcription(queue)))
+        results.append(("Retry + dead letter", await test_retry_and_dead_letter(queue)))
+        results.append(("Lease expiry", await test_expired_lease_is_reclaimed(queue)))
+        results.append(("Segmented answer", await test_segmented_answer(queue)))
+        results.append(("Transcript dedup", await test_identical_audio_transcribed_once(queue)))
+        results.append(("Replaced answer", await test_replaced_answer_is_left_alone(queue)))
+        results.append(("Lost worker dead letter", await test_lost_worker_on_last_attempt_is_dead_lettered(queue)))
+        results.append(("Lease renewal", await test_long_job_keeps_its_lease(queue)))
+        results.append(("Abandoned recording", await test_abandoned_recording_is_finished(queue)))
+    finally:
+        await queue.collection.drop()
+
+    print(f"\n{'='*60}")
+    print("TEST SUMMARY")
+    print(f"{'='*60}\n")
+    for test_name, result in results:
+        print(f"  {'✅ PASS' if result else '❌ FAIL'}: {test_name}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_all_tests())